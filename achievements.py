@@ -1,7 +1,9 @@
 import discord
 from discord.ext import commands
 import sys
-import os
+import database
+import branding
+import audit
 
 class Achievements(commands.Cog):
     def __init__(self, bot, get_db_connection, fiery_embed):
@@ -97,40 +99,33 @@ class Achievements(commands.Cog):
         
         if category in tier_map and current_value in tier_map[category]:
             main_module = sys.modules['__main__']
-            # ADDED: Direct ID fetch for the requested audit log
-            audit_channel = self.bot.get_channel(self.AUDIT_CHANNEL_ID)
+            # UPDATED: Queued for the audit channel (audit.py); a mention needs no user fetch
+            mention = f"<@{user_id}>"
+
+            # Dynamic wording based on category
+            if category == "Kill Streak":
+                special_note = "A killing spree has ignited. The blood is practically boiling."
+            elif category == "First Deaths":
+                special_note = "An asset has been sacrificed first too many times. A true glutton for punishment."
+            else:
+                special_note = "The Master has noted your growing submission to the arena."
+
+            embed = self.fiery_embed("📜 MASTER'S LEDGER: MILESTONE REACHED", 
+                f"🫦 {mention} has deepened their descent. A new seal has been broken in the Achievement Room.\n\n"
+                f"🏅 **Achievement Category:** {category}\n"
+                f"📈 **Milestone Reached:** Level {current_value}\n"
+                f"⛓️ **Status:** Permanent Record Updated\n\n"
+                f"*'{special_note}'*", color=0xFFD700)
             
-            if audit_channel:
-                user = await self.bot.fetch_user(user_id)
-                
-                # Dynamic wording based on category
-                if category == "Kill Streak":
-                    special_note = "A killing spree has ignited. The blood is practically boiling."
-                elif category == "First Deaths":
-                    special_note = "An asset has been sacrificed first too many times. A true glutton for punishment."
-                else:
-                    special_note = "The Master has noted your growing submission to the arena."
-
-                embed = self.fiery_embed("📜 MASTER'S LEDGER: MILESTONE REACHED", 
-                    f"🫦 {user.mention} has deepened their descent. A new seal has been broken in the Achievement Room.\n\n"
-                    f"🏅 **Achievement Category:** {category}\n"
-                    f"📈 **Milestone Reached:** Level {current_value}\n"
-                    f"⛓️ **Status:** Permanent Record Updated\n\n"
-                    f"*'{special_note}'*", color=0xFFD700)
-                
-                if os.path.exists("LobbyTopRight.jpg"):
-                    file = discord.File("LobbyTopRight.jpg", filename="milestone.jpg")
-                    embed.set_thumbnail(url="attachment://milestone.jpg")
-                    await audit_channel.send(content=f"👑 **Achievement Protocol Activated:** {user.mention}", file=file, embed=embed)
-                else:
-                    await audit_channel.send(content=f"👑 **Achievement Protocol Activated:** {user.mention}", embed=embed)
+            if branding.available():
+                embed.set_thumbnail(url="attachment://milestone.jpg")
+            audit.post(self.AUDIT_CHANNEL_ID, embed, content=f"👑 **Achievement Protocol Activated:** {mention}")
 
     @commands.command(name="achievements")
     async def view_achievements(self, ctx, member: discord.Member = None):
         """Displays a full breakdown of the user's achievements across all categories."""
         member = member or ctx.author
-        with self.get_db_connection() as conn:
-            u = conn.execute("SELECT * FROM users WHERE id = ?", (member.id,)).fetchone()
+        u = await database.fetchone("SELECT * FROM users WHERE id = ?", (member.id,))
         
         if not u: 
             return await ctx.send("No records found for this tribute.")
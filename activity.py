@@ -0,0 +1,252 @@
+import asyncio
+import json
+import os
+import time
+
+import database
+
+# ===== ACTIVITY LOG + ROLLUPS =====
+# Collect kept the day's activity in plain dicts (with unbounded badge/ship
+# lists per user), so a restart before the 21:00 report wiped the day.
+# Every rewarded action is now appended to activity_events, and the reports
+# read compact per-user counters held in one rollup per report: "daily" keeps
+# a UserActivity (fixed slots) per user, "vibration" only reaction counts.
+#
+# Rollups are checkpointed into activity_checkpoints together with the id of
+# the last event they contain, in the same transaction that writes the
+# events, so loading = last checkpoint + replay of the events after it.
+# A report reads a snapshot(); events recorded while it is being sent are kept
+# aside, and reset() rebuilds the rollup from just those. Events every
+# rollup has moved past are pruned then.
+
+FLUSH_SECONDS = float(os.getenv("ACTIVITY_FLUSH_SECONDS", "5"))
+CHECKPOINT_SECONDS = float(os.getenv("ACTIVITY_CHECKPOINT_SECONDS", "900"))
+MAX_LABELS = 5        # Badge/ship names kept per user (the counts stay exact)
+TOP_RANKS = 5
+
+# Column order of activity_events after id; record() takes the same fields
+EVENT_FIELDS = ("at", "user_id", "xp", "flames", "channel_id", "reaction", "fight",
+                "hg_kills", "hg_first_blood", "hg_play", "hg_rank", "badge", "ship")
+
+
+def ensure_schema(conn):
+    conn.execute("""CREATE TABLE IF NOT EXISTS activity_events (
+        id INTEGER PRIMARY KEY,
+        at REAL,
+        user_id INTEGER,
+        xp INTEGER DEFAULT 0,
+        flames INTEGER DEFAULT 0,
+        channel_id INTEGER,
+        reaction INTEGER DEFAULT 0,
+        fight INTEGER DEFAULT 0,
+        hg_kills INTEGER DEFAULT 0,
+        hg_first_blood INTEGER DEFAULT 0,
+        hg_play INTEGER DEFAULT 0,
+        hg_rank INTEGER DEFAULT 0,
+        badge TEXT,
+        ship TEXT
+    )""")
+    conn.execute("""CREATE TABLE IF NOT EXISTS activity_checkpoints (
+        name TEXT PRIMARY KEY,
+        upto INTEGER,
+        state TEXT
+    )""")
+
+
+class UserActivity:
+    __slots__ = ("xp", "flames", "reactions", "fights", "hg_kills", "hg_first_bloods", "hg_plays",
+                 "tops", "pics", "badge_count", "badges", "ship_count", "ships")
+
+    def __init__(self):
+        self.xp = self.flames = self.reactions = self.fights = 0
+        self.hg_kills = self.hg_first_bloods = self.hg_plays = 0
+        self.tops = [0] * TOP_RANKS   # tops[0] = 1st place finishes
+        self.pics = {}                # channel_id -> posts (selfie channels only)
+        self.badge_count = self.ship_count = 0
+        self.badges = []              # Latest MAX_LABELS names
+        self.ships = []
+
+    def apply(self, ev):
+        self.xp += ev["xp"]
+        self.flames += ev["flames"]
+        self.reactions += ev["reaction"]
+        self.fights += ev["fight"]
+        self.hg_kills += ev["hg_kills"]
+        self.hg_first_bloods += ev["hg_first_blood"]
+        self.hg_plays += ev["hg_play"]
+        if 1 <= ev["hg_rank"] <= TOP_RANKS:
+            self.tops[ev["hg_rank"] - 1] += 1
+        if ev["channel_id"]:
+            self.pics[ev["channel_id"]] = self.pics.get(ev["channel_id"], 0) + 1
+        if ev["badge"]:
+            self.badge_count += 1
+            self.badges = (self.badges + [ev["badge"]])[-MAX_LABELS:]
+        if ev["ship"]:
+            self.ship_count += 1
+            self.ships = (self.ships + [ev["ship"]])[-MAX_LABELS:]
+
+    def dump(self):
+        return [getattr(self, s) if s != "pics" else list(self.pics.items()) for s in self.__slots__]
+
+    @classmethod
+    def load(cls, values):
+        a = cls()
+        for s, v in zip(cls.__slots__, values):
+            setattr(a, s, {int(k): n for k, n in v} if s == "pics" else v)
+        return a
+
+
+class Rollup:
+    """{user_id: UserActivity} for one report period."""
+
+    def __init__(self):
+        self.users = {}
+
+    def apply(self, ev):
+        u = self.users.get(ev["user_id"])
+        if u is None:
+            u = self.users[ev["user_id"]] = UserActivity()
+        u.apply(ev)
+
+    def dump(self):
+        return json.dumps([[uid, u.dump()] for uid, u in self.users.items()])
+
+    @classmethod
+    def load(cls, state):
+        r = cls()
+        r.users = {int(uid): UserActivity.load(v) for uid, v in json.loads(state)}
+        return r
+
+    def copy(self):
+        return type(self).load(self.dump())
+
+
+class ReactionRollup(Rollup):
+    """{user_id: reactions}, all the vibration report reads."""
+
+    def apply(self, ev):
+        if ev["reaction"]:
+            self.users[ev["user_id"]] = self.users.get(ev["user_id"], 0) + ev["reaction"]
+
+    def dump(self):
+        return json.dumps(list(self.users.items()))
+
+    @classmethod
+    def load(cls, state):
+        r = cls()
+        r.users = {int(uid): n for uid, n in json.loads(state)}
+        return r
+
+
+ROLLUPS = {"daily": Rollup, "vibration": ReactionRollup}
+
+
+# --- DB WORKER SIDE ---
+def _load(conn, kinds):
+    """Each rollup's checkpoint plus the events written after it."""
+    rollups, upto = {}, {}
+    for name, kind in kinds.items():
+        row = conn.execute("SELECT upto, state FROM activity_checkpoints WHERE name = ?", (name,)).fetchone()
+        rollups[name] = kind.load(row["state"]) if row else kind()
+        upto[name] = row["upto"] if row else 0
+    for ev in conn.execute(f"SELECT id, {', '.join(EVENT_FIELDS)} FROM activity_events WHERE id > ? ORDER BY id",
+                           (min(upto.values(), default=0),)):
+        for name in kinds:
+            if ev["id"] > upto[name]:
+                rollups[name].apply(ev)
+    return rollups
+
+
+def _write(conn, events, snapshots, prune):
+    """Appends events and saves the given rollup snapshots as of the last one."""
+    if events:
+        conn.executemany(f"INSERT INTO activity_events ({', '.join(EVENT_FIELDS)}) VALUES ({', '.join('?' * len(EVENT_FIELDS))})",
+                         [tuple(ev[f] for f in EVENT_FIELDS) for ev in events])
+    upto = conn.execute("SELECT COALESCE(MAX(id), 0) FROM activity_events").fetchone()[0]
+    conn.executemany("INSERT OR REPLACE INTO activity_checkpoints (name, upto, state) VALUES (?, ?, ?)",
+                     [(name, upto, state) for name, state in snapshots.items()])
+    if prune:
+        # Events every rollup has moved past are no longer needed for a rebuild.
+        # The one at MIN(upto) stays: an emptied table would hand out ids from 1
+        # again, below the checkpoints, and the next rebuild would skip them.
+        conn.execute("DELETE FROM activity_events WHERE id < (SELECT MIN(upto) FROM activity_checkpoints)")
+
+
+class ActivityLog:
+    def __init__(self, kinds=ROLLUPS):
+        self.kinds = kinds
+        self.rollups = {name: kind() for name, kind in kinds.items()}
+        self.pending = []
+        self._since = {}   # name -> events recorded after its snapshot()
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._last_checkpoint = time.monotonic()
+
+    async def load(self):
+        """Rebuilds the rollups from the last checkpoints and the log (before start())."""
+        self.rollups = await database.read(_load, self.kinds)
+
+    def record(self, user_id, xp=0, flames=0, channel_id=None, reaction=False, fight=False,
+               hg_kills=0, hg_first_blood=False, hg_play=False, hg_rank=0, badge=None, ship=None):
+        ev = {"at": time.time(), "user_id": user_id, "xp": xp, "flames": flames, "channel_id": channel_id,
+              "reaction": int(reaction), "fight": int(fight), "hg_kills": hg_kills,
+              "hg_first_blood": int(hg_first_blood), "hg_play": int(hg_play), "hg_rank": hg_rank,
+              "badge": badge, "ship": ship}
+        for r in self.rollups.values():
+            r.apply(ev)
+        for since in self._since.values():
+            since.append(ev)
+        self.pending.append(ev)
+
+    def snapshot(self, name):
+        """Copy of a rollup for its report. Until reset(name) or release(name),
+        the events recorded after it are kept aside as well."""
+        self._since[name] = []
+        return self.rollups[name].copy()
+
+    def release(self, name):
+        """The report was not sent: the rollup simply keeps everything."""
+        self._since.pop(name, None)
+
+    async def flush(self, checkpoint=False, prune=False):
+        """Writes pending events; with checkpoint, snapshots every rollup in the same
+        transaction. prune drops the events every checkpoint has moved past."""
+        async with self._lock:
+            events, self.pending = self.pending, []
+            # Snapshots are taken here, on the loop, so they match the events exactly
+            snapshots = {name: r.dump() for name, r in self.rollups.items()} if checkpoint else {}
+            if not events and not snapshots:
+                return
+            try:
+                await database.transaction(_write, events, snapshots, prune)
+            except Exception:
+                self.pending[:0] = events
+                raise
+            if checkpoint:
+                self._last_checkpoint = time.monotonic()
+
+    async def reset(self, name):
+        """After a report went out: the rollup keeps only what came in since its snapshot()."""
+        rollup = self.kinds[name]()
+        for ev in self._since.pop(name, ()):
+            rollup.apply(ev)
+        self.rollups[name] = rollup
+        await self.flush(checkpoint=True, prune=True)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(FLUSH_SECONDS)
+            try:
+                await self.flush(checkpoint=time.monotonic() - self._last_checkpoint >= CHECKPOINT_SECONDS)
+            except Exception as e:
+                print(f"Activity log flush failed: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush(checkpoint=True)
@@ -1,13 +1,12 @@
 import discord
 from discord.ext import commands
 import random
-import io
-import aiohttp
 import sys
 import json
-import os
+import avatars
+import render
+import branding
 from datetime import datetime, timezone
-from PIL import Image, ImageDraw, ImageOps, ImageFilter
 
 class DungeonAsk(commands.Cog):
     def __init__(self, bot):
@@ -17,41 +16,11 @@ class DungeonAsk(commands.Cog):
     async def create_ask_lobby(self, u1_url, u2_url, title="DM REQUEST"):
         """Generates visual for the request using square avatars and fiery theme."""
         try:
-            canvas_width = 1200
-            canvas_height = 600
-            canvas = Image.new("RGBA", (canvas_width, canvas_height), (15, 0, 8, 255))
-            draw = ImageDraw.Draw(canvas)
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(u1_url) as r1, session.get(u2_url) as r2:
-                    p1_data = io.BytesIO(await r1.read())
-                    p2_data = io.BytesIO(await r2.read())
-
-            av_size = 350
-            av1 = Image.open(p1_data).convert("RGBA").resize((av_size, av_size))
-            av2 = Image.open(p2_data).convert("RGBA").resize((av_size, av_size))
-
-            def draw_glow(draw_obj, pos, size, color):
-                for i in range(15, 0, -1):
-                    alpha = int(255 * (1 - i/15))
-                    draw_obj.rectangle([pos[0]-i, pos[1]-i, pos[0]+size+i, pos[1]+size+i], outline=(*color, alpha), width=2)
-
-            draw_glow(draw, (100, 120), av_size, (255, 20, 147)) 
-            draw_glow(draw, (750, 120), av_size, (255, 0, 0))   
-
-            canvas.paste(av1, (100, 120), av1)
-            canvas.paste(av2, (750, 120), av2)
-
-            draw.text((500, 50), title, fill=(255, 255, 255), stroke_width=5, stroke_fill=(0,0,0))
-            draw.text((550, 250), "VS", fill=(255, 0, 0), stroke_width=8, stroke_fill=(0,0,0))
-
-            buf = io.BytesIO()
-            canvas.save(buf, format="PNG")
-            buf.seek(0)
-            return buf
+            u1_data, u2_data = await avatars.fetch_pair(u1_url, u2_url)
         except Exception as e:
             print(f"Ask Visual Error: {e}")
             return None
+        return await render.card(render.ask_card, u1_data, u2_data, title)
 
     @commands.command(name="ask")
     async def ask(self, ctx, member: discord.Member):
@@ -63,12 +32,15 @@ class DungeonAsk(commands.Cog):
         
         # Phase 1: Initial Selection Card
         img = await self.create_ask_lobby(ctx.author.display_avatar.url, member.display_avatar.url, "INTERACTION PENDING")
-        file = discord.File(img, filename="ask.png")
         
         embed = main_mod.fiery_embed("🔞 ASK TO DM ALERT 🔞", 
             f"{ctx.author.mention} is signaling {member.mention}.\n\n"
             "**Select the nature of your request below:**")
-        embed.set_image(url="attachment://ask.png")
+        # Text-only card when the render pool is busy or the avatars failed
+        files = []
+        if img:
+            files.append(discord.File(img.fp, filename=img.filename("ask")))
+            embed.set_image(url=f"attachment://{img.filename('ask')}")
         
         class InitialView(discord.ui.View):
             def __init__(self, cog, requester, target):
@@ -97,7 +69,7 @@ class DungeonAsk(commands.Cog):
                 async def select_callback(sel_interaction: discord.Interaction):
                     if sel_interaction.user.id != self.requester.id: return
                     
-                    u_data = main_mod.get_user(self.requester.id)
+                    u_data = await main_mod.get_user_async(self.requester.id)
                     lvl = (u_data['balance'] // 5000) + 1
                     
                     # Intent formatting: Bold and focused
@@ -144,10 +116,9 @@ class DungeonAsk(commands.Cog):
                             await inter.response.send_message(content=self.req.mention, embed=fail_emb)
                             self.stop()
 
-                    files = []
-                    if os.path.exists("LobbyTopRight.jpg"):
-                        files.append(discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg"))
+                    if branding.available():
                         final_embed.set_author(name="VOYEUR NOTIFICATION", icon_url="attachment://LobbyTopRight.jpg")
+                    files = branding.attach(final_embed)
 
                     await sel_interaction.response.send_message(content=self.target.mention, embed=final_embed, files=files, view=RecipientView(self.requester, self.target))
 
@@ -184,7 +155,7 @@ class DungeonAsk(commands.Cog):
 
                 await interaction.response.send_message(content=self.target.mention, embed=play_embed, view=PlayView(self.requester, self.target))
 
-        await ctx.send(file=file, embed=embed, view=InitialView(self, ctx.author, member))
+        await ctx.send(files=files, embed=embed, view=InitialView(self, ctx.author, member))
 
 async def setup(bot):
     await bot.add_cog(DungeonAsk(bot))
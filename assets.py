@@ -0,0 +1,95 @@
+import io
+import threading
+
+from PIL import Image
+
+# ===== STATIC ASSET REGISTRY =====
+# The images shipped next to the bot are read once at startup instead of per
+# call: raw bytes for attaching, and decoded RGBA copies already resized to the
+# canvases the card painters draw on. fiery_embed and branding.attach stop
+# stat'ing/reading the disk, and the render workers (forked after load()) get
+# the decoded backgrounds for free. `!reload assets` re-reads everything.
+
+# Files kept in memory as raw bytes
+FILES = (
+    "LobbyTopRight.jpg",
+    "1v1Background.jpg",
+)
+
+# Decoded variants: path -> {canvas size: (resize to, crop box or None)}
+PRESETS = {
+    "1v1Background.jpg": {
+        (1000, 700): ((1000, 1000), (0, 50, 1000, 750)),  # Arena kill frame
+        (1000, 500): ((1000, 500), None),                 # Private duel card
+    },
+}
+
+_raw = {}
+_images = {}
+_loaded = False
+_lock = threading.Lock()
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _decode(data, resize, crop):
+    img = Image.open(io.BytesIO(data)).convert("RGBA").resize(resize)
+    return img.crop(crop) if crop else img
+
+
+def load():
+    """(Re)reads every registered file. Missing files are simply absent."""
+    global _raw, _images, _loaded
+    raw, images = {}, {}
+    for path in set(FILES) | set(PRESETS):
+        data = _read(path)
+        if data is None:
+            print(f"Asset missing: {path}")
+            continue
+        raw[path] = data
+        for size, (resize, crop) in PRESETS.get(path, {}).items():
+            try:
+                images[(path, size)] = _decode(data, resize, crop)
+            except Exception as e:
+                print(f"Asset decode failed for {path} {size}: {e}")
+    with _lock:
+        _raw, _images, _loaded = raw, images, True
+
+
+def ensure_loaded():
+    if not _loaded:
+        load()
+
+
+def exists(path):
+    ensure_loaded()
+    return path in _raw
+
+
+def raw(path):
+    """File bytes, or None if the file wasn't there at load time."""
+    ensure_loaded()
+    return _raw.get(path)
+
+
+def image(path, size):
+    """Shared decoded image at a PRESETS size (read-only: copy before drawing), or None."""
+    ensure_loaded()
+    return _images.get((path, size))
+
+
+def file_obj(path):
+    """Fresh BytesIO over the cached bytes, for discord.File."""
+    data = raw(path)
+    return io.BytesIO(data) if data is not None else None
+
+
+def stats():
+    ensure_loaded()
+    return {"files": len(_raw), "bytes": sum(map(len, _raw.values())), "images": len(_images)}
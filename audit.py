@@ -0,0 +1,159 @@
+import asyncio
+import os
+import time
+from collections import Counter, deque
+
+import discord
+
+import branding
+
+# ===== AUDIT QUEUE =====
+# Every stat update, battle, milestone and voyeur event used to await its own
+# channel.send (plus a fetch_user and a logo upload), so a busy battle put
+# dozens of audit messages in the same rate-limit bucket gameplay was using,
+# and the battle waited on them. Audit entries are now queued with post(),
+# which never blocks or raises. One consumer per channel sends them:
+#   - up to MAX_EMBEDS embeds per message (6000 characters in total), with
+#     the text entries of the batch joined into the message content
+#   - at most one message every SEND_INTERVAL seconds (Discord allows 5 per
+#     5s per channel; this stays under it with room for the odd direct send)
+#   - the lobby logo is uploaded once per message, or not at all once the
+#     branding CDN copy is live
+# When a channel has MAX_PENDING entries waiting, new ones are dropped and
+# counted by title; the consumer posts a single summary of what was dropped
+# once it catches up, so an overload costs detail, never gameplay latency.
+
+MAX_PENDING = int(os.getenv("AUDIT_MAX_PENDING", "300"))   # Entries queued per channel
+SEND_INTERVAL = float(os.getenv("AUDIT_SEND_INTERVAL", "1.5"))
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+MAX_CONTENT = 2000
+
+_bot = None
+_channels = {}   # channel_id -> _ChannelQueue
+
+
+class _ChannelQueue:
+    __slots__ = ("channel_id", "items", "dropped", "wake", "task", "sent")
+
+    def __init__(self, channel_id):
+        self.channel_id = channel_id
+        self.items = deque()      # (content, embed)
+        self.dropped = Counter()  # title -> entries dropped while full
+        self.wake = asyncio.Event()
+        self.task = None
+        self.sent = 0
+
+
+def post(channel_id, embed=None, content=None):
+    """Queues an audit entry for channel_id. Returns False if it was dropped."""
+    q = _channels.get(channel_id)
+    if q is None:
+        q = _channels[channel_id] = _ChannelQueue(channel_id)
+    if len(q.items) >= MAX_PENDING:
+        title = embed.title if embed is not None and embed.title else (content or "Untitled")[:60]
+        q.dropped[title] += 1
+        return False
+    q.items.append((content, embed))
+    if _bot is not None and (q.task is None or q.task.done()):
+        q.task = asyncio.create_task(_consume(q))
+    q.wake.set()
+    return True
+
+
+def _attachment_names(embed):
+    refs = (embed.thumbnail.url, embed.image.url, embed.author.icon_url, embed.footer.icon_url)
+    return {r[len("attachment://"):] for r in refs if r and r.startswith("attachment://")}
+
+
+def _files(embeds):
+    """One upload per distinct attachment name in the batch (audit embeds only use the logo)."""
+    files = {}
+    for e in embeds:
+        for name in _attachment_names(e):
+            for f in branding.attach(e, "lobby", name):
+                files.setdefault(f.filename, f)
+    return list(files.values())
+
+
+def _take_batch(q):
+    """Pops the entries that fit in one message: (content, embeds)."""
+    lines, embeds, chars, content_len = [], [], 0, 0
+    while q.items:
+        content, embed = q.items[0]
+        if embed is not None:
+            if len(embeds) >= MAX_EMBEDS or (embeds and chars + len(embed) > MAX_EMBED_CHARS):
+                break
+        if content and lines and content_len + len(content) + 1 > MAX_CONTENT:
+            break
+        q.items.popleft()
+        if embed is not None:
+            embeds.append(embed)
+            chars += len(embed)
+        if content:
+            lines.append(content[:MAX_CONTENT])
+            content_len += len(content) + 1
+    return "\n".join(lines) or None, embeds
+
+
+def _summary(dropped):
+    total = sum(dropped.values())
+    lines = [f"• {title}: {n}" for title, n in dropped.most_common(10)]
+    if len(dropped) > 10:
+        lines.append(f"• …and {len(dropped) - 10} other kinds")
+    return discord.Embed(title="📉 AUDIT OVERFLOW",
+                         description=f"The ledger was flooded; **{total}** entries were skipped:\n" + "\n".join(lines),
+                         color=0x555555)
+
+
+async def _channel(channel_id):
+    channel = _bot.get_channel(channel_id)
+    if channel is None:
+        channel = await _bot.fetch_channel(channel_id)
+    return channel
+
+
+async def _consume(q):
+    last = 0.0
+    while True:
+        if not q.items and q.dropped:
+            q.items.append((None, _summary(q.dropped)))
+            q.dropped.clear()
+        if not q.items:
+            q.wake.clear()
+            await q.wake.wait()
+            continue
+        wait = last + SEND_INTERVAL - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        content, embeds = _take_batch(q)
+        last = time.monotonic()
+        try:
+            channel = await _channel(q.channel_id)
+            await channel.send(content=content, embeds=embeds, files=_files(embeds))
+            q.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Audit send failed ({len(embeds)} embeds): {e}")
+
+
+def start(bot):
+    """Starts consumers for anything queued before the bot was ready. Safe on every on_ready."""
+    global _bot
+    _bot = bot
+    for q in _channels.values():
+        if q.items and (q.task is None or q.task.done()):
+            q.task = asyncio.create_task(_consume(q))
+
+
+def stop():
+    for q in _channels.values():
+        if q.task is not None:
+            q.task.cancel()
+            q.task = None
+
+
+def stats():
+    return {cid: {"pending": len(q.items), "dropped": sum(q.dropped.values()), "sent": q.sent}
+            for cid, q in _channels.items()}
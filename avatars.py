@@ -0,0 +1,86 @@
+import asyncio
+import os
+
+import aiohttp
+
+from cache import LRUCache
+
+# ===== AVATAR FETCHER =====
+# Every card generator used to open its own aiohttp.ClientSession and pull both
+# avatars from the CDN again. There is now one session for the whole bot
+# (opened and closed by main()) and a byte-capped LRU of raw avatar bytes keyed
+# by URL in front of it. Discord avatar URLs embed the avatar hash, so a changed
+# avatar is a new key. Decoding happens in the render workers (render.py).
+
+FETCH_TIMEOUT = 10                                                       # Seconds per avatar download
+AVATAR_TTL = int(os.getenv("AVATAR_CACHE_TTL", "3600"))                  # Seconds before re-downloading
+BYTES_BUDGET = int(os.getenv("AVATAR_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+raw_cache = LRUCache(BYTES_BUDGET, ttl=AVATAR_TTL)
+
+_session = None
+_inflight = {}   # url -> Task, so two cards asking for one avatar download it once
+
+
+async def start():
+    """Opens the shared session (called from main() before the bot connects)."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT))
+    return _session
+
+
+async def close():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def session():
+    """The shared session; opened lazily if a cog renders before main() started it."""
+    if _session is None or _session.closed:
+        await start()
+    return _session
+
+
+async def _download(url):
+    s = await session()
+    async with s.get(str(url)) as r:
+        if r.status != 200:
+            raise aiohttp.ClientResponseError(r.request_info, r.history, status=r.status, message="Avatar download failed")
+        return await r.read()
+
+
+async def _load(url):
+    try:
+        data = await _download(url)
+        raw_cache.put(url, data, size=len(data))
+        return data
+    finally:
+        _inflight.pop(url, None)
+
+
+def _retrieved(task):
+    # Every waiter may have been cancelled; don't let an unread failure log
+    if not task.cancelled():
+        task.exception()
+
+
+async def fetch_bytes(url):
+    """Raw avatar bytes, from cache or the CDN. Raises on a failed download."""
+    url = str(url)
+    data = raw_cache.get(url)
+    if data is not None:
+        return data
+    task = _inflight.get(url)
+    if task is None:
+        # Its own task: a cancelled caller stops waiting, the download carries on for the others
+        task = _inflight[url] = asyncio.ensure_future(_load(url))
+        task.add_done_callback(_retrieved)
+    return await asyncio.shield(task)
+
+
+async def fetch_pair(url1, url2):
+    """Raw bytes of both avatars of a two-person card, fetched concurrently."""
+    return await asyncio.gather(fetch_bytes(url1), fetch_bytes(url2))
@@ -0,0 +1,172 @@
+import os
+import time
+from urllib.parse import parse_qs, urlparse
+
+import discord
+from discord.ext import tasks
+
+import assets
+import database
+
+# ===== BRANDING CDN =====
+# Almost every reply used to re-upload LobbyTopRight.jpg (~214 KB) as an
+# attachment just to show it as a thumbnail. Each branding image is now
+# uploaded once to a private asset channel; embeds point at the returned CDN
+# URL and send no file at all.
+#
+# Discord signs attachment URLs and they expire (the `ex` query parameter,
+# hex unix time). The message id is persisted, so a refresh just re-fetches
+# the message for a freshly signed URL; the file is only uploaded again if the
+# message is gone or the image on disk changed. Until a URL is available every
+# caller falls back to attaching the local file exactly as before, which is
+# also all that happens when ASSET_CHANNEL_ID is not configured.
+
+ASSETS = {
+    "lobby": "LobbyTopRight.jpg",
+}
+
+ASSET_CHANNEL_ID = int(os.getenv("ASSET_CHANNEL_ID", "0"))   # Private channel; 0 = attach local files only
+REFRESH_MARGIN = 6 * 3600   # Re-sign URLs this long before they expire
+DEFAULT_TTL = 20 * 3600     # Assumed lifetime when a URL carries no `ex`
+
+_bot = None
+_urls = {}   # slot -> (url, expires_at)
+
+
+def ensure_schema(conn):
+    conn.execute("""CREATE TABLE IF NOT EXISTS branding_assets (
+        slot TEXT PRIMARY KEY,
+        channel_id INTEGER,
+        message_id INTEGER,
+        url TEXT,
+        expires_at REAL,
+        file_sig TEXT
+    )""")
+
+
+def _expiry(url):
+    try:
+        return float(int(parse_qs(urlparse(url).query)["ex"][0], 16))
+    except (KeyError, ValueError, IndexError):
+        return time.time() + DEFAULT_TTL
+
+
+def _signature(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{int(st.st_mtime)}"
+
+
+def url(slot="lobby"):
+    """CDN URL for a branding slot, or None while it isn't published / is about to expire."""
+    entry = _urls.get(slot)
+    if entry and entry[1] - 60 > time.time():
+        return entry[0]
+    return None
+
+
+def available(slot="lobby"):
+    """True if the image can be shown, via CDN or the local file."""
+    return url(slot) is not None or assets.exists(ASSETS[slot])
+
+
+def attach(embed, slot="lobby", filename=None):
+    """Files to send alongside `embed` for a branding image.
+
+    With a live CDN URL, every `attachment://<filename>` reference in the embed
+    is pointed at the CDN and nothing needs uploading ([]). Otherwise returns
+    the local file under `filename` as before (or [] if it's missing on disk).
+    """
+    path = ASSETS[slot]
+    filename = filename or os.path.basename(path)
+    cdn = url(slot)
+    if cdn:
+        if embed is not None:
+            _swap(embed, f"attachment://{filename}", cdn)
+        return []
+    data = assets.file_obj(path)
+    if data is None:
+        return []
+    return [discord.File(data, filename=filename)]
+
+
+def _swap(embed, old, new):
+    if embed.thumbnail and embed.thumbnail.url == old:
+        embed.set_thumbnail(url=new)
+    if embed.image and embed.image.url == old:
+        embed.set_image(url=new)
+    if embed.author and embed.author.icon_url == old:
+        embed.set_author(name=embed.author.name, url=embed.author.url, icon_url=new)
+    if embed.footer and embed.footer.icon_url == old:
+        embed.set_footer(text=embed.footer.text, icon_url=new)
+
+
+# --- PUBLISHING ---
+async def _channel():
+    channel = _bot.get_channel(ASSET_CHANNEL_ID)
+    if channel is None:
+        channel = await _bot.fetch_channel(ASSET_CHANNEL_ID)
+    return channel
+
+
+async def _publish(slot, row):
+    path = ASSETS[slot]
+    if not os.path.exists(path):
+        return
+    sig = _signature(path)
+    channel = await _channel()
+
+    message = None
+    if row and row['file_sig'] == sig and row['channel_id'] == channel.id:
+        # Same image already uploaded: re-fetching the message re-signs its URL
+        try:
+            message = await channel.fetch_message(row['message_id'])
+        except (discord.NotFound, discord.Forbidden):
+            message = None
+    if message is None or not message.attachments:
+        message = await channel.send(content=f"branding:{slot}", file=discord.File(path, filename=os.path.basename(path)))
+
+    cdn = message.attachments[0].url
+    expires = _expiry(cdn)
+    _urls[slot] = (cdn, expires)
+    await database.execute("""INSERT OR REPLACE INTO branding_assets (slot, channel_id, message_id, url, expires_at, file_sig)
+                              VALUES (?, ?, ?, ?, ?, ?)""", (slot, channel.id, message.id, cdn, expires, sig))
+
+
+async def refresh(force=False):
+    """Publishes/re-signs every slot that is missing or close to expiry."""
+    if not ASSET_CHANNEL_ID:
+        return
+    rows = {r['slot']: r for r in await database.fetchall("SELECT * FROM branding_assets")}
+    for slot, path in ASSETS.items():
+        row = rows.get(slot)
+        if slot not in _urls and row and os.path.exists(path) and row['file_sig'] == _signature(path):
+            _urls[slot] = (row['url'], row['expires_at'])
+        entry = _urls.get(slot)
+        if not force and entry and entry[1] - REFRESH_MARGIN > time.time():
+            continue
+        try:
+            await _publish(slot, row)
+        except Exception as e:
+            print(f"Branding publish failed for {slot}: {e}")
+
+
+@tasks.loop(hours=1)
+async def refresh_loop():
+    await refresh()
+
+
+async def start(bot):
+    """Called from on_ready: loads/uploads the assets, then keeps their URLs signed."""
+    global _bot
+    _bot = bot
+    if not ASSET_CHANNEL_ID:
+        print("ASSET_CHANNEL_ID not set: branding images are attached from disk")
+        return
+    await refresh()
+    if not refresh_loop.is_running():
+        refresh_loop.start()
+
+
+def stop():
+    if refresh_loop.is_running():
+        refresh_loop.cancel()
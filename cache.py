@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ===== SHARED LRU CACHE =====
+# Small in-process LRU with a time-to-live and a memory cap, used for anything
+# we'd otherwise re-download or re-render (avatars, generated cards). Sizes are
+# caller-supplied byte estimates so raw bytes and decoded images can share one
+# budget. Thread-safe, since DB/render workers may touch it off the event loop.
+
+
+class LRUCache:
+    """LRU keyed by anything hashable, bounded by total bytes and per-entry age."""
+
+    def __init__(self, max_bytes, ttl=None, max_entries=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, size, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size=1, ttl=None):
+        """Stores value; anything larger than the whole budget is simply not cached."""
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (value, size, expires)
+            self.bytes += size
+            while self._data and (self.bytes > self.max_bytes or
+                                  (self.max_entries and len(self._data) > self.max_entries)):
+                self._drop(next(iter(self._data)))
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._drop(key)
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def _drop(self, key):
+        _, size, _ = self._data.pop(key)
+        self.bytes -= size
+
+    def stats(self):
+        return {"entries": len(self._data), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+
+from cache import LRUCache
+from encoder import EXTENSIONS
+from render import Rendered
+
+# ===== RENDERED CARD CACHE =====
+# Cards whose inputs are fixed for the day (!ship: same pair, same avatars,
+# same percent) are kept as encoded bytes so a repeat is an upload, not a
+# download + render. Keys always start with the UTC day, so yesterday's
+# entries simply stop matching and age out of the LRU.
+#
+# With a spill directory set, every card is also written to disk (one file per
+# key, named by day) so a restart or an LRU eviction doesn't cost a re-render.
+# Files from previous days are deleted the first time a new day is written.
+
+
+def utc_day():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class CardCache:
+    def __init__(self, max_bytes, spill_dir=None):
+        self.mem = LRUCache(max_bytes)
+        self.spill_dir = spill_dir
+        self._pruned_day = None
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def _path(self, day, key, ext):
+        return os.path.join(self.spill_dir, f"{day}_{self._digest(key)}.{ext}")
+
+    def get(self, day, key):
+        """A fresh Rendered for (day, key), or None."""
+        hit = self.mem.get((day, key))
+        if hit is None and self.spill_dir:
+            hit = self._load(day, key)
+            if hit is not None:
+                self.mem.put((day, key), hit, size=len(hit[0]))
+        if hit is None:
+            return None
+        data, ext = hit
+        return Rendered(data, ext, {"format": ext, "bytes": len(data), "ms": 0.0, "attempts": 0, "fits": True, "cached": True})
+
+    def put(self, day, key, rendered):
+        data = rendered.fp.getvalue()
+        self.mem.put((day, key), (data, rendered.ext), size=len(data))
+        if self.spill_dir:
+            self._spill(day, key, data, rendered.ext)
+
+    # --- DISK SPILL (called from the event loop; files are small and local) ---
+    def _load(self, day, key):
+        for ext in EXTENSIONS.values():
+            try:
+                with open(self._path(day, key, ext), "rb") as f:
+                    return f.read(), ext
+            except OSError:
+                continue
+        return None
+
+    def _spill(self, day, key, data, ext):
+        try:
+            self._prune(day)
+            tmp = self._path(day, key, ext) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(day, key, ext))
+        except OSError as e:
+            print(f"Card cache spill failed: {e}")
+
+    def _prune(self, day):
+        with self._lock:
+            if self._pruned_day == day:
+                return
+            self._pruned_day = day
+        for name in os.listdir(self.spill_dir):
+            if not name.startswith(day + "_"):
+                try:
+                    os.remove(os.path.join(self.spill_dir, name))
+                except OSError:
+                    pass
@@ -2,10 +2,10 @@ import discord
 from discord.ext import commands
 import random
 import sys
-import os
 import asyncio
 from datetime import datetime, timedelta, timezone
-import inspect
+
+import branding
 
 # --- ENHANCED VISUAL CARD RENDERER ---
 def get_visual_card(value):
@@ -217,9 +217,8 @@ class FieryCasino(commands.Cog):
 
     async def get_user_data(self, user_id):
         main_mod = sys.modules['__main__']
-        if inspect.iscoroutinefunction(main_mod.get_user):
-            return await main_mod.get_user(user_id)
-        return main_mod.get_user(user_id)
+        # Executor-backed lookup so the event loop never waits on SQLite
+        return await main_mod.get_user_async(user_id)
 
     def draw_card(self):
         return random.randint(2, 11)
@@ -244,11 +243,7 @@ class FieryCasino(commands.Cog):
         embed = main_mod.fiery_embed("BONE TOSS PROTOCOL", desc, color=0x800000)
         embed.add_field(name="🎯 Target Sum", value="`Pending...`", inline=True)
         embed.add_field(name="💸 Current Bet", value="`Pending...`", inline=True)
-        if os.path.exists("LobbyTopRight.jpg"):
-            file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-            await ctx.send(file=file, embed=embed, view=view)
-        else:
-            await ctx.send(embed=embed, view=view)
+        await ctx.send(files=branding.attach(embed), embed=embed, view=view)
 
     async def execute_dice_logic(self, interaction, guess, bet):
         main_mod = sys.modules['__main__']
@@ -284,11 +279,7 @@ class FieryCasino(commands.Cog):
             f"💰 **Current Balance:** `{user['balance']:,}` Flames"
         )
         embed = main_mod.fiery_embed("BLACKJACK PROTOCOL", desc, color=0x3b0a0a)
-        if os.path.exists("LobbyTopRight.jpg"):
-            file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-            await ctx.send(file=file, embed=embed, view=view)
-        else:
-            await ctx.send(embed=embed, view=view)
+        await ctx.send(files=branding.attach(embed), embed=embed, view=view)
 
     async def start_blackjack_duel(self, interaction, bet):
         p_hand = [self.draw_card(), self.draw_card()]
@@ -358,11 +349,7 @@ class FieryCasino(commands.Cog):
         embed = main_mod.fiery_embed("ROULETTE PROTOCOL", desc, color=0x641e16)
         embed.add_field(name="🎡 Targeted Outcome", value="`Pending...`", inline=True)
         embed.add_field(name="💸 Current Bet", value="`Pending...`", inline=True)
-        if os.path.exists("LobbyTopRight.jpg"):
-            file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-            await ctx.send(file=file, embed=embed, view=view)
-        else:
-            await ctx.send(embed=embed, view=view)
+        await ctx.send(files=branding.attach(embed), embed=embed, view=view)
 
     async def execute_roulette_logic(self, interaction, choice, bet):
         main_mod = sys.modules['__main__']
@@ -406,11 +393,7 @@ class FieryCasino(commands.Cog):
         )
         embed = main_mod.fiery_embed("SLOT PROTOCOL", desc, color=0xd4af37)
         embed.add_field(name="💸 Current Bet", value="`Pending...`", inline=True)
-        if os.path.exists("LobbyTopRight.jpg"):
-            file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-            await ctx.send(file=file, embed=embed, view=view)
-        else:
-            await ctx.send(embed=embed, view=view)
+        await ctx.send(files=branding.attach(embed), embed=embed, view=view)
 
     async def execute_slots_logic(self, interaction, bet):
         main_mod = sys.modules['__main__']
@@ -1,18 +1,17 @@
 import discord
 from discord.ext import commands, tasks
-import sqlite3
-import os
 import sys
 import asyncio
+import database
+import branding
+import resolver
+import audit
+from reward_sink import RewardSink
+from activity import ActivityLog
 from datetime import datetime, timedelta, timezone, time
 
-# Database path matching your shop.py logic
-if os.path.exists("/app/data"):
-    DATABASE_PATH = "/app/data/economy.db"
-else:
-    if not os.path.exists("data"):
-        os.makedirs("data")
-    DATABASE_PATH = "data/economy.db"
+# Database path shared with main/shop (resolved in database.py)
+DATABASE_PATH = database.DATABASE_PATH
 
 # Configuration
 AUDIT_CHANNEL_ID = 1457706060199996570
@@ -22,35 +21,198 @@ SELFIE_CHANNELS = {
     1457709522020990986: (3000, 5000),
 }
 
+# ===== DAILY REPORT PAGES =====
+# The 9 PM ledger used to be one embed with a field per active user, which
+# Discord rejects past 25 fields / 6000 characters (and a long user block
+# past the 1024-character field limit). The report is now laid out as pages
+# that respect every limit and sent 10 embeds per message, with the pings
+# split into 2000-character messages.
+
+FIELD_CHARS = 1024
+PAGE_FIELDS = 25
+MESSAGE_CHARS = 6000      # Shared by every embed in one message
+MESSAGE_EMBEDS = 10
+CONTENT_CHARS = 2000
+PAGE_SLACK = 40           # Room for the " (n/N)" added to titles afterwards
+
+DAILY_REPORT = {
+    "title": "🌅 THE MASTER'S DAILY CLIMAX: 09:00 PM 🌅",
+    "description": "The sun sets over the dungeon. The daily ledger is finalized. Every groan, every fight, and every display of skin has been calculated.",
+    "thumb": "harvest.jpg",
+    "flames": "💰 **Total Extracted Flames:**",
+    "xp": "⛓️ **Total Obedience XP Won:**",
+    "breakdown": "📊 **Extraction Breakdown:**",
+    "ships": "💖 **High-Lust Ships (75%+):**",
+    "badges": "🏅 **Achievements/Tiers:**",
+    "note": "*The Master has confirmed your daily extraction value.*",
+    "footer": "🔞 THE DAILY LEDGER IS SEALED 🔞",
+    "pings": "⛓️ **DAILY HARVEST PINGS:** ",
+}
+MANUAL_REPORT = {
+    "title": "🌅 THE MASTER'S MANUAL CLIMAX: OVERRIDE 🌅",
+    "description": "Manual override engaged. Current accumulation report follows.",
+    "thumb": "harvest_manual.jpg",
+    "flames": "💰 **Accumulated Flames:**",
+    "xp": "⛓️ **Accumulated XP:**",
+    "breakdown": "📊 **Breakdown:**",
+    "ships": "💖 **Ships:**",
+    "badges": "🏅 **Badges:**",
+    "note": "*Data will reset at 9 PM Lisbon.*",
+    "footer": None,
+    "pings": "⛓️ **MANUAL SYNC PINGS:** ",
+}
+
+
+def _more(count, shown):
+    """Suffix for the names the rollup didn't keep."""
+    return f" (+{count - len(shown)} more)" if count > len(shown) else ""
+
+
+def user_report(stats, labels, channel_names):
+    """One user's ledger block (UserActivity -> text)."""
+    # --- DETAILED CALCULATION BREAKDOWN ---
+    calc_details = []
+    if stats.reactions > 0:
+        calc_details.append(f"🫦 **Reactions:** `{stats.reactions}` × (25F / 25XP) = **{stats.reactions*25:,}**")
+    for chan_id, count in list(stats.pics.items()):
+        chan_name = channel_names.get(chan_id, f"Stage {chan_id}")
+        xp_rate, flame_rate = SELFIE_CHANNELS.get(chan_id, (0, 0))
+        calc_details.append(f"📸 **#{chan_name}:** `{count}` posts × ({flame_rate}F / {xp_rate}XP) = **{count * flame_rate:,}F / {count * xp_rate:,}XP**")
+    calculation_resume = "\n".join(calc_details) if calc_details else "_No passive extraction detected._"
+
+    # --- DETAILED GAME RESUME ---
+    game_report = ""
+    if stats.fights > 0:
+        game_report += f"\n⚔️ **1v1 Fights Initiated:** {stats.fights}"
+    if stats.hg_plays > 0:
+        marks = ("🥇x{}", "🥈x{}", "🥉x{}", "🏅x{} (4th)", "🎖️x{} (5th)")
+        placements = [mark.format(n) for mark, n in zip(marks, stats.tops) if n > 0]
+        placement_str = " | ".join(placements) if placements else "No Top 5 finishes"
+        game_report += f"\n🏹 **Hunger Games:** {stats.hg_plays} Plays | 💀 {stats.hg_kills} Kills"
+        if stats.hg_first_bloods > 0:
+            game_report += f" | 🩸 **FB:** {stats.hg_first_bloods}"
+        game_report += f"\n🏆 **Placements:** {placement_str}"
+
+    # --- SHIPS & BADGES ---
+    status_report = ""
+    if stats.ships:
+        status_report += f"\n{labels['ships']} {', '.join(stats.ships)}{_more(stats.ship_count, stats.ships)}"
+    if stats.badges:
+        status_report += f"\n{labels['badges']} {', '.join(stats.badges)}{_more(stats.badge_count, stats.badges)}"
+
+    return (
+        f"{labels['flames']} `{stats.flames:,}`\n"
+        f"{labels['xp']} `+{stats.xp:,}`\n"
+        f"{labels['breakdown']}\n{calculation_resume}\n"
+        f"━━━━━━━━━━━━━━"
+        f"{game_report}"
+        f"{status_report}\n\n"
+        f"{labels['note']}"
+    )
+
+
+def _field_chunks(value):
+    """Splits a block on line breaks into field-sized pieces."""
+    chunks, cur = [], ""
+    for line in value.split("\n"):
+        while len(line) > FIELD_CHARS:
+            if cur:
+                chunks.append(cur)
+                cur = ""
+            chunks.append(line[:FIELD_CHARS])
+            line = line[FIELD_CHARS:]
+        if cur and len(cur) + 1 + len(line) > FIELD_CHARS:
+            chunks.append(cur)
+            cur = line
+        else:
+            cur = f"{cur}\n{line}" if cur else line
+    if cur.strip():
+        chunks.append(cur)
+    return chunks or ["\u200b"]
+
+
+def _new_page(labels, first):
+    embed = discord.Embed(title=labels["title"], description=labels["description"] if first else None,
+                          color=0x8b0000, timestamp=datetime.now(timezone.utc))
+    if first and branding.available():
+        embed.set_thumbnail(url=f"attachment://{labels['thumb']}")
+    if labels["footer"]:
+        embed.set_footer(text=labels["footer"])
+    return embed
+
+
+def build_report_pages(people, labels, channel_names):
+    """[(mention, NAME, UserActivity)] -> embeds within every per-embed limit (runs in a thread)."""
+    pages = [_new_page(labels, True)]
+    for _, name, stats in people:
+        for n, chunk in enumerate(_field_chunks(user_report(stats, labels, channel_names))):
+            field_name = f"👤 {name}" + (" (cont.)" if n else "")
+            page = pages[-1]
+            if len(page.fields) >= PAGE_FIELDS or len(page) + len(field_name) + len(chunk) > MESSAGE_CHARS - PAGE_SLACK:
+                page = _new_page(labels, False)
+                pages.append(page)
+            page.add_field(name=field_name, value=chunk, inline=False)
+    if len(pages) > 1:
+        for n, page in enumerate(pages, 1):
+            page.title = f"{labels['title']} ({n}/{len(pages)})"
+    return pages
+
+
+def message_batches(embeds):
+    """Groups embeds into messages of at most 10 embeds / 6000 characters."""
+    batches, size = [[]], 0
+    for embed in embeds:
+        if batches[-1] and (len(batches[-1]) >= MESSAGE_EMBEDS or size + len(embed) > MESSAGE_CHARS):
+            batches.append([])
+            size = 0
+        batches[-1].append(embed)
+        size += len(embed)
+    return batches
+
+
+def ping_chunks(prefix, mentions):
+    """The ping line split into messages under the content limit."""
+    chunks, cur = [], prefix
+    for mention in mentions:
+        sep = "" if cur == prefix else ", "
+        if len(cur) + len(sep) + len(mention) > CONTENT_CHARS:
+            chunks.append(cur)
+            cur, sep = prefix, ""
+        cur += sep + mention
+    chunks.append(cur)
+    return chunks
+
+
 class Collect(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.db_path = DATABASE_PATH
-        # NEW STRUCTURE: Tracking detailed counts for exhibition and reactions
-        # ADDED: Expanded log to track Fights, HG (kills/fb/plays/placements), Badges, and Ships
-        self.hourly_log = {} # Stores {user_id: {'xp': 0, 'flames': 0, 'pics': {}, 'reactions': 0, 'fights': 0, 'hg_kills': 0, 'hg_first_bloods': 0, 'hg_plays': 0, 'hg_top1': 0, 'hg_top2': 0, 'hg_top3': 0, 'hg_top4': 0, 'hg_top5': 0, 'badges': [], 'ships': []}}
-        # ADDED: Buffer for grouping reactions every 3 hours to prevent spam
-        self.reaction_buffer = {} # {user_id: count}
+        # UPDATED: Activity is appended to activity_events; the reports read its
+        # rollups ("daily" for the 9 PM ledger, "vibration" for the 3-hour reaction
+        # report), which survive restarts via checkpoints (see activity.py)
+        self.activity = ActivityLog()
+        # ADDED: Reaction/selfie rewards are summed here and written in batches
+        self.rewards = RewardSink()
+        self.rewards.start()
         self.audit_task.start()
         # ADDED: 3-hour vibration report task
         self.vibration_report_task.start()
 
+    async def cog_unload(self):
+        self.audit_task.cancel()
+        self.vibration_report_task.cancel()
+        # Write the buffered rewards before the cog (or the bot) goes away
+        await self.rewards.close()
+        await self.activity.close()
+
     def get_db_connection(self):
-        conn = sqlite3.connect(self.db_path, timeout=30.0)
-        conn.row_factory = sqlite3.Row
-        return conn
+        # Shared pool lease (see database.py)
+        return database.connection()
 
-    async def send_immediate_audit(self, user_id, xp, flames, source_desc, channel_name=None):
-        """ADDED: Sends an immediate erotic log to the audit channel for every action."""
-        # FIX: Ensure we attempt to fetch the channel if not in cache
-        audit_channel = self.bot.get_channel(AUDIT_CHANNEL_ID)
-        if not audit_channel:
-            try:
-                audit_channel = await self.bot.fetch_channel(AUDIT_CHANNEL_ID)
-            except:
-                return
-        
-        user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+    def send_immediate_audit(self, user_id, xp, flames, source_desc, channel_name=None):
+        """ADDED: Queues an immediate erotic log to the audit channel for every action."""
+        user = self.bot.get_user(user_id)
+        name = user.display_name if user else f"Subject {user_id}"
         
         embed = discord.Embed(
             title="🕵️ VOYEUR FEED: ACTIVITY DETECTED",
@@ -59,14 +221,12 @@ class Collect(commands.Cog):
             timestamp=datetime.now(timezone.utc)
         )
         
-        image_path = "LobbyTopRight.jpg"
-        if os.path.exists(image_path):
-            file = discord.File(image_path, filename="audit_thumb.jpg")
+        if branding.available():
             embed.set_thumbnail(url="attachment://audit_thumb.jpg")
         
         target_info = f"Stage: **#{channel_name}**" if channel_name else "Interaction: **Universal**"
         
-        embed.add_field(name="<:FIERY_fp_axdevilleft:1310628556983898142> Name", value=user.mention, inline=True)
+        embed.add_field(name="<:FIERY_fp_axdevilleft:1310628556983898142> Name", value=f"<@{user_id}>", inline=True)
         embed.add_field(name="<:FIERY_heart_devilred:1329474462365777920> Protocol", value=source_desc, inline=True)
         embed.add_field(name="📍 Location", value=target_info, inline=True)
         embed.add_field(name="💰 Harvest", value=f"+{flames} Flames | +{xp} XP", inline=False)
@@ -74,60 +234,25 @@ class Collect(commands.Cog):
         embed.set_footer(text="🔞 THE MASTER'S EYES ARE EVERYWHERE 🔞")
         
         # ADDED: Sexualized Voyeur Note
-        embed.add_field(name="📝 VOYEUR NOTE", value=f"Asset {user.display_name} has yielded to the exhibition protocol. Their submission is being monetized.", inline=False)
+        embed.add_field(name="📝 VOYEUR NOTE", value=f"Asset {name} has yielded to the exhibition protocol. Their submission is being monetized.", inline=False)
         
-        if os.path.exists(image_path):
-            await audit_channel.send(file=file, embed=embed)
-        else:
-            await audit_channel.send(embed=embed)
+        audit.post(AUDIT_CHANNEL_ID, embed)
 
-    def update_user_stats(self, user_id, xp, flames, channel_id=None, is_reaction=False, is_fight=False, hg_kill=0, hg_fb=False, hg_play=False, hg_rank=0, badge=None, ship_partner=None):
+    async def update_user_stats(self, user_id, xp, flames, channel_id=None, is_reaction=False, is_fight=False, hg_kill=0, hg_fb=False, hg_play=False, hg_rank=0, badge=None, ship_partner=None):
         """Adds rewards to the database and logs for the daily audit."""
-        with self.get_db_connection() as conn:
-            # Note: Assuming 'xp' and 'balance' (flames) columns exist in your users table
-            conn.execute(
-                "UPDATE users SET xp = xp + ?, balance = balance + ? WHERE id = ?",
-                (xp, flames, user_id)
-            )
-            conn.commit()
-        
-        # Track for the fancy audit report
-        if user_id not in self.hourly_log:
-            self.hourly_log[user_id] = {'xp': 0, 'flames': 0, 'pics': {}, 'reactions': 0, 'fights': 0, 'hg_kills': 0, 'hg_first_bloods': 0, 'hg_plays': 0, 'hg_top1': 0, 'hg_top2': 0, 'hg_top3': 0, 'hg_top4': 0, 'hg_top5': 0, 'badges': [], 'ships': []}
-        
-        self.hourly_log[user_id]['xp'] += xp
-        self.hourly_log[user_id]['flames'] += flames
-        
-        if is_reaction:
-            self.hourly_log[user_id]['reactions'] += 1
-            # MODIFIED: Instead of immediate audit, we now buffer reactions for 3h
-            self.reaction_buffer[user_id] = self.reaction_buffer.get(user_id, 0) + 1
-        
-        # ADDED: Stats for Games and Ships
-        if is_fight: self.hourly_log[user_id]['fights'] += 1
-        if hg_kill > 0: self.hourly_log[user_id]['hg_kills'] += hg_kill
-        if hg_fb: self.hourly_log[user_id]['hg_first_bloods'] += 1
-        if hg_play: self.hourly_log[user_id]['hg_plays'] += 1
-        
-        # ADDED: HG Placement Tracking
-        if hg_rank == 1: self.hourly_log[user_id]['hg_top1'] += 1
-        elif hg_rank == 2: self.hourly_log[user_id]['hg_top2'] += 1
-        elif hg_rank == 3: self.hourly_log[user_id]['hg_top3'] += 1
-        elif hg_rank == 4: self.hourly_log[user_id]['hg_top4'] += 1
-        elif hg_rank == 5: self.hourly_log[user_id]['hg_top5'] += 1
-        
-        if badge: self.hourly_log[user_id]['badges'].append(badge)
-        if ship_partner: self.hourly_log[user_id]['ships'].append(ship_partner)
+        # Buffered: written with everyone else's by the next sink flush
+        self.rewards.add(user_id, xp, flames)
         
+        # Track for the fancy audit report (and the 3-hour reaction report)
+        self.activity.record(user_id, xp, flames, channel_id=channel_id, reaction=is_reaction, fight=is_fight,
+                             hg_kills=hg_kill, hg_first_blood=hg_fb, hg_play=hg_play, hg_rank=hg_rank,
+                             badge=badge, ship=ship_partner)
+
         if channel_id:
-            if channel_id not in self.hourly_log[user_id]['pics']:
-                self.hourly_log[user_id]['pics'][channel_id] = 0
-            self.hourly_log[user_id]['pics'][channel_id] += 1
-            
-            # Trigger immediate audit for post
+            # Trigger immediate audit for post (queued, never awaited on the reward path)
             chan = self.bot.get_channel(channel_id)
             c_name = chan.name if chan else str(channel_id)
-            asyncio.create_task(self.send_immediate_audit(user_id, xp, flames, "Exhibition (Capture)", c_name))
+            self.send_immediate_audit(user_id, xp, flames, "Exhibition (Capture)", c_name)
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -138,7 +263,7 @@ class Collect(commands.Cog):
         if message.channel.id in SELFIE_CHANNELS:
             if message.attachments:
                 xp, flames = SELFIE_CHANNELS[message.channel.id]
-                self.update_user_stats(message.author.id, xp, flames, channel_id=message.channel.id)
+                await self.update_user_stats(message.author.id, xp, flames, channel_id=message.channel.id)
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload):
@@ -146,214 +271,101 @@ class Collect(commands.Cog):
             return
         
         # Every reaction gives 25 XP and 25 Flames
-        self.update_user_stats(payload.user_id, 25, 25, is_reaction=True)
+        await self.update_user_stats(payload.user_id, 25, 25, is_reaction=True)
 
     # MODIFIED: Logic fix for the daily task to ensure it triggers correctly at 9 PM Lisbon (21:00)
     @tasks.loop(time=[time(hour=21, minute=0, second=0)])
     async def audit_task(self):
         """Sends a massive erotic daily summary every day at 9 PM Lisbon Time."""
-        if not self.hourly_log:
+        if not self.activity.rollups["daily"].users:
+            return
+        # Report from a snapshot: whatever comes in while it sends stays for tomorrow
+        daily = self.activity.snapshot("daily")
+        sent = False
+        try:
+            sent = await self.send_report(daily, DAILY_REPORT)
+        finally:
+            if not sent:
+                self.activity.release("daily")
+        if not sent:
             return
-
-        # FIX: Robust channel fetching for tasks
-        audit_channel = self.bot.get_channel(AUDIT_CHANNEL_ID)
-        if not audit_channel:
-            try:
-                audit_channel = await self.bot.fetch_channel(AUDIT_CHANNEL_ID)
-            except:
-                return
-
-        image_path = "LobbyTopRight.jpg"
-        file = None
-        
-        embed = discord.Embed(
-            title="🌅 THE MASTER'S DAILY CLIMAX: 09:00 PM 🌅",
-            description="The sun sets over the dungeon. The daily ledger is finalized. Every groan, every fight, and every display of skin has been calculated.",
-            color=0x8b0000, # Blood Red
-            timestamp=datetime.now(timezone.utc)
-        )
-
-        if os.path.exists(image_path):
-            file = discord.File(image_path, filename="harvest.jpg")
-            embed.set_thumbnail(url="attachment://harvest.jpg")
-
-        # Compile individual reports and pings
-        ping_list = []
-        for user_id, stats in self.hourly_log.items():
-            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
-            user_mention = user.mention if user else f"Subject {user_id}"
-            ping_list.append(user_mention)
-            
-            # --- DETAILED CALCULATION BREAKDOWN ---
-            calc_details = []
-            if stats.get('reactions', 0) > 0:
-                calc_details.append(f"🫦 **Reactions:** `{stats['reactions']}` × (25F / 25XP) = **{stats['reactions']*25:,}**")
-            
-            if stats.get('pics'):
-                for chan_id, count in stats['pics'].items():
-                    chan = self.bot.get_channel(chan_id)
-                    chan_name = chan.name if chan else f"Stage {chan_id}"
-                    xp_rate, flame_rate = SELFIE_CHANNELS.get(chan_id, (0, 0))
-                    total_f = count * flame_rate
-                    total_x = count * xp_rate
-                    calc_details.append(f"📸 **#{chan_name}:** `{count}` posts × ({flame_rate}F / {xp_rate}XP) = **{total_f:,}F / {total_x:,}XP**")
-
-            calculation_resume = "\n".join(calc_details) if calc_details else "_No passive extraction detected._"
-
-            # --- DETAILED GAME RESUME ---
-            game_report = ""
-            if stats.get('fights', 0) > 0:
-                game_report += f"\n⚔️ **1v1 Fights Initiated:** {stats['fights']}"
-            
-            if stats.get('hg_plays', 0) > 0:
-                placements = []
-                if stats.get('hg_top1', 0) > 0: placements.append(f"🥇x{stats['hg_top1']}")
-                if stats.get('hg_top2', 0) > 0: placements.append(f"🥈x{stats['hg_top2']}")
-                if stats.get('hg_top3', 0) > 0: placements.append(f"🥉x{stats['hg_top3']}")
-                if stats.get('hg_top4', 0) > 0: placements.append(f"🏅x{stats['hg_top4']} (4th)")
-                if stats.get('hg_top5', 0) > 0: placements.append(f"🎖️x{stats['hg_top5']} (5th)")
-                placement_str = " | ".join(placements) if placements else "No Top 5 finishes"
-
-                game_report += f"\n🏹 **Hunger Games:** {stats['hg_plays']} Plays | 💀 {stats['hg_kills']} Kills"
-                if stats.get('hg_first_bloods', 0) > 0:
-                    game_report += f" | 🩸 **FB:** {stats['hg_first_bloods']}"
-                game_report += f"\n🏆 **Placements:** {placement_str}"
-            
-            # --- SHIPS & BADGES ---
-            status_report = ""
-            if stats.get('ships'):
-                status_report += f"\n💖 **High-Lust Ships (75%+):** {', '.join(stats['ships'])}"
-            if stats.get('badges'):
-                status_report += f"\n🏅 **Achievements/Tiers:** {', '.join(stats['badges'])}"
-
-            value = (
-                f"💰 **Total Extracted Flames:** `{stats['flames']:,}`\n"
-                f"⛓️ **Total Obedience XP Won:** `+{stats['xp']:,}`\n"
-                f"📊 **Extraction Breakdown:**\n{calculation_resume}\n"
-                f"━━━━━━━━━━━━━━"
-                f"{game_report}"
-                f"{status_report}\n\n"
-                f"*The Master has confirmed your daily extraction value.*"
-            )
-            embed.add_field(name=f"👤 {user.name.upper() if user else 'Unknown Asset'}", value=value, inline=False)
-
-        embed.set_footer(text="🔞 THE DAILY LEDGER IS SEALED 🔞")
-        content = "⛓️ **DAILY HARVEST PINGS:** " + ", ".join(ping_list)
-        if file:
-            await audit_channel.send(content=content, embed=embed, file=file)
-        else:
-            await audit_channel.send(content=content, embed=embed)
-        
         # SCHEDULED RESET: Clear logs after the 9 PM report
-        self.hourly_log.clear()
+        await self.activity.reset("daily")
 
     @commands.command()
     @commands.is_owner()
     async def trigger_audit(self, ctx):
         """Triggers the Master's Ledger summary immediately WITHOUT clearing the daily log."""
-        if not self.hourly_log:
+        if not self.activity.rollups["daily"].users:
             return await ctx.send("The sensors are clear. No new activity to report in the ledger.")
         
         await ctx.send("Master detected. Generating immediate synchronization report (Daily data will remain)...")
-        
+        await self.send_report(self.activity.rollups["daily"].copy(), MANUAL_REPORT)
+
+    async def send_report(self, rollup, labels):
+        """Pages a copy of the daily rollup into the audit channel; False if it couldn't be sent."""
+        # FIX: Robust channel fetching for tasks
         audit_channel = self.bot.get_channel(AUDIT_CHANNEL_ID)
         if not audit_channel:
-            try: audit_channel = await self.bot.fetch_channel(AUDIT_CHANNEL_ID)
-            except: return
+            try:
+                audit_channel = await self.bot.fetch_channel(AUDIT_CHANNEL_ID)
+            except:
+                return False
 
-        image_path = "LobbyTopRight.jpg"
-        file = None
-        embed = discord.Embed(
-            title="🌅 THE MASTER'S MANUAL CLIMAX: OVERRIDE 🌅",
-            description="Manual override engaged. Current accumulation report follows.",
-            color=0x8b0000, timestamp=datetime.now(timezone.utc)
-        )
+        entries = list(rollup.users.items())
+        # Every logged user resolved up front, REST misses concurrently
+        users = await resolver.users(self.bot, [uid for uid, _ in entries])
+        people = []
+        for user_id, stats in entries:
+            user = users.get(user_id)
+            people.append((user.mention if user else f"Subject {user_id}",
+                           user.name.upper() if user else "Unknown Asset", stats))
+        channel_names = {}
+        for chan_id in SELFIE_CHANNELS:
+            chan = self.bot.get_channel(chan_id)
+            if chan:
+                channel_names[chan_id] = chan.name
 
-        if os.path.exists(image_path):
-            file = discord.File(image_path, filename="harvest_manual.jpg")
-            embed.set_thumbnail(url="attachment://harvest_manual.jpg")
-
-        ping_list = []
-        for user_id, stats in self.hourly_log.items():
-            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
-            user_mention = user.mention if user else f"Subject {user_id}"
-            ping_list.append(user_mention)
-            
-            calc_details = []
-            if stats.get('reactions', 0) > 0:
-                calc_details.append(f"🫦 **Reactions:** `{stats['reactions']}` × (25F / 25XP) = **{stats['reactions']*25:,}**")
-            
-            if stats.get('pics'):
-                for chan_id, count in stats['pics'].items():
-                    chan = self.bot.get_channel(chan_id)
-                    chan_name = chan.name if chan else f"Stage {chan_id}"
-                    xp_rate, flame_rate = SELFIE_CHANNELS.get(chan_id, (0, 0))
-                    total_f = count * flame_rate
-                    total_x = count * xp_rate
-                    calc_details.append(f"📸 **#{chan_name}:** `{count}` posts × ({flame_rate}F / {xp_rate}XP) = **{total_f:,}F / {total_x:,}XP**")
-
-            calculation_resume = "\n".join(calc_details) if calc_details else "_No passive extraction detected._"
-            game_report = ""
-            if stats.get('fights', 0) > 0: game_report += f"\n⚔️ **1v1 Fights Initiated:** {stats['fights']}"
-            if stats.get('hg_plays', 0) > 0:
-                placements = []
-                if stats.get('hg_top1', 0) > 0: placements.append(f"🥇x{stats['hg_top1']}")
-                if stats.get('hg_top2', 0) > 0: placements.append(f"🥈x{stats['hg_top2']}")
-                if stats.get('hg_top3', 0) > 0: placements.append(f"🥉x{stats['hg_top3']}")
-                if stats.get('hg_top4', 0) > 0: placements.append(f"🏅x{stats['hg_top4']} (4th)")
-                if stats.get('hg_top5', 0) > 0: placements.append(f"🎖️x{stats['hg_top5']} (5th)")
-                placement_str = " | ".join(placements) if placements else "No Top 5 finishes"
-                game_report += f"\n🏹 **Hunger Games:** {stats['hg_plays']} Plays | 💀 {stats['hg_kills']} Kills"
-                if stats.get('hg_first_bloods', 0) > 0: game_report += f" | 🩸 **FB:** {stats['hg_first_bloods']}"
-                game_report += f"\n🏆 **Placements:** {placement_str}"
-            
-            status_report = ""
-            if stats.get('ships'): status_report += f"\n💖 **Ships:** {', '.join(stats['ships'])}"
-            if stats.get('badges'): status_report += f"\n🏅 **Badges:** {', '.join(stats['badges'])}"
-
-            value = (
-                f"💰 **Accumulated Flames:** `{stats['flames']:,}`\n"
-                f"⛓️ **Accumulated XP:** `+{stats['xp']:,}`\n"
-                f"📊 **Breakdown:**\n{calculation_resume}\n"
-                f"━━━━━━━━━━━━━━"
-                f"{game_report}"
-                f"{status_report}\n\n"
-                f"*Data will reset at 9 PM Lisbon.*"
-            )
-            embed.add_field(name=f"👤 {user.name.upper() if user else 'Unknown Asset'}", value=value, inline=False)
+        # The per-user text and the page layout are pure string work: off the loop
+        embeds = await asyncio.to_thread(build_report_pages, people, labels, channel_names)
+        pings = ping_chunks(labels["pings"], [mention for mention, _, _ in people])
 
-        content = "⛓️ **MANUAL SYNC PINGS:** " + ", ".join(ping_list)
-        if file: await audit_channel.send(content=content, embed=embed, file=file)
-        else: await audit_channel.send(content=content, embed=embed)
+        for n, batch in enumerate(message_batches(embeds)):
+            files = branding.attach(batch[0], "lobby", labels["thumb"]) if n == 0 else []
+            await audit_channel.send(content=pings[0] if n == 0 else None, embeds=batch, files=files)
+        for chunk in pings[1:]:
+            await audit_channel.send(content=chunk)
+        return True
 
     @tasks.loop(hours=3.0)
     async def vibration_report_task(self):
         """Groups all reaction activity from the last 3 hours into one erotic audit log."""
-        if not self.reaction_buffer:
+        vibrations = dict(self.activity.rollups["vibration"].users)
+        if not vibrations:
             return
-        audit_channel = self.bot.get_channel(AUDIT_CHANNEL_ID)
-        if not audit_channel:
-            try: audit_channel = await self.bot.fetch_channel(AUDIT_CHANNEL_ID)
-            except: return
-        embed = discord.Embed(
-            title="🕵️ VOYEUR FEED: MASS VIBRATION REPORT",
-            description="The internal sensors have reached capacity. Reaction display report follows.",
-            color=0x800080, timestamp=datetime.now(timezone.utc)
-        )
-        image_path = "LobbyTopRight.jpg"
-        if os.path.exists(image_path):
-            file = discord.File(image_path, filename="vibe_report.jpg")
-            embed.set_thumbnail(url="attachment://vibe_report.jpg")
-        report_lines = []
-        for user_id, count in self.reaction_buffer.items():
-            user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
-            total_flames, total_xp = count * 25, count * 25
-            report_lines.append(f"• {user.mention}: **{count} Vibrations** (Harvested: {total_flames}F / {total_xp}XP)")
-        embed.description += "\n\n" + "\n".join(report_lines)
-        embed.set_footer(text="🔞 YOUR WATCHFUL EYES ARE NOTED 🔞")
-        if os.path.exists(image_path): await audit_channel.send(file=file, embed=embed)
-        else: await audit_channel.send(embed=embed)
-        self.reaction_buffer.clear()
+        # UPDATED: Plain mentions (no user fetches), queued through audit.py and
+        # split over as many embeds as the description limit needs
+        report_lines = [f"• <@{user_id}>: **{count} Vibrations** (Harvested: {count * 25}F / {count * 25}XP)"
+                        for user_id, count in vibrations.items()]
+        pages = [[]]
+        size = 0
+        for line in report_lines:
+            if pages[-1] and size + len(line) + 1 > 3800:
+                pages.append([])
+                size = 0
+            pages[-1].append(line)
+            size += len(line) + 1
+        for n, lines in enumerate(pages, 1):
+            embed = discord.Embed(
+                title="🕵️ VOYEUR FEED: MASS VIBRATION REPORT" + (f" ({n}/{len(pages)})" if len(pages) > 1 else ""),
+                description="The internal sensors have reached capacity. Reaction display report follows.\n\n" + "\n".join(lines),
+                color=0x800080, timestamp=datetime.now(timezone.utc)
+            )
+            if branding.available():
+                embed.set_thumbnail(url="attachment://vibe_report.jpg")
+            embed.set_footer(text="🔞 YOUR WATCHFUL EYES ARE NOTED 🔞")
+            audit.post(AUDIT_CHANNEL_ID, embed)
+        await self.activity.reset("vibration")
 
     @audit_task.before_loop
     @vibration_report_task.before_loop
@@ -361,4 +373,8 @@ class Collect(commands.Cog):
         await self.bot.wait_until_ready()
 
 async def setup(bot):
-    await bot.add_cog(Collect(bot))
+    cog = Collect(bot)
+    # ADDED: Restore today's report data from the last checkpoint + activity log
+    await cog.activity.load()
+    cog.activity.start()
+    await bot.add_cog(cog)
@@ -0,0 +1,190 @@
+import heapq
+from datetime import datetime, timezone
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batch scoring falls back to pure Python
+    np = None
+
+# ===== COMPATIBILITY HASH =====
+# The daily ship percentage used to come from random.seed(pair + day) /
+# randint / random.seed(), which reset the global RNG that ignis and the
+# casino also draw from, and cost a reseed per pair. It is now a pure
+# function of (pair, UTC day): three rounds of splitmix64 over the day number
+# and the two ids (smaller first, so the order of the pair doesn't matter).
+#
+# The NumPy version runs the same arithmetic on uint64 arrays (which wrap mod
+# 2**64 exactly like the masked Python ints), so batch and scalar results are
+# identical. Whole-channel scans are done in row blocks to bound memory.
+
+MASK = (1 << 64) - 1
+GOLDEN = 0x9E3779B97F4A7C15
+MIX1 = 0xBF58476D1CE4E5B9
+MIX2 = 0x94D049BB133111EB
+
+BLOCK_CELLS = 1 << 20   # Pair scores computed per NumPy block (~8 MB per uint64 array)
+SCAN_LIMIT = None if np is not None else 200   # Members per scan; the pure-Python fallback is O(n^2)
+
+
+def today():
+    """UTC day number used as the daily salt."""
+    return datetime.now(timezone.utc).date().toordinal()
+
+
+def splitmix64(x):
+    x = (x + GOLDEN) & MASK
+    x = ((x ^ (x >> 30)) * MIX1) & MASK
+    x = ((x ^ (x >> 27)) * MIX2) & MASK
+    return x ^ (x >> 31)
+
+
+def pair_hash(a, b, day):
+    lo, hi = (a, b) if a <= b else (b, a)
+    return splitmix64(splitmix64(splitmix64(day) ^ lo) ^ hi)
+
+
+def percent(a, b, day=None, low=0, high=100):
+    """Compatibility of users a and b for the day, in [low, high]."""
+    day = today() if day is None else day
+    return low + pair_hash(a, b, day) % (high - low + 1)
+
+
+# --- BATCH (NumPy) ---
+def _np_splitmix64(x):
+    x = x + np.uint64(GOLDEN)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(MIX1)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(MIX2)
+    return x ^ (x >> np.uint64(31))
+
+
+def _np_percent(a, b, day_mix, low, high):
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    h = _np_splitmix64(_np_splitmix64(day_mix ^ lo) ^ hi)
+    return (h % np.uint64(high - low + 1)).astype(np.int64) + low
+
+
+def scores(user_id, others, day=None, low=0, high=100):
+    """Percentages of user_id against every id in `others`, in order."""
+    day = today() if day is None else day
+    if np is None or not others:
+        return [percent(user_id, o, day, low, high) for o in others]
+    with np.errstate(over="ignore"):
+        return _np_percent(np.uint64(user_id), np.asarray(others, dtype=np.uint64),
+                           np.uint64(splitmix64(day)), low, high).tolist()
+
+
+def best_partner(user_id, others, day=None):
+    """(index into others, percent) of the highest score; the earliest wins ties."""
+    if not others:
+        return None, -1
+    row = scores(user_id, others, day)
+    best = max(range(len(row)), key=lambda i: (row[i], -i))
+    return best, row[best]
+
+
+def top_pairs(ids, k, day=None, low=0, high=100):
+    """The k best pairs among `ids` as [(i, j, percent)] with i < j (indexes into ids).
+
+    Highest percent first; ties go to the pair that comes first in ids order,
+    which is the order the old nested loop + stable sort produced.
+    """
+    day = today() if day is None else day
+    n = len(ids)
+    if n < 2 or k <= 0:
+        return []
+    if np is None:
+        pairs = ((percent(ids[i], ids[j], day, low, high), -i, -j) for i in range(n) for j in range(i + 1, n))
+        return [(-i, -j, p) for p, i, j in heapq.nlargest(k, pairs)]
+
+    arr = np.asarray(ids, dtype=np.uint64)
+    cells = n * n
+    day_mix = np.uint64(splitmix64(day))
+    rows_per_block = max(1, BLOCK_CELLS // n)
+    cand_scores, cand_flat = [], []
+    perfect = 0
+    with np.errstate(over="ignore"):
+        for r0 in range(0, n - 1, rows_per_block):
+            r1 = min(n - 1, r0 + rows_per_block)
+            # Upper triangle only: this block's rows against the columns after r0
+            rows = np.arange(r0, r1, dtype=np.int64)
+            cols = np.arange(r0 + 1, n, dtype=np.int64)
+            pct = _np_percent(arr[r0:r1, None], arr[None, r0 + 1:], day_mix, low, high)
+            flat = rows[:, None] * n + cols[None, :]
+            # One unique key per pair: percent first, then earlier pairs win ties
+            key = pct * cells + (cells - 1 - flat)
+            key[cols[None, :] <= rows[:, None]] = -1
+            key, flat = key.ravel(), flat.ravel()
+            take = min(k, key.size)
+            idx = np.argpartition(key, key.size - take)[key.size - take:]
+            cand_scores.append(key[idx])
+            cand_flat.append(flat[idx])
+            # Later pairs lose every tie, so k perfect scores so far can't be beaten
+            perfect += int(np.count_nonzero(key[idx] >= high * cells))
+            if perfect >= k:
+                break
+    keys = np.concatenate(cand_scores)
+    flats = np.concatenate(cand_flat)
+    order = np.argsort(-keys, kind="stable")[:k]
+    return [(int(flats[o] // n), int(flats[o] % n), int(keys[o] // cells))
+            for o in order if keys[o] >= 0]
+
+
+# ===== DAILY GUILD MATCHES =====
+# !matchmaking / !matchme used to rescore the channel on every call even though
+# nothing changes until midnight. One GuildMatches per guild holds the day's
+# answers: the global top pairs (scored once, merged with each joiner's row)
+# and each member's best partner (one vector row, computed on first ask and
+# raised in place when someone better joins). Leaving members or a new UTC day
+# throw the entry away; the owner rebuilds it on the next lookup.
+
+TOP_N = 25   # Pairs kept per guild; commands show the first few
+
+
+class GuildMatches:
+    __slots__ = ("day", "ids", "pos", "best", "top")
+
+    def __init__(self, ids, day=None):
+        self.day = today() if day is None else day
+        self.ids = list(ids)
+        self.pos = {uid: i for i, uid in enumerate(self.ids)}
+        self.best = {}    # uid -> (partner uid, percent)
+        self.top = None   # [(i, j, percent)] index pairs, best first
+
+    def fresh(self):
+        return self.day == today()
+
+    def build_top(self):
+        """The expensive part (runs in a thread): whole-guild top-N."""
+        if self.top is None:
+            self.top = top_pairs(self.ids, TOP_N, self.day)
+        return self.top
+
+    def top_pairs(self, k):
+        """[(uid, uid, percent)] best first; build_top() must have run."""
+        return [(self.ids[i], self.ids[j], p) for i, j, p in self.build_top()[:k]]
+
+    def best_partner(self, user_id):
+        """(partner uid, percent), or (None, -1) if nobody else is cached."""
+        hit = self.best.get(user_id)
+        if hit is None:
+            others = [uid for uid in self.ids if uid != user_id]
+            idx, pct = best_partner(user_id, others, self.day)
+            hit = (others[idx], pct) if idx is not None else (None, -1)
+            self.best[user_id] = hit
+        return hit
+
+    def add(self, user_id):
+        """A member joined: score them against everyone once and fold the row in."""
+        if user_id in self.pos:
+            return
+        row = scores(user_id, self.ids, self.day)
+        new = len(self.ids)
+        for uid, (partner, pct) in list(self.best.items()):
+            # The joiner is last in order, so they only take strictly better matches
+            if row[self.pos[uid]] > pct:
+                self.best[uid] = (user_id, row[self.pos[uid]])
+        if self.top is not None:
+            merged = self.top + [(i, new, p) for i, p in enumerate(row)]
+            self.top = heapq.nsmallest(TOP_N, merged, key=lambda t: (-t[2], t[0], t[1]))
+        self.ids.append(user_id)
+        self.pos[user_id] = new
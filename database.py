@@ -0,0 +1,235 @@
+import asyncio
+import functools
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ===== SHARED DATABASE LAYER =====
+# One process-wide pool of SQLite connections shared by main and every cog.
+# Connections stay open between commands, so each keeps its page cache,
+# memory map and prepared statement cache warm instead of paying for a fresh
+# sqlite3.connect() on every helper call.
+
+# --- PERSISTENT STORAGE PATH ---
+# Railway mounts the volume at /app/data, locally we fall back to ./data
+if os.path.exists("/app/data"):
+    DATABASE_PATH = "/app/data/economy.db"
+else:
+    if not os.path.exists("data"):
+        os.makedirs("data")
+    DATABASE_PATH = "data/economy.db"
+
+POOL_SIZE = 8               # Idle connections kept open for reuse
+EXECUTOR_WORKERS = 4        # DB worker threads serving the async API
+BUSY_TIMEOUT = 30.0         # Seconds to wait on a locked database before failing
+STATEMENT_CACHE_SIZE = 256  # Prepared statements cached per connection
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",   # Safe with WAL, avoids an fsync per commit
+    "PRAGMA cache_size = -16000",    # ~16 MB page cache per connection
+    "PRAGMA mmap_size = 134217728",  # 128 MB memory-mapped reads
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections in WAL mode.
+
+    At most `size` idle connections are kept open. When every pooled
+    connection is leased (e.g. a coroutine awaits while holding one), an
+    overflow connection is opened and closed on release instead of blocking
+    the event loop.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._wal_lock = threading.Lock()
+        self._wal_ready = False
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        # journal_mode is persistent in the file, so it only has to be set once
+        if not self._wal_ready:
+            with self._wal_lock:
+                if not self._wal_ready:
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    self._wal_ready = True
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        # Never hand a half-finished transaction to the next caller
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def connection(self):
+        return PooledConnection(self)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            # Fold the WAL back into the main file so backups/copies stay complete
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            conn.close()
+
+
+class PooledConnection:
+    """Lease used as `with get_db_connection() as conn:`.
+
+    Mirrors sqlite3's own context manager (commit on success, rollback on
+    error) and then returns the connection to the pool instead of leaking it.
+    """
+    __slots__ = ("_pool", "_conn")
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+
+    def __enter__(self):
+        self._conn = self._pool.acquire()
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        conn, self._conn = self._conn, None
+        try:
+            if exc_type is None:
+                conn.commit()
+            else:
+                conn.rollback()
+        finally:
+            self._pool.release(conn)
+        return False
+
+
+pool = ConnectionPool(DATABASE_PATH)
+
+
+def connection():
+    """Returns a pooled connection lease for use in a `with` block."""
+    return pool.connection()
+
+
+def backup(dest_path):
+    """Online copy of the live database (includes pages still sitting in the WAL)."""
+    with connection() as conn:
+        dest = sqlite3.connect(dest_path)
+        try:
+            conn.backup(dest)
+        finally:
+            dest.close()
+
+
+# ===== ASYNC ACCESS =====
+# Every awaitable below runs on a small dedicated thread pool, so a 30s lock
+# wait only parks a DB worker and never the discord.py event loop (heartbeats,
+# buttons and other guilds keep flowing). The executor's work queue is the
+# request queue; results come back as ordinary awaitables.
+
+_executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="fiery-db")
+
+
+async def run(func, *args, **kwargs):
+    """Runs any blocking DB helper (e.g. main.get_user) on a DB worker thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def _fetchone(sql, params):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchone()
+
+
+def _fetchall(sql, params):
+    with connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def _execute(sql, params):
+    with connection() as conn:
+        return conn.execute(sql, params).rowcount
+
+
+def _executemany(sql, seq_of_params):
+    with connection() as conn:
+        return conn.executemany(sql, seq_of_params).rowcount
+
+
+def _read(func, args, kwargs):
+    with connection() as conn:
+        return func(conn, *args, **kwargs)
+
+
+def _transaction(func, args, kwargs):
+    with connection() as conn:
+        # IMMEDIATE takes the write lock up front, so read-then-write blocks
+        # wait on busy_timeout instead of failing with SQLITE_BUSY on upgrade
+        conn.execute("BEGIN IMMEDIATE")
+        return func(conn, *args, **kwargs)
+
+
+async def fetchone(sql, params=()):
+    return await run(_fetchone, sql, params)
+
+
+async def fetchall(sql, params=()):
+    return await run(_fetchall, sql, params)
+
+
+async def execute(sql, params=()):
+    """Executes and commits a single statement. Returns the affected row count."""
+    return await run(_execute, sql, params)
+
+
+async def executemany(sql, seq_of_params):
+    return await run(_executemany, sql, list(seq_of_params))
+
+
+async def read(func, *args, **kwargs):
+    """Runs func(conn, *args) on a DB worker for multi-statement reads (no write lock)."""
+    return await run(_read, func, args, kwargs)
+
+
+async def transaction(func, *args, **kwargs):
+    """Runs func(conn, *args) atomically on a DB worker and returns its result.
+
+    func is plain synchronous code; it must not touch discord objects. It is
+    committed when it returns and rolled back if it raises.
+    """
+    return await run(_transaction, func, args, kwargs)
+
+
+def close():
+    _executor.shutdown(wait=True)
+    pool.close()
@@ -0,0 +1,87 @@
+import io
+import os
+import time
+
+from PIL import Image, features
+
+# ===== IMAGE ENCODER =====
+# Every card used to be saved as an unoptimized RGBA PNG (1-2 MB for the
+# photo-backed ones). encode() tries the cheapest good-looking option first and
+# stops at the first result that fits IMAGE_BYTE_BUDGET:
+#   1. optimized PNG (lossless; flat-colour cards usually fit here)
+#   2. WebP, stepping quality down (keeps alpha)
+#   3. JPEG, stepping quality down (alpha flattened onto FLATTEN_COLOR)
+# If nothing fits, the smallest attempt is used. Alpha is dropped up front when
+# every pixel is opaque, which alone shrinks PNGs by about a quarter.
+
+IMAGE_BYTE_BUDGET = int(os.getenv("IMAGE_BYTE_BUDGET", str(512 * 1024)))
+WEBP_QUALITIES = (90, 80, 70)
+JPEG_QUALITIES = (88, 78, 65)
+FLATTEN_COLOR = (0, 0, 0)   # Matches the dark card backgrounds
+
+HAS_WEBP = features.check("webp")
+
+EXTENSIONS = {"PNG": "png", "WEBP": "webp", "JPEG": "jpg"}
+
+
+def _save(img, fmt, **params):
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **params)
+    return buf.getvalue()
+
+
+def _drop_opaque_alpha(img):
+    if img.mode == "RGBA" and img.getchannel("A").getextrema() == (255, 255):
+        return img.convert("RGB")
+    return img
+
+
+def _flatten(img):
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        base = Image.new("RGB", img.size, FLATTEN_COLOR)
+        base.paste(img, mask=img.getchannel("A"))
+        return base
+    return img.convert("RGB")
+
+
+def _attempts(img):
+    yield "PNG", lambda: _save(img, "PNG", optimize=True)
+    if HAS_WEBP:
+        for q in WEBP_QUALITIES:
+            yield "WEBP", lambda q=q: _save(img, "WEBP", quality=q, method=4)
+    flat = None
+    for q in JPEG_QUALITIES:
+        if flat is None:
+            flat = _flatten(img)
+        yield "JPEG", lambda q=q: _save(flat, "JPEG", quality=q, optimize=True)
+
+
+def encode(img, budget=None):
+    """Returns (data, extension, report) for a PIL image.
+
+    report is {"format", "bytes", "ms", "attempts", "fits"} for logging/metrics.
+    """
+    budget = budget or IMAGE_BYTE_BUDGET
+    start = time.perf_counter()
+    img = _drop_opaque_alpha(img)
+
+    best = None
+    tries = 0
+    for fmt, run in _attempts(img):
+        tries += 1
+        data = run()
+        if best is None or len(data) < len(best[1]):
+            best = (fmt, data)
+        if len(data) <= budget:
+            break
+
+    fmt, data = best
+    report = {
+        "format": fmt,
+        "bytes": len(data),
+        "ms": round((time.perf_counter() - start) * 1000, 1),
+        "attempts": tries,
+        "fits": len(data) <= budget,
+    }
+    return data, EXTENSIONS[fmt], report
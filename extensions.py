@@ -2,10 +2,15 @@ import discord
 from discord.ext import commands, tasks
 import sqlite3
 import json
-import os
 import random
 import asyncio
 import sys
+import database
+import leaderboard
+import branding
+import resolver
+import audit
+import quests
 from datetime import datetime, timedelta, timezone
 
 class FieryExtensions(commands.Cog):
@@ -49,12 +54,9 @@ class FieryExtensions(commands.Cog):
             "• **FIRST BLOOD:** Automatically stripped and exposed.\n\n"
             "*The Red Room is set to its most erotic frequency for the next 90 minutes.*")
         
-        if os.path.exists("LobbyTopRight.jpg"):
-            file = discord.File("LobbyTopRight.jpg", filename="nsfw_cover.jpg")
+        if branding.available():
             embed.set_image(url="attachment://nsfw_cover.jpg")
-            await ctx.send(file=file, embed=embed)
-        else:
-            await ctx.send(embed=embed)
+        await ctx.send(files=branding.attach(embed, "lobby", "nsfw_cover.jpg"), embed=embed)
 
     @commands.command(name="flash")
     async def flash(self, ctx, victim1: discord.Member, victim2: discord.Member, victim3: discord.Member):
@@ -77,20 +79,15 @@ class FieryExtensions(commands.Cog):
         embed.description = desc
         self.last_nsfw_recap = f"Last Lead: {ctx.author.name} | Victims: {victim1.name}, {victim2.name}, {victim3.name}"
         
-        if os.path.exists("LobbyTopRight.jpg"):
-            file = discord.File("LobbyTopRight.jpg", filename="flash_thumb.jpg")
+        if branding.available():
             embed.set_image(url="attachment://flash_thumb.jpg")
-            await ctx.send(file=file, embed=embed)
-        else:
-            await ctx.send(embed=embed)
+        await ctx.send(files=branding.attach(embed, "lobby", "flash_thumb.jpg"), embed=embed)
 
         # --- AUDIT LOG FOR FLASH ---
-        audit_chan = self.bot.get_channel(self.audit_channel_id)
-        if audit_chan:
-            log_emb = self.fiery_embed("📸 VOYEUR EXHIBITION AUDIT", f"A public exposure has been authorized by {ctx.author.mention}.")
-            log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} has selected {victim1.display_name}, {victim2.display_name}, and {victim3.display_name} for total exposure. The cameras are recording their shame."
-            log_emb.color = 0xFF00FF
-            await audit_chan.send(embed=log_emb)
+        log_emb = self.fiery_embed("📸 VOYEUR EXHIBITION AUDIT", f"A public exposure has been authorized by {ctx.author.mention}.")
+        log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} has selected {victim1.display_name}, {victim2.display_name}, and {victim3.display_name} for total exposure. The cameras are recording their shame."
+        log_emb.color = 0xFF00FF
+        audit.post(self.audit_channel_id, log_emb)
 
     # ==========================================
     # 💍 THE BINDING CONTRACT SYSTEM
@@ -104,10 +101,9 @@ class FieryExtensions(commands.Cog):
         if price < 1000:
             return await ctx.send("⛓️ **The Master doesn't process soul-contracts for less than 1,000 Flames.**")
 
-        with self.get_db_connection() as conn:
-            dom = conn.execute("SELECT balance FROM users WHERE id=?", (ctx.author.id,)).fetchone()
-            if not dom or dom['balance'] < price:
-                return await ctx.send("❌ **Your vault is too empty to afford this level of possession.**")
+        dom = await database.fetchone("SELECT balance FROM users WHERE id=?", (ctx.author.id,))
+        if not dom or dom['balance'] < price:
+            return await ctx.send("❌ **Your vault is too empty to afford this level of possession.**")
 
         self.pending_contracts[member.id] = {"dom_id": ctx.author.id, "price": price}
         
@@ -130,10 +126,10 @@ class FieryExtensions(commands.Cog):
         dom_id = offer['dom_id']
         price = offer['price']
         
-        with self.get_db_connection() as conn:
+        def _seal_contract(conn):
             dom_check = conn.execute("SELECT balance FROM users WHERE id=?", (dom_id,)).fetchone()
             if not dom_check or dom_check['balance'] < price:
-                return await ctx.send("❌ **The Dominant can no longer afford the price of your submission.**")
+                return None
             
             conn.execute("UPDATE users SET balance = balance - ? WHERE id = ?", (price, dom_id))
             conn.execute("UPDATE users SET balance = balance + ? WHERE id = ?", (price, ctx.author.id))
@@ -142,28 +138,27 @@ class FieryExtensions(commands.Cog):
             expiry = expiry_dt.isoformat()
             conn.execute("INSERT OR REPLACE INTO contracts (dominant_id, submissive_id, expiry) VALUES (?, ?, ?)", 
                          (dom_id, ctx.author.id, expiry))
-            conn.commit()
+            return expiry_dt
+
+        expiry_dt = await database.transaction(_seal_contract)
+        if expiry_dt is None:
+            return await ctx.send("❌ **The Dominant can no longer afford the price of your submission.**")
 
-        dom_user = await self.bot.fetch_user(dom_id)
+        dom_user = await resolver.user(self.bot, dom_id)
         await ctx.send(embed=self.fiery_embed("Ownership Sealed", 
             f" f\"🔞 **THE LOCK CLICKS.** {ctx.author.mention} is now the legal property of {dom_user.mention} for the next 24 hours.\n\""
             f"The payment has been transferred to the new member.", color=0xFF0000))
 
         # --- AUDIT LOG FOR CONTRACT SEALING ---
-        audit_chan = self.bot.get_channel(self.audit_channel_id)
-        if audit_chan:
-            log_emb = self.fiery_embed("🕵️ VOYEUR CONTRACT AUDIT", f"A new soul has been collared.")
-            log_emb.add_field(name="⛓️ Dominant", value=dom_user.mention, inline=True)
-            log_emb.add_field(name="🫦 Submissive", value=ctx.author.mention, inline=True)
-            log_emb.add_field(name="💰 Lease Price", value=f"{price:,} Flames", inline=True)
-            log_emb.add_field(name="⏳ Expiry", value=f"<t:{int(expiry_dt.timestamp())}:R>", inline=True)
-            log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} has accepted the terms of submission. 20% of their future earnings are now synchronized with {dom_user.display_name}'s vault."
-            if os.path.exists("LobbyTopRight.jpg"):
-                log_file = discord.File("LobbyTopRight.jpg", filename="audit_contract.jpg")
-                log_emb.set_thumbnail(url="attachment://audit_contract.jpg")
-                await audit_chan.send(file=log_file, embed=log_emb)
-            else:
-                await audit_chan.send(embed=log_emb)
+        log_emb = self.fiery_embed("🕵️ VOYEUR CONTRACT AUDIT", f"A new soul has been collared.")
+        log_emb.add_field(name="⛓️ Dominant", value=dom_user.mention, inline=True)
+        log_emb.add_field(name="🫦 Submissive", value=ctx.author.mention, inline=True)
+        log_emb.add_field(name="💰 Lease Price", value=f"{price:,} Flames", inline=True)
+        log_emb.add_field(name="⏳ Expiry", value=f"<t:{int(expiry_dt.timestamp())}:R>", inline=True)
+        log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} has accepted the terms of submission. 20% of their future earnings are now synchronized with {dom_user.display_name}'s vault."
+        if branding.available():
+            log_emb.set_thumbnail(url="attachment://audit_contract.jpg")
+        audit.post(self.audit_channel_id, log_emb)
 
     # ==========================================
     # 📸 THE VOYEUR'S HIDDEN GALLERY
@@ -186,14 +181,13 @@ class FieryExtensions(commands.Cog):
     @commands.command(name="gallery")
     async def gallery(self, ctx):
         """A peek into the most used toys and the highest tension in the pit."""
-        with self.get_db_connection() as conn:
-            recent_winners = conn.execute("SELECT id, wins, kills FROM users WHERE wins > 0 ORDER BY wins DESC LIMIT 5").fetchall()
+        recent_winners = await database.read(leaderboard.top, "wins", 5, 1)
         
         desc = "🔞 **THE MASTER'S FAVORITES (RECENT CHAMPIONS)**\n"
-        for row in recent_winners:
-            m = ctx.guild.get_member(row['id'])
-            name = m.display_name if m else f"Asset {row['id']}"
-            desc += f"• **{name}**: {row['wins']} Peaks | {row['kills']} Submissions forced\n"
+        for user_id, wins in recent_winners:
+            m = ctx.guild.get_member(user_id)
+            name = m.display_name if m else f"Asset {user_id}"
+            desc += f"• **{name}**: {wins} Peaks | {leaderboard.value('kills', user_id)} Submissions forced\n"
         
         desc += "\n🫦 **THE VOYEUR'S FEED (SERVER TENSION)**\n"
         sorted_pairs = sorted(self.interaction_tracker.items(), key=lambda x: x[1], reverse=True)[:5]
@@ -210,11 +204,9 @@ class FieryExtensions(commands.Cog):
                     desc += f"• {u1.display_name} 🔗 {u2.display_name}: {count} exchanges. **[{tension_pct}% TENSION]**\n"
 
         embed = self.fiery_embed("The Voyeur's Gallery", desc, color=0x800080)
-        if os.path.exists("LobbyTopRight.jpg"):
-            file = discord.File("LobbyTopRight.jpg", filename="gallery.jpg")
+        if branding.available():
             embed.set_thumbnail(url="attachment://gallery.jpg")
-            await ctx.send(file=file, embed=embed)
-        else: await ctx.send(embed=embed)
+        await ctx.send(files=branding.attach(embed, "lobby", "gallery.jpg"), embed=embed)
 
     # ==========================================
     # 🕯️ LEGENDARY DUNGEON HEAT & GLOBAL EVENTS
@@ -230,11 +222,9 @@ class FieryExtensions(commands.Cog):
         self.master_present = True
         self.heat_multiplier = 2.0
         
-        audit_chan = self.bot.get_channel(self.audit_channel_id)
-        if audit_chan:
-            msg = "🌋 **PROTOCOL: PEAK HEAT.** The Master has entered the floor! The Red Lights are on.\n🔥 **ALL REWARDS X2 | ALL XP X3** for 60 minutes!"
-            await audit_chan.send(msg)
-            
+        msg = "🌋 **PROTOCOL: PEAK HEAT.** The Master has entered the floor! The Red Lights are on.\n🔥 **ALL REWARDS X2 | ALL XP X3** for 60 minutes!"
+        audit.post(self.audit_channel_id, content=msg)
+        
         # 5% chance of Blackout
         if random.random() < 0.05:
             await self.trigger_blackout()
@@ -248,9 +238,7 @@ class FieryExtensions(commands.Cog):
     async def trigger_blackout(self):
         self.is_blackout = True
         self.blackout_key_holder = random.randint(1, 20) # Secret key location
-        chan = self.bot.get_channel(self.audit_channel_id)
-        if chan:
-            await chan.send("🌑 **BLACKOUT.** The lights have been cut! Economy commands are locked. Someone find the Master's Keys with `!search`!")
+        audit.post(self.audit_channel_id, content="🌑 **BLACKOUT.** The lights have been cut! Economy commands are locked. Someone find the Master's Keys with `!search`!")
 
     @commands.command(name="search")
     async def search(self, ctx):
@@ -265,9 +253,7 @@ class FieryExtensions(commands.Cog):
             await ctx.send(embed=self.fiery_embed("KEY FOUND", f"🗝️ {ctx.author.mention} has found the Master's Keys in the dark! The lights flicker back on and they are rewarded with **20,000 Flames**!"))
             
             # --- AUDIT LOG FOR BLACKOUT RESOLUTION ---
-            audit_chan = self.bot.get_channel(self.audit_channel_id)
-            if audit_chan:
-                await audit_chan.send(f"💡 **BLACKOUT ENDED:** {ctx.author.display_name} found the Master Keys. Power restored.")
+            audit.post(self.audit_channel_id, content=f"💡 **BLACKOUT ENDED:** {ctx.author.display_name} found the Master Keys. Power restored.")
         else:
             await ctx.send(f"🌑 {ctx.author.mention} fumbles in the dark and finds nothing but cold chains.")
 
@@ -279,7 +265,7 @@ class FieryExtensions(commands.Cog):
         
         import sys
         main = sys.modules['__main__']
-        user_data = main.get_user(ctx.author.id)
+        user_data = await main.get_user_async(ctx.author.id)
         if user_data['balance'] < 5000:
             return await ctx.send("You don't have enough Flames to stake your pride in this trial.")
             
@@ -306,27 +292,23 @@ class FieryExtensions(commands.Cog):
                 await main.update_user_stats_async(ctx.author.id, amount=-5000, source="Failed Trial")
                 
                 # --- AUDIT LOG FOR FAILED TRIAL ---
-                audit_chan = self.bot.get_channel(self.audit_channel_id)
-                if audit_chan:
-                    log_emb = self.fiery_embed("🕵️ VOYEUR TRIAL AUDIT: BROKEN", f"An asset has failed the Trial of the Masochist.")
-                    log_emb.add_field(name="🫦 Failed Asset", value=ctx.author.mention, inline=True)
-                    log_emb.add_field(name="📉 Penalty", value="5,000 Flames Extracted", inline=True)
-                    log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} reached Wave {i} before their mind shattered. The pit has claimed their stake."
-                    await audit_chan.send(embed=log_emb)
+                log_emb = self.fiery_embed("🕵️ VOYEUR TRIAL AUDIT: BROKEN", f"An asset has failed the Trial of the Masochist.")
+                log_emb.add_field(name="🫦 Failed Asset", value=ctx.author.mention, inline=True)
+                log_emb.add_field(name="📉 Penalty", value="5,000 Flames Extracted", inline=True)
+                log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} reached Wave {i} before their mind shattered. The pit has claimed their stake."
+                audit.post(self.audit_channel_id, log_emb)
                 return await ctx.send(f"❌ **BROKEN.** {ctx.author.mention} failed to react in time. 5,000 Flames lost to the pit.")
 
         await main.update_user_stats_async(ctx.author.id, amount=10000, xp_gain=5000, source="Passed Trial")
         await ctx.send(embed=self.fiery_embed("Trial Passed", f"🖤 {ctx.author.mention} has endured the Master's sensory Trial! They earn **10,000 Flames** and the Master's respect.", color=0x00FF00))
         
         # --- AUDIT LOG FOR PASSED TRIAL ---
-        audit_chan = self.bot.get_channel(self.audit_channel_id)
-        if audit_chan:
-            log_emb = self.fiery_embed("🕵️ VOYEUR TRIAL AUDIT: ENDURED", f"An asset has passed the Trial of the Masochist.")
-            log_emb.add_field(name="⛓️ Endured Asset", value=ctx.author.mention, inline=True)
-            log_emb.add_field(name="💰 Reward", value="10,000 Flames Added", inline=True)
-            log_emb.add_field(name="💦 Experience", value="5,000 XP Synchronized", inline=True)
-            log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} has successfully navigated all 5 waves of sensory overload. A rare display of mental fortitude."
-            await audit_chan.send(embed=log_emb)
+        log_emb = self.fiery_embed("🕵️ VOYEUR TRIAL AUDIT: ENDURED", f"An asset has passed the Trial of the Masochist.")
+        log_emb.add_field(name="⛓️ Endured Asset", value=ctx.author.mention, inline=True)
+        log_emb.add_field(name="💰 Reward", value="10,000 Flames Added", inline=True)
+        log_emb.add_field(name="💦 Experience", value="5,000 XP Synchronized", inline=True)
+        log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} has successfully navigated all 5 waves of sensory overload. A rare display of mental fortitude."
+        audit.post(self.audit_channel_id, log_emb)
 
     # ==========================================
     # 📜 THE MASTER'S LEDGER (40 CLEAR DEMANDS)
@@ -336,61 +318,14 @@ class FieryExtensions(commands.Cog):
     async def quests(self, ctx):
         """Check your progress on the daily and weekly demands of the Red Room."""
         u_id = ctx.author.id
-        with self.get_db_connection() as conn:
-            conn.execute("INSERT OR IGNORE INTO quests (user_id) VALUES (?)", (u_id,))
-            conn.commit()
-            q = conn.execute("SELECT * FROM quests WHERE user_id = ?", (u_id,)).fetchone()
+        q = await database.read(quests.progress, u_id)
 
         embed = discord.Embed(title="📜 THE MASTER'S LEDGER: CLEAR DEMANDS", color=0xFFD700)
-        if os.path.exists("LobbyTopRight.jpg"):
-            file = discord.File("LobbyTopRight.jpg", filename="quest_top.jpg")
+        if branding.available():
             embed.set_thumbnail(url="attachment://quest_top.jpg")
 
-        d_tasks = [
-            f"1. 🩸 **Force a Peak:** {q['d1']}/1 Kill in Arena", 
-            f"2. 🎮 **Arena Hunger:** {q['d2']}/3 Games Played",
-            f"3. 💍 **Offer a Collar:** {q['d3']}/1 `!contract` sent", 
-            f"4. 🫦 **Groveling:** {q['d4']}/5 `!beg` uses",
-            f"5. ⛓️ **Hard Service:** {q['d5']}/5 `!work` uses", 
-            f"6. 🏆 **Top Authority:** {q['d6']}/1 Game Won",
-            f"7. 🧪 **Lab Rat:** {q['d7']}/2 `!experiment` uses", 
-            f"8. 💦 **Mopping Floors:** {q['d8']}/3 `!cumcleaner` uses",
-            f"9. 👠 **Recruiting:** {q['d9']}/2 `!pimp` uses", 
-            f"10. ❓ **Blind Obedience:** {q['d10']}/2 `!mystery` uses",
-            f"11. 🫦 **Pure Tease:** {q['d11']}/5 `!flirt` uses", 
-            f"12. 🔥 **Active Asset:** {q['d12']}/10 commands total",
-            f"13. 🩸 **Fresh Meat:** {q['d13']}/1 First Blood in game", 
-            f"14. 💀 **Total Yield:** {q['d14']}/2 Times defeated",
-            f"15. 💰 **Wealth Gatherer:** {q['d15']}/1000 Flames earned", 
-            f"16. 🫦 **Loud Toy:** {q['d16']}/10 chat messages sent",
-            f"17. ⛓️ **Narcissist:** {q['d17']}/1 `!me` profile check", 
-            f"18. 🔄 **Daily Dose:** {q['d18']}/1 `!daily` claimed",
-            f"19. ⛓️ **Role Call:** {q['d19']}/1 Ping in a game lobby", 
-            f"20. 🔞 **Full Session:** {q['d20']}/1 Game played start to finish"
-        ]
-        
-        w_tasks = [
-            f"1. 👑 **Master of Pit:** {q['w1']}/5 Wins total", 
-            f"2. ⚔️ **Pride Shredder:** {q['w2']}/25 Arena Kills",
-            f"3. 📈 **Arousal Streak:** {q['w3']}/3 Killstreak reached", 
-            f"4. 🔒 **Soul Collector:** {q['w4']}/3 Contracts accepted",
-            f"5. 🔗 **Career Slave:** {q['w5']}/30 `!work` commands", 
-            f"6. 🔞 **Dungeon Fiend:** {q['w6']}/50 commands used",
-            f"7. 💎 **Sultan of Flames:** {q['w7']}/10k total earnings", 
-            f"8. ⛓️ **High Endurance:** {q['w8']}/10 Games joined",
-            f"9. 🫦 **Golden Pet:** {q['w9']}/5 Top 5 placements", 
-            f"10. 🥀 **Professional Flirt:** {q['w10']}/20 `!flirt` uses",
-            f"11. 🧪 **Total Subject:** {q['w11']}/10 `!experiment` uses", 
-            f"12. 💦 **Floor Manager:** {q['w12']}/15 `!cumcleaner` uses",
-            f"13. 👠 **Dungeon Pimp:** {q['w13']}/10 `!pimp` uses", 
-            f"14. 🕯️ **Mystery Seeker:** {q['w14']}/10 `!mystery` uses",
-            f"15. 🫦 **Professional Beggar:** {q['w15']}/20 `!beg` uses", 
-            f"16. 📅 **Hooked:** {q['w16']}/7 `!daily` claims",
-            f"17. ⬆️ **Deepening Submission:** {q['w17']}/1 Level gained", 
-            f"18. 👁️ **Public Interest:** {q['w18']}/50 Mentions in chat",
-            f"19. 🌋 **Heat Chaser:** {q['w19']}/5 Heat Events triggered", 
-            f"20. 🔞 **Legendary Presence:** {q['w20']}/1 Legendary Event survive"
-        ]
+        d_tasks = [quests.label(quest, n, q[quest.id]) for n, quest in enumerate(quests.DAILY, 1)]
+        w_tasks = [quests.label(quest, n, q[quest.id]) for n, quest in enumerate(quests.WEEKLY, 1)]
 
         embed.add_field(name="🫦 THE DAILY DEGRADATION (250F / 100XP)", value="\n".join(d_tasks[:10]), inline=True)
         embed.add_field(name="🫦 DAILY CONTINUED", value="\n".join(d_tasks[10:]), inline=True)
@@ -402,9 +337,7 @@ class FieryExtensions(commands.Cog):
         embed.add_field(name="🌋 CURRENT DUNGEON HEAT", value=f"{heat_bar} **{self.dungeon_heat}%**", inline=False)
         embed.set_footer(text="🔞 THE MASTER IS ALWAYS WATCHING 🔞")
 
-        if os.path.exists("LobbyTopRight.jpg"):
-            await ctx.send(file=file, embed=embed)
-        else: await ctx.send(embed=embed)
+        await ctx.send(files=branding.attach(embed, "lobby", "quest_top.jpg"), embed=embed)
 
     # ==========================================
     # 🕒 BACKGROUND LOOPS (RESETS & INTERJECTIONS)
@@ -412,29 +345,18 @@ class FieryExtensions(commands.Cog):
 
     @tasks.loop(minutes=30)
     async def quest_reset_loop(self):
-        now = datetime.now(timezone.utc)
-        with self.get_db_connection() as conn:
-            last_reset_row = conn.execute("SELECT last_reset FROM quests WHERE user_id = 0").fetchone()
-            if not last_reset_row:
-                conn.execute("INSERT OR IGNORE INTO quests (user_id, last_reset) VALUES (0, ?)", (now.isoformat(),))
-                conn.commit()
-                return
-            last_reset = datetime.fromisoformat(last_reset_row['last_reset'])
-            if now.date() > last_reset.date():
-                conn.execute("UPDATE quests SET " + ", ".join([f"d{i}=0" for i in range(1, 21)]))
-                conn.execute("UPDATE quests SET last_reset = ? WHERE user_id = 0", (now.isoformat(),))
-                
-                # --- AUDIT LOG FOR DAILY RESET ---
-                audit_chan = self.bot.get_channel(self.audit_channel_id)
-                if audit_chan:
-                    await audit_chan.send("⛓️ **LEDGER WIPE:** The Master has cleared the Daily Ordeals. New demands have been issued to all assets.")
-
-                if now.isoweekday() == 1 and now.isocalendar()[1] != last_reset.isocalendar()[1]:
-                    conn.execute("UPDATE quests SET " + ", ".join([f"w{i}=0" for i in range(1, 21)]))
-                    # --- AUDIT LOG FOR WEEKLY RESET ---
-                    if audit_chan:
-                        await audit_chan.send("🚨 **WEEKLY PURGE:** All Weekly Ordeals have been reset. The long-term ledger is clean.")
-                conn.commit()
+        # Counters are tagged with their day/week (quests.py), so nothing is
+        # rewritten here: this only advances the marker and announces it.
+        daily_wiped, weekly_wiped = await database.transaction(quests.roll_periods)
+        if not daily_wiped:
+            return
+
+        # --- AUDIT LOG FOR DAILY RESET ---
+        audit.post(self.audit_channel_id, content="⛓️ **LEDGER WIPE:** The Master has cleared the Daily Ordeals. New demands have been issued to all assets.")
+
+        # --- AUDIT LOG FOR WEEKLY RESET ---
+        if weekly_wiped:
+            audit.post(self.audit_channel_id, content="🚨 **WEEKLY PURGE:** All Weekly Ordeals have been reset. The long-term ledger is clean.")
 
     @tasks.loop(minutes=45)
     async def random_interjection_loop(self):
@@ -445,9 +367,8 @@ class FieryExtensions(commands.Cog):
             " f\"🔞 *The Master is reviewing the ledger. Are you serving well?*\"",
             " f\"🩸 *The arena floor is still warm from the last sacrifice.*\""
         ]
-        audit_chan = self.bot.get_channel(self.audit_channel_id)
-        if audit_chan and random.random() < 0.3:
-            await audit_chan.send(random.choice(messages))
+        if random.random() < 0.3:
+            audit.post(self.audit_channel_id, content=random.choice(messages))
 
     @quest_reset_loop.before_loop
     @random_interjection_loop.before_loop
@@ -461,11 +382,6 @@ async def setup(bot):
     with main.get_db_connection() as conn:
         conn.execute("""CREATE TABLE IF NOT EXISTS contracts (
             dominant_id INTEGER, submissive_id INTEGER, expiry TEXT, tax_rate REAL DEFAULT 0.2, PRIMARY KEY (submissive_id))""")
-        cols = ["user_id INTEGER PRIMARY KEY"]
-        for i in range(1, 21): cols.append(f"d{i} INTEGER DEFAULT 0")
-        for i in range(1, 21): cols.append(f"w{i} INTEGER DEFAULT 0")
-        cols.append("last_reset TEXT")
-        conn.execute(f"CREATE TABLE IF NOT EXISTS quests ({', '.join(cols)})")
-        conn.execute("INSERT OR IGNORE INTO quests (user_id, last_reset) VALUES (0, ?)", (datetime.now(timezone.utc).isoformat(),))
+        quests.ensure_schema(conn)
         conn.commit()
     await bot.add_cog(FieryExtensions(bot, main.get_db_connection, main.update_user_stats_async, main.fiery_embed, main.AUDIT_CHANNEL_ID))
@@ -13,14 +13,17 @@ import discord
 from discord.ext import commands
 import random
 import asyncio
-import io
-import aiohttp
-import os
-import json
 import traceback
 import sqlite3 # ADDED: Necessary for database handling
 import sys
-from PIL import Image, ImageDraw, ImageOps
+import database
+import avatars
+import render
+import inventory
+import leaderboard
+import branding
+import audit
+import quests
 from datetime import datetime, timezone
 
 # Accessing shared logic from main and ignis
@@ -157,42 +160,11 @@ class FightSystem(commands.Cog):
         bar = symbol * filled + "🖤" * (length - filled)
         return f"**{bar}** `{hp}%`"
 
-    # Helper: Fetches the best pet from shop data
-    def get_user_pet(self, titles):
-        import shop
-        best_pet = None
-        max_luck = -1
-        for title in titles:
-            for tier, pets in shop.MARKET_DATA["Pets"].items():
-                for pet in pets:
-                    if pet['name'] == title:
-                        if pet['luck'] > max_luck:
-                            max_luck = pet['luck']
-                            best_pet = {"name": pet['name'], "tier": tier}
-        return best_pet
-
     async def create_duel_image(self, p1_url, p2_url):
-        import aiohttp
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(p1_url) as r1, session.get(p2_url) as r2:
-                    p1_data = io.BytesIO(await r1.read())
-                    p2_data = io.BytesIO(await r2.read())
-            bg_path = "1v1Background.jpg"
-            bg = Image.open(bg_path).convert("RGBA").resize((1000, 500)) if os.path.exists(bg_path) else Image.new("RGBA", (1000, 500), (40, 0, 0, 255))
-            av1 = Image.open(p1_data).convert("RGBA").resize((250, 250))
-            av2 = Image.open(p2_data).convert("RGBA").resize((250, 250))
-            av1 = ImageOps.expand(av1, border=10, fill=(255, 69, 0))
-            av2 = ImageOps.expand(av2, border=10, fill=(128, 0, 128))
-            bg.paste(av1, (100, 125), av1)
-            bg.paste(av2, (650, 125), av2)
-            overlay = Image.new("RGBA", bg.size, (139, 0, 0, 40))
-            bg = Image.alpha_composite(bg, overlay)
-            buf = io.BytesIO()
-            bg.save(buf, format="PNG")
-            buf.seek(0)
-            return buf
+            p1_data, p2_data = await avatars.fetch_pair(p1_url, p2_url)
         except: return None
+        return await render.card(render.duel_card, p1_data, p2_data)
 
     @commands.command(name="fuck", aliases=["challenge", "duel"])
     async def fight_challenge(self, ctx, member: discord.Member):
@@ -203,21 +175,19 @@ class FightSystem(commands.Cog):
         self.active_duels.add(ctx.channel.id)
 
         # PRE-FIGHT STAT SCAN
-        ignis_engine = self.bot.get_cog("IgnisEngine")
-        u1_inv = json.loads(main.get_user(ctx.author.id)['titles'])
-        u2_inv = json.loads(main.get_user(member.id)['titles'])
-        
-        pet1 = self.get_user_pet(u1_inv)
-        pet2 = self.get_user_pet(u2_inv)
+        await main.get_user_async(ctx.author.id)
+        await main.get_user_async(member.id)
+        assets = await database.read(inventory.load_stats, [ctx.author.id, member.id])
+        a1, a2 = assets[ctx.author.id], assets[member.id]
         
-        p1_prot, p1_luck = await ignis_engine.get_market_bonuses(u1_inv)
-        p2_prot, p2_luck = await ignis_engine.get_market_bonuses(u2_inv)
+        pet1, pet2 = a1.pet, a2.pet
+        p1_prot, p1_luck = a1.max_prot, a1.max_luck
+        p2_prot, p2_luck = a2.max_prot, a2.max_luck
         
-        with main.get_db_connection() as conn:
-            h1 = conn.execute("SELECT win_count FROM duel_history WHERE winner_id = ? AND loser_id = ?", (ctx.author.id, member.id)).fetchone()
-            h2 = conn.execute("SELECT win_count FROM duel_history WHERE winner_id = ? AND loser_id = ?", (member.id, ctx.author.id)).fetchone()
-            p1_vs_p2 = h1['win_count'] if h1 else 0
-            p2_vs_p1 = h2['win_count'] if h2 else 0
+        h1 = await database.fetchone("SELECT win_count FROM duel_history WHERE winner_id = ? AND loser_id = ?", (ctx.author.id, member.id))
+        h2 = await database.fetchone("SELECT win_count FROM duel_history WHERE winner_id = ? AND loser_id = ?", (member.id, ctx.author.id))
+        p1_vs_p2 = h1['win_count'] if h1 else 0
+        p2_vs_p1 = h2['win_count'] if h2 else 0
 
         p1_win_chance = 0.5 + ((p1_prot + p1_luck) - (p2_prot + p2_luck)) / 100
         p1_win_chance = max(0.15, min(0.85, p1_win_chance))
@@ -235,8 +205,8 @@ class FightSystem(commands.Cog):
         
         main_msg = None
         if file_buf:
-            file = discord.File(file_buf, filename="fight.png")
-            embed.set_image(url="attachment://fight.png")
+            file = discord.File(file_buf.fp, filename=file_buf.filename("fight"))
+            embed.set_image(url=f"attachment://{file_buf.filename('fight')}")
             main_msg = await ctx.send(file=file, embed=embed, view=cheer_view)
         else:
             main_msg = await ctx.send(embed=embed, view=cheer_view)
@@ -292,7 +262,7 @@ class FightSystem(commands.Cog):
                 f"👤 **{member.display_name}**\n{self.get_fiery_bar(p2_hp)}", 
                 color=0x8B0000 if i % 2 == 0 else 0xFF4500)
             
-            if file_buf: action_embed.set_image(url="attachment://fight.png")
+            if file_buf: action_embed.set_image(url=f"attachment://{file_buf.filename('fight')}")
             await main_msg.edit(embed=action_embed, view=None if p1_hp == 0 or p2_hp == 0 else cheer_view)
             await asyncio.sleep(4)
 
@@ -302,27 +272,35 @@ class FightSystem(commands.Cog):
         await main.update_user_stats_async(winner.id, amount=2500, xp_gain=500, source="Duel Win")
         await main.update_user_stats_async(loser.id, source="Duel Loss")
 
-        with main.get_db_connection() as conn:
+        mods = main.stat_modifiers()
+        effects = {'audits': [], 'heat': 0.0}
+
+        def _record_duel(conn):
             conn.execute("UPDATE users SET duel_wins = duel_wins + 1 WHERE id = ?", (winner.id,))
             conn.execute("""
                 INSERT INTO duel_history (winner_id, loser_id, win_count) 
                 VALUES (?, ?, 1)
                 ON CONFLICT(winner_id, loser_id) DO UPDATE SET win_count = win_count + 1
             """, (winner.id, loser.id))
-            conn.execute("UPDATE quests SET d1 = d1 + 1, w2 = w2 + 1 WHERE user_id = ?", (winner.id,))
-            conn.commit()
+            # The duel kill counts toward the kill quests; pay any it completes in this same transaction
+            for r_source, r_amount, r_xp in (q.reward for q in quests.record(conn, winner.id, {"kill": 1})):
+                main.apply_user_stats(conn, winner.id, r_amount, r_xp, 0, 0, 0, r_source, mods, effects)
             
             # Fetch fresh data for detailed win card
             u_upd = conn.execute("SELECT balance, level, duel_wins FROM users WHERE id = ?", (winner.id,)).fetchone()
             rival_data = conn.execute("SELECT win_count FROM duel_history WHERE winner_id = ? AND loser_id = ?", (winner.id, loser.id)).fetchone()
+            return u_upd, rival_data
+
+        u_upd, rival_data = await database.transaction(_record_duel)
+        await main.fire_stat_effects(effects)
+        leaderboard.mark_dirty((winner.id,))
 
         ach_cog = self.bot.get_cog("Achievements")
-        ach_text = ach_cog.get_achievement_summary(winner.id) if ach_cog else "N/A"
+        ach_text = await database.run(ach_cog.get_achievement_summary, winner.id) if ach_cog else "N/A"
 
         # Final Detailed Victory Embed
         win_card = discord.Embed(title="👑 SUPREME DOMINION REACHED", color=0xFFD700)
-        if os.path.exists("LobbyTopRight.jpg"):
-            logo_file = discord.File("LobbyTopRight.jpg", filename="victory_logo.jpg")
+        if branding.available():
             win_card.set_thumbnail(url="attachment://victory_logo.jpg")
         
         # Assistance Logic for Footer/Fields
@@ -348,32 +326,28 @@ class FightSystem(commands.Cog):
         win_card.set_image(url=winner.display_avatar.url)
         win_card.set_footer(text="The Red Room records your conquest. Submission is eternal.")
         
-        await ctx.send(content=f"🏆 {winner.mention} stands supreme!", embed=win_card)
+        await ctx.send(content=f"🏆 {winner.mention} stands supreme!", embed=win_card,
+                       files=branding.attach(win_card, "lobby", "victory_logo.jpg"))
 
         # --- NEW ADDED FEATURE: VOYEUR PRIVATE SESSION AUDIT ---
-        audit_channel = self.bot.get_channel(self.audit_channel_id)
-        if audit_channel:
-            audit_emb = main.fiery_embed("🕵️ VOYEUR PRIVATE SESSION AUDIT", 
-                f"The Master's Voyeurs have recorded a private dominance ritual in {ctx.channel.mention}.")
-            
-            if os.path.exists("LobbyTopRight.jpg"):
-                audit_emb.set_thumbnail(url="https://i.imgur.com/8N8K8S8.png")
-
-            audit_emb.add_field(name="⛓️ Dominant", value=winner.mention, inline=True)
-            audit_emb.add_field(name="🫦 Submissive", value=loser.mention, inline=True)
-            audit_emb.add_field(name="📊 Resulting Rivalry", value=f"`{rival_data['win_count']}` to `{p2_vs_p1 if winner == ctx.author else p1_vs_p2}`", inline=True)
-            
-            audit_emb.add_field(name="🐾 Pet Assistance", value=pet_assist, inline=True)
-            audit_emb.add_field(name="💚 Cuck Influence", value=cuck_boost, inline=True)
-            audit_emb.add_field(name="💰 Harvest", value="+2,500 Flames", inline=True)
-
-            audit_emb.description = (
-                f" f\"🔞 **VOYEUR NOTE:** {winner.display_name} has successfully broken {loser.display_name}'s resistance. \" "
-                f" f\"The session concluded with {winner.display_name} maintaining absolute control. \" "
-                f" f\"New Lifetime Wins for dominant: `{u_upd['duel_wins']}`.\""
-            )
-            
-            await audit_channel.send(embed=audit_emb)
+        audit_emb = main.fiery_embed("🕵️ VOYEUR PRIVATE SESSION AUDIT", 
+            f"The Master's Voyeurs have recorded a private dominance ritual in {ctx.channel.mention}.")
+        
+        audit_emb.add_field(name="⛓️ Dominant", value=winner.mention, inline=True)
+        audit_emb.add_field(name="🫦 Submissive", value=loser.mention, inline=True)
+        audit_emb.add_field(name="📊 Resulting Rivalry", value=f"`{rival_data['win_count']}` to `{p2_vs_p1 if winner == ctx.author else p1_vs_p2}`", inline=True)
+        
+        audit_emb.add_field(name="🐾 Pet Assistance", value=pet_assist, inline=True)
+        audit_emb.add_field(name="💚 Cuck Influence", value=cuck_boost, inline=True)
+        audit_emb.add_field(name="💰 Harvest", value="+2,500 Flames", inline=True)
+
+        audit_emb.description = (
+            f" f\"🔞 **VOYEUR NOTE:** {winner.display_name} has successfully broken {loser.display_name}'s resistance. \" "
+            f" f\"The session concluded with {winner.display_name} maintaining absolute control. \" "
+            f" f\"New Lifetime Wins for dominant: `{u_upd['duel_wins']}`.\""
+        )
+        
+        audit.post(self.audit_channel_id, audit_emb)
 
         self.active_duels.remove(ctx.channel.id)
 
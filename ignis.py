@@ -13,14 +13,20 @@ import discord
 from discord.ext import commands
 import random
 import asyncio
-import io
-import aiohttp
-import os
-import json
 import traceback
+import time
+import database
+import avatars
+import render
+import inventory
+import leaderboard
+import branding
+import resolver
+import audit
+import ledger
+from ledger import BattleLedger
 import sqlite3 # ADDED: Necessary for database handling
 import sys
-from PIL import Image, ImageDraw, ImageOps, ImageEnhance
 
 class LobbyView(discord.ui.View):
     def __init__(self, owner, edition):
@@ -179,89 +185,86 @@ class IgnisEngine(commands.Cog):
         
         await ctx.send(content=member.mention, embed=embed)
 
-    async def create_arena_image(self, winner_url, loser_url):
-        """GENERATES 1V1 VISUAL WITH MASSIVE AVATARS AND CRIMSON FILTER FOR THE FALLEN."""
+    async def prefetch_avatars(self, fighters):
+        """Downloads every tribute's avatar concurrently once the roster is set. {url: bytes or None}"""
+        urls = list({str(f['avatar']) for f in fighters})
+        fetched = await asyncio.gather(*(avatars.fetch_bytes(u) for u in urls), return_exceptions=True)
+        return {u: (None if isinstance(data, BaseException) else data) for u, data in zip(urls, fetched)}
+
+    async def create_arena_image(self, winner_url, loser_url, prefetched=None):
+        """GENERATES 1V1 VISUAL WITH MASSIVE AVATARS AND CRIMSON FILTER FOR THE FALLEN (painted in the render pool)."""
+        prefetched = prefetched or {}
+        p1_data = prefetched.get(str(winner_url))
+        p2_data = prefetched.get(str(loser_url))
+        if p1_data is None or p2_data is None:
+            try:
+                p1_data, p2_data = await avatars.fetch_pair(winner_url, loser_url)
+            except Exception as e:
+                print(f"Arena Image Error: {e}")
+                p1_data = p2_data = None # Worker paints the plain fallback card
+        return await render.card(render.arena_card, p1_data, p2_data)
+
+    # --- DB WORKER HELPERS (run via database.transaction, never on the event loop) ---
+    def _load_roster(self, conn, participants):
+        """Bulk pre-game load: seeds users rows, then reads every tribute,
+        their market assets and their relationship luck with one IN query each."""
+        ids = [(p_id,) for p_id in participants]
+        conn.executemany("INSERT OR IGNORE INTO users (id) VALUES (?)", ids)
+        marks = ",".join("?" * len(participants))
+        users = {r['id']: r for r in conn.execute(
+            f"SELECT id, current_win_streak FROM users WHERE id IN ({marks})", participants).fetchall()}
+        assets = inventory.load_stats(conn, participants)
+
+        # Relationship Luck Check - first bond found per tribute, as before
+        rel_luck = {}
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(winner_url, timeout=10) as r1, session.get(loser_url, timeout=10) as r2:
-                    if r1.status != 200 or r2.status != 200:
-                        raise Exception(f"Avatar download failed")
-                    p1_data = io.BytesIO(await r1.read())
-                    p2_data = io.BytesIO(await r2.read())
-            
-            # EXPANDED CANVAS FOR LARGER DISPLAY
-            canvas_w = 1000
-            canvas_h = 1000
-            bg_path = "1v1Background.jpg"
-            bg = Image.open(bg_path).convert("RGBA").resize((canvas_w, canvas_h)) if os.path.exists(bg_path) else Image.new("RGBA", (canvas_w, canvas_h), (180, 30, 0, 255))
-            
-            # MASSIVE AVATARS (UPGRADED FROM 300 TO 420)
-            av_large = 420
-            av_winner = Image.open(p1_data).convert("RGBA").resize((av_large, av_large))
-            av_winner = ImageOps.expand(av_winner, border=10, fill="orange") # Thicker border for dominant status
-            
-            # LOSER AVATAR WITH CRIMSON EXECUTION FILTER
-            av_loser_raw = Image.open(p2_data).convert("RGBA").resize((av_large, av_large))
-            # Step 1: Grayscale for defeat
-            av_loser = ImageOps.grayscale(av_loser_raw).convert("RGBA")
-            # Step 2: Apply Blood Red Overlay
-            red_overlay = Image.new("RGBA", av_loser.size, (255, 0, 0, 100)) # Semi-transparent Red
-            av_loser = Image.alpha_composite(av_loser, red_overlay)
-            # Step 3: Expand with thick gray border
-            av_loser = ImageOps.expand(av_loser, border=10, fill="gray")
-            
-            # PASTE WITH NEW COORDINATES
-            bg.paste(av_winner, (40, 150), av_winner)
-            bg.paste(av_loser, (540, 150), av_loser)
-            
-            draw = ImageDraw.Draw(bg)
-            # THICKER CROSS FOR MASSIVE SCALE
-            draw.line((400, 220, 600, 480), fill=(220, 220, 220), width=25)
-            draw.line((600, 220, 400, 480), fill=(220, 220, 220), width=25)
-            
-            buf = io.BytesIO()
-            # ADJUSTED CROP FOR LARGER SCALE
-            bg.crop((0, 50, 1000, 750)).save(buf, format="PNG")
-            buf.seek(0)
-            return buf
-        except Exception as e:
-            print(f"Arena Image Error: {e}")
-            fallback = Image.new("RGBA", (1000, 700), (120, 20, 0, 255))
-            buf = io.BytesIO()
-            fallback.save(buf, format="PNG")
-            buf.seek(0)
-            return buf
-
-    # ADDED: Internal Market Bonus Scanner to prevent circular imports
-    async def get_market_bonuses(self, inventory):
-        fb_prot = 0
-        final_luck = 0
-        for item in inventory:
-            # House Protections
-            if item in ["Damp Cell", "Rusty Locker", "Shadowed Shack", "Stone Alcove", "Maimed Tent"]: fb_prot = max(fb_prot, 1)
-            elif item in ["Sinner's Flat", "Guard's Bunk", "Brick Bunker", "Tribute Lodge", "Basement Vault"]: fb_prot = max(fb_prot, 2)
-            elif item in ["Gothic Manor", "Obsidian Villa", "Neon Penthouse", "Hidden Sanctuary", "Merchant's Estate"]: fb_prot = max(fb_prot, 4)
-            elif item in ["Velvet Dungeon", "Crystal Cathedral", "Shadow Fortress", "Iron Monastery", "Sky-Bound Spire"]: fb_prot = max(fb_prot, 8)
-            elif item in ["The Ivory Tower", "Abyssal Throne", "Grand Exhibition Hall", "Molten Citadel", "Kraken's Maw"]: fb_prot = max(fb_prot, 10)
-            elif item in ["The Forbidden Palace", "Dominion Prime", "Eternity's Bastion", "The Red Sun"]: fb_prot = max(fb_prot, 12)
-            elif item == "Absolute Null": fb_prot = max(fb_prot, 15)
-
-            # Pet Lucks
-            if item in ["Scrawny Rat", "One-EyED Cat", "Sewer Toad", "Maimed Pigeon", "Starving Cur"]: final_luck = max(final_luck, 1)
-            elif item in ["Pit Viper", "Trained Raven", "Black Rabbit", "Ferret Thief", "Dungeon Bat"]: final_luck = max(final_luck, 2)
-            elif item in ["Shadow Panther", "Silver Wolf", "Mech Spider", "Blood Hound", "Harpy Chick"]: final_luck = max(final_luck, 4)
-            elif item in ["Obsidian Gargoyle", "Succubus Spirit", "Void Serpent", "Iron Golem Minion", "Spectral Stag"]: final_luck = max(final_luck, 8)
-            elif item in ["Inferno Drake", "Master's Shadow", "Lich Owl", "Behemoth Cub", "Siren of Pits"]: final_luck = max(final_luck, 12)
-        return fb_prot, final_luck
+            rows = conn.execute(
+                f"SELECT user_one, user_two, shared_luck FROM relationships WHERE user_one IN ({marks}) OR user_two IN ({marks})",
+                participants + participants).fetchall()
+            for r in rows:
+                rel_luck.setdefault(r['user_one'], r['shared_luck'])
+                rel_luck.setdefault(r['user_two'], r['shared_luck'])
+        except: pass # Table might not exist yet
+        return users, assets, rel_luck
+
+    async def flush_ledger(self, battle_ledger):
+        """Commits a battle ledger in one transaction, then fires its audits/heat.
+        The journal is only removed once the data is safely committed."""
+        import sys
+        main = sys.modules['__main__']
+        effects = {'audits': [], 'heat': 0.0}
+        try:
+            result = await database.transaction(
+                battle_ledger.flush, main.apply_user_stats, self.classes, self.calculate_level,
+                main.stat_modifiers(), effects)
+        finally:
+            # The winner card ranked inside the transaction; re-read after commit/rollback
+            leaderboard.mark_dirty(battle_ledger.fxp_log)
+        battle_ledger.flushed = True
+        battle_ledger.close_journal(delete=True)
+        await main.fire_stat_effects(effects)
+        return result
+
+    async def cog_load(self):
+        # Replay battles that crashed before their ledger was flushed
+        await database.transaction(ledger.ensure_schema)
+        for path in ledger.pending_journals():
+            try:
+                pending = BattleLedger.replay(path)
+                if pending:
+                    await self.flush_ledger(pending)
+            except Exception as e:
+                print(f"❌ Battle journal replay failed for {path}: {e}")
 
     async def start_battle(self, channel, participants, edition):
         if channel.id in self.active_battles: 
             return
         self.active_battles.add(channel.id)
         
-        fxp_log = {p_id: {"participation": 100, "kills": 0, "first_kill": 0, "placement": 0, "final_rank": 0} for p_id in participants}
+        # Write-behind ledger: nothing hits the DB until the battle ends
+        battle_ledger = BattleLedger(f"{channel.id}-{edition}-{int(time.time())}", participants)
+        fxp_log = battle_ledger.fxp_log
         first_blood_recorded = False
-        audit_channel = self.bot.get_channel(self.audit_channel_id)
 
         try:
             # FIX: Ensuring bot is fully ready before battle logic begins
@@ -277,55 +280,49 @@ class IgnisEngine(commands.Cog):
             relationship_luck = {}
             target_streaks = {}
 
+            # One round-trip for the whole lobby instead of one per tribute
+            participants = list(dict.fromkeys(participants))
+            roster_rows, roster_assets, rel_luck = await database.transaction(self._load_roster, participants)
+
+            # Robust member fetching: gateway cache, resolver cache, then every miss concurrently
+            members = await resolver.members(channel.guild, participants)
+
             for p_id in participants:
                 # ADDED: Safety check for database existence before fetch
-                u_data = self.get_user(p_id) 
+                u_data = roster_rows.get(p_id)
                 if not u_data: continue
 
-                inv = json.loads(u_data['titles']) if u_data['titles'] else []
-                
-                # Market Scan
-                prot, luck = await self.get_market_bonuses(inv)
-                fb_protection[p_id] = prot
-                final_luck[p_id] = luck
+                # Market Scan (cached per-user derived stats)
+                asset = roster_assets[p_id]
+                fb_protection[p_id] = asset.max_prot
+                final_luck[p_id] = asset.max_luck
                 target_streaks[p_id] = u_data['current_win_streak']
+                relationship_luck[p_id] = rel_luck.get(p_id, 0)
 
-                # Relationship Luck Check - ADDED: Safety checks for table existence
-                relationship_luck[p_id] = 0
-                try:
-                    with self.get_db_connection() as conn:
-                        rel = conn.execute("SELECT shared_luck FROM relationships WHERE (user_one = ? OR user_two = ?)", (p_id, p_id)).fetchone()
-                        if rel: relationship_luck[p_id] = rel['shared_luck']
-                except: pass # Table might not exist yet
-
-                # ADDED: Connection timeout handling to prevent locked database errors
-                with self.get_db_connection() as conn:
-                    conn.execute("INSERT OR IGNORE INTO quests (user_id) VALUES (?)", (p_id,))
-                    conn.commit()
-
-                # Robust member fetching
-                member = channel.guild.get_member(p_id)
+                member = members.get(p_id)
                 if not member:
-                    try: 
-                        member = await channel.guild.fetch_member(p_id)
-                    except: 
-                        continue
+                    continue
                 
                 name = member.display_name
                 fighters.append({"id": p_id, "name": name, "avatar": member.display_avatar.url})
                 roster_list.append(f"<:FIERY_symkink_belt:1300924308876558386> **{name}**")
-                
-                with self.get_db_connection() as conn:
-                    conn.execute("UPDATE users SET games_played = games_played + 1 WHERE id = ?", (p_id,))
-                    conn.commit()
 
             # FIX: Changed condition to match list length correctly
             if len(fighters) < 2:
                 await channel.send("❌ Game cancelled: Not enough tributes found in the dungeon.")
+                battle_ledger.discard()
                 if channel.id in self.active_battles:
                     self.active_battles.remove(channel.id)
                 return
 
+            await database.executemany("UPDATE users SET games_played = games_played + 1 WHERE id = ?",
+                                       [(f['id'],) for f in fighters])
+            leaderboard.mark_dirty(f['id'] for f in fighters)
+            # From here on the battle counts: a crash flushes/replays instead of discarding
+            battle_ledger.start()
+            # All avatars download in parallel while the roster and intro are shown
+            avatar_prefetch = asyncio.create_task(self.prefetch_avatars(fighters))
+
             # ADDED: Safety wrapper for roster embed call
             try:
                 # ADDED: Ensuring main.fiery_embed exists
@@ -349,12 +346,9 @@ class IgnisEngine(commands.Cog):
                     climax_msg = f"⛓️ **THE FINAL STAND.** ⛓️\n\nOnly {t1['name']} and {t2['name']} remain. The dungeon falls silent as the Voyeurs lean in. One will stand, one will fall. The contract is about to be sealed..."
                     climax_emb = self.fiery_embed("FINAL CLIMAX", climax_msg, color=0x8B0000)
                     
-                    if os.path.exists("LobbyTopRight.jpg"):
-                        climax_file = discord.File("LobbyTopRight.jpg", filename="climax_logo.jpg")
+                    if branding.available():
                         climax_emb.set_thumbnail(url="attachment://climax_logo.jpg")
-                        await channel.send(file=climax_file, embed=climax_emb)
-                    else:
-                        await channel.send(embed=climax_emb)
+                    await channel.send(files=branding.attach(climax_emb, "lobby", "climax_logo.jpg"), embed=climax_emb)
                     
                     await asyncio.sleep(5) # The 5 second tension build
 
@@ -373,14 +367,7 @@ class IgnisEngine(commands.Cog):
 
                         loser = fighters.pop(temp_index)
                         event_losers.append(loser)
-                        await self.update_user_stats(loser['id'], deaths=1, source="Legendary Event")
-                        
-                        rem = len(fighters)
-                        fxp_log[loser['id']]["final_rank"] = rem + 1
-                        if rem == 4: fxp_log[loser['id']]["placement"] = 100
-                        elif rem == 3: fxp_log[loser['id']]["placement"] = 197
-                        elif rem == 2: fxp_log[loser['id']]["placement"] = 298
-                        elif rem == 1: fxp_log[loser['id']]["placement"] = 402
+                        battle_ledger.event_death(loser['id'], len(fighters))
 
                     if event_losers:
                         try:
@@ -413,165 +400,125 @@ class IgnisEngine(commands.Cog):
                 fighters.append(winner)
                 
                 game_kills[winner['id']] += 1
-                fxp_log[winner['id']]["kills"] += 37
                 
-                await self.update_user_stats(winner['id'], kills=1, source="Combat")
-                await self.update_user_stats(loser['id'], deaths=1, source="Combat")
+                is_first_blood = not first_blood_recorded
+                first_blood_recorded = True
+                battle_ledger.kill(winner['id'], loser['id'], len(fighters), first_blood=is_first_blood)
 
                 # --- BOUNTY PROTOCOL CHECK (2+ WIN STREAK) ---
                 if target_streaks.get(loser['id'], 0) >= 2:
-                    files = []
                     bounty_emb = self.fiery_embed("🎯 BOUNTY COLLECTED 🎯", 
                         f"**THE HIGH-VALUE TARGET HAS FALLEN.**\n\n"
                         f"{winner['name']} has executed {loser['name']}, who was on a **{target_streaks[loser['id']]} Win Streak**.\n\n"
                         f"💰 **BOUNTY REWARD:** +5,000 Flames & +5,000 XP has been wired to the killer's vault.")
                     
-                    if os.path.exists("LobbyTopRight.jpg"):
-                        files.append(discord.File("LobbyTopRight.jpg", filename="bounty_logo.jpg"))
+                    if branding.available():
                         bounty_emb.set_author(name="MASTER'S BOUNTY OFFICE", icon_url="attachment://bounty_logo.jpg")
                     
-                    await self.update_user_stats(winner['id'], amount=5000, xp_gain=5000, source="Bounty Collection")
-                    await channel.send(embed=bounty_emb, files=files)
-
-                with self.get_db_connection() as conn:
-                    if not first_blood_recorded:
-                        conn.execute("UPDATE users SET first_bloods = first_bloods + 1 WHERE id = ?", (winner['id'],))
-                        fxp_log[winner['id']]["first_kill"] = 75
-                        first_blood_recorded = True
-                        
-                        import sys # ADDED: Crucial to detect nsfw mode
-                        main = sys.modules['__main__']
-                        if main.nsfw_mode_active:
-                            flash_msg = f"🔞 **FIRST BLOOD HANGRYGAMES:** {loser['name']} has been taken down first! As per NSFW protocol, they are immediately stripped and exposed for the dungeon to see."
-                            await channel.send(embed=self.fiery_embed("Public Exposure", flash_msg, color=0xFF00FF))
-
-                    conn.execute("UPDATE users SET current_kill_streak = current_kill_streak + 1 WHERE id = ?", (winner['id'],))
-                    conn.execute("UPDATE users SET max_kill_streak = MAX(max_kill_streak, current_kill_streak) WHERE id = ?", (winner['id'],))
-                    conn.execute("UPDATE users SET current_kill_streak = 0, current_win_streak = 0 WHERE id = ?", (loser['id'],))
-                    
-                    rem = len(fighters)
-                    fxp_log[loser['id']]["final_rank"] = rem + 1
-                    if rem == 4: 
-                        fxp_log[loser['id']]["placement"] = 100
-                        conn.execute("UPDATE users SET top_5 = top_5 + 1 WHERE id = ?", (loser['id'],))
-                    elif rem == 3: 
-                        fxp_log[loser['id']]["placement"] = 197
-                        conn.execute("UPDATE users SET top_4 = top_4 + 1 WHERE id = ?", (loser['id'],))
-                    elif rem == 2: 
-                        fxp_log[loser['id']]["placement"] = 298
-                        conn.execute("UPDATE users SET top_3 = top_3 + 1 WHERE id = ?", (loser['id'],))
-                    elif rem == 1: 
-                        fxp_log[loser['id']]["placement"] = 402
-                        conn.execute("UPDATE users SET top_2 = top_2 + 1 WHERE id = ?", (loser['id'],))
-                    conn.commit()
-
-                arena_image = await self.create_arena_image(winner['avatar'], loser['avatar'])
-                file = discord.File(fp=arena_image, filename="arena.png")
+                    battle_ledger.award(winner['id'], amount=5000, xp_gain=5000, source="Bounty Collection")
+                    await channel.send(embed=bounty_emb, files=branding.attach(bounty_emb, "lobby", "bounty_logo.jpg"))
+
+                if is_first_blood:
+                    import sys # ADDED: Crucial to detect nsfw mode
+                    main = sys.modules['__main__']
+                    if main.nsfw_mode_active:
+                        flash_msg = f"🔞 **FIRST BLOOD HANGRYGAMES:** {loser['name']} has been taken down first! As per NSFW protocol, they are immediately stripped and exposed for the dungeon to see."
+                        await channel.send(embed=self.fiery_embed("Public Exposure", flash_msg, color=0xFF00FF))
+
+                arena_image = await self.create_arena_image(winner['avatar'], loser['avatar'], await avatar_prefetch)
                 try:
                     kill_msg = FieryLexicon.get_kill(winner['name'], loser['name'], is_final=is_final_fight)
                 except:
                     kill_msg = f"{winner['name']} has eliminated {loser['name']}!"
                 
                 emb = discord.Embed(title=f"⚔️ {winner['name']} VS {loser['name']}", description=kill_msg, color=0xFF4500)
-                emb.set_image(url="attachment://arena.png")
-                await channel.send(file=file, embed=emb)
+                if arena_image:
+                    emb.set_image(url=f"attachment://{arena_image.filename('arena')}")
+                    await channel.send(file=discord.File(fp=arena_image.fp, filename=arena_image.filename("arena")), embed=emb)
+                else:
+                    await channel.send(embed=emb)
                 await asyncio.sleep(5)
 
             # FINAL WINNER LOGIC
             winner_final = fighters[0]
             self.last_winner_id = winner_final['id']
-            fxp_log[winner_final['id']]["placement"] = 526 
-            fxp_log[winner_final['id']]["final_rank"] = 1
+            battle_ledger.crown(winner_final['id'])
+            battle_ledger.award(winner_final['id'], amount=15000, xp_gain=1000, wins=1, source="Game Win")
             
-            # --- CALCULATE RANK XP GAINS FIRST ---
-            processed_data = {}
-            for p_id, log in fxp_log.items():
-                total_gain = sum(log.values())
-                user_db = self.get_user(p_id)
-                u_class = user_db['class']
-                b_xp = self.classes[u_class]['bonus_xp'] if u_class in self.classes else 1.0
-                final_fxp = int(total_gain * b_xp)
-                
-                with self.get_db_connection() as conn:
-                    u = conn.execute("SELECT fiery_xp, fiery_level FROM users WHERE id=?", (p_id,)).fetchone()
-                    if u:
-                        new_xp = u['fiery_xp'] + final_fxp
-                        new_lvl = self.calculate_level(new_xp)
-                        conn.execute("UPDATE users SET fiery_xp = ?, fiery_level = ? WHERE id = ?", (new_xp, new_lvl, p_id))
-                    conn.commit()
-                processed_data[p_id] = final_fxp
+            # --- SINGLE FLUSH: kills, deaths, streaks, placements, FXP and prizes ---
+            flushed = await self.flush_ledger(battle_ledger)
+            if flushed is None:
+                # Already committed under this battle id; nothing of ours to announce
+                print(f"Battle {battle_ledger.battle_id} was already flushed, skipping the results")
+                return
+            processed_data = flushed['fxp']
+            w_rank, k_rank, g_rank, f_u = flushed['victor']
 
             # --- PROCESS WINNER REWARDS ---
-            winner_user_db = self.get_user(winner_final['id'])
-            winner_class_name = winner_user_db['class']
+            winner_class_name = f_u['class']
             flame_multiplier = self.classes[winner_class_name]['bonus_flames'] if winner_class_name in self.classes else 1.0
             total_flames_won = int(25000 * flame_multiplier)
-
-            await self.update_user_stats(winner_final['id'], amount=15000, xp_gain=1000, wins=1, source="Game Win")
             
-            f_u = self.get_user(winner_final['id'])
             lvl = f_u['fiery_level']
             rank_name = self.ranks[lvl-1] if lvl <= 100 else self.ranks[-1]
-            winner_member = channel.guild.get_member(winner_final['id']) or await channel.guild.fetch_member(winner_final['id'])
+            winner_member = await resolver.member(channel.guild, winner_final['id'])
+            winner_mention = winner_member.mention if winner_member else f"<@{winner_final['id']}>"
             
             try:
-                await channel.send(FieryLexicon.get_winner_announcement(winner_member.mention))
+                await channel.send(FieryLexicon.get_winner_announcement(winner_mention))
             except:
-                await channel.send(f"🏆 **{winner_member.mention} stands alone as the supreme victor!**")
+                await channel.send(f"🏆 **{winner_mention} stands alone as the supreme victor!**")
 
             # --- NEW ADDED FEATURE: DETAILED RANKED AUDIT LOGS (1-5) ---
-            if audit_channel:
-                # Sort participants by their rank (1 to N)
-                ranked_players = sorted(fxp_log.items(), key=lambda x: x[1]['final_rank'])
-                
-                for p_id, log in ranked_players:
-                    rank = log['final_rank']
-                    if rank > 5: continue # Only log top 5
+            # UPDATED: Queued through audit.py (coalesced into one message) with plain mentions
+            # Sort participants by their rank (1 to N)
+            ranked_players = sorted(fxp_log.items(), key=lambda x: x[1]['final_rank'])
+            
+            for p_id, log in ranked_players:
+                rank = log['final_rank']
+                if rank > 5: continue # Only log top 5
 
-                    try:
-                        m_stats = self.get_user(p_id)
-                        member = channel.guild.get_member(p_id) or await channel.guild.fetch_member(p_id)
-                        
-                        audit_title = f"🏆 TOP {rank} POSITION: MASTER'S LEDGER" if rank > 1 else "👑 SUPREME VICTOR: MASTER'S LEDGER"
-                        audit_color = 0xFFD700 if rank == 1 else 0xC0C0C0 if rank == 2 else 0xCD7F32 if rank == 3 else 0x800020
-                        
-                        audit_emb = discord.Embed(title=audit_title, color=audit_color)
-                        if os.path.exists("LobbyTopRight.jpg"):
-                            audit_file = discord.File("LobbyTopRight.jpg", filename="audit_logo.jpg")
-                            audit_emb.set_thumbnail(url="attachment://audit_logo.jpg")
-                        
-                        # Sexual themed detailed breakdown
-                        breakdown = (
-                            f"⛓️ **Member:** {member.mention}\n"
-                            f"🔞 **Dungeon Rank:** #{rank}\n"
-                            f"📊 **Participation:** {log['participation']} Neural Pts\n"
-                            f"⚔️ **Match Executions:** {game_kills[p_id]} kills ({log['kills']} FXP)\n"
-                            f"🩸 **First Blood Bonus:** {log['first_kill']} FXP\n"
-                            f"🥇 **Placement Value:** {log['placement']} XP\n"
-                            f"💦 **Neural Imprint (XP) Gained:** +{processed_data[p_id]}\n"
-                        )
-                        
-                        if rank == 1:
-                            breakdown += f"💰 **Winner's Prize:** +{total_flames_won} Flames\n"
-
-                        new_totals = (
-                            f"🔥 **Total Flames in Vault:** {m_stats['balance']:,}\n"
-                            f"💀 **Total Lifetime Executions:** {m_stats['kills']}\n"
-                            f"💦 **Total Fiery Experience:** {m_stats['fiery_xp']:,}\n"
-                            f"🔝 **Fiery Level:** {m_stats['fiery_level']} ({self.ranks[m_stats['fiery_level']-1] if m_stats['fiery_level'] <= 100 else self.ranks[-1]})"
-                        )
-
-                        audit_emb.description = breakdown
-                        audit_emb.add_field(name="💳 UPDATED member TOTALS", value=new_totals, inline=False)
-                        audit_emb.set_footer(text=f"Edition #{edition} | The Voyeurs watched your every move.")
-                        
-                        if os.path.exists("LobbyTopRight.jpg"): await audit_channel.send(file=audit_file, embed=audit_emb)
-                        else: await audit_channel.send(embed=audit_emb)
-                    except: pass
+                try:
+                    m_stats = await database.run(self.get_user, p_id)
+                    
+                    audit_title = f"🏆 TOP {rank} POSITION: MASTER'S LEDGER" if rank > 1 else "👑 SUPREME VICTOR: MASTER'S LEDGER"
+                    audit_color = 0xFFD700 if rank == 1 else 0xC0C0C0 if rank == 2 else 0xCD7F32 if rank == 3 else 0x800020
+                    
+                    audit_emb = discord.Embed(title=audit_title, color=audit_color)
+                    if branding.available():
+                        audit_emb.set_thumbnail(url="attachment://audit_logo.jpg")
+                    
+                    # Sexual themed detailed breakdown
+                    breakdown = (
+                        f"⛓️ **Member:** <@{p_id}>\n"
+                        f"🔞 **Dungeon Rank:** #{rank}\n"
+                        f"📊 **Participation:** {log['participation']} Neural Pts\n"
+                        f"⚔️ **Match Executions:** {game_kills[p_id]} kills ({log['kills']} FXP)\n"
+                        f"🩸 **First Blood Bonus:** {log['first_kill']} FXP\n"
+                        f"🥇 **Placement Value:** {log['placement']} XP\n"
+                        f"💦 **Neural Imprint (XP) Gained:** +{processed_data[p_id]}\n"
+                    )
+                    
+                    if rank == 1:
+                        breakdown += f"💰 **Winner's Prize:** +{total_flames_won} Flames\n"
+
+                    new_totals = (
+                        f"🔥 **Total Flames in Vault:** {m_stats['balance']:,}\n"
+                        f"💀 **Total Lifetime Executions:** {m_stats['kills']}\n"
+                        f"💦 **Total Fiery Experience:** {m_stats['fiery_xp']:,}\n"
+                        f"🔝 **Fiery Level:** {m_stats['fiery_level']} ({self.ranks[m_stats['fiery_level']-1] if m_stats['fiery_level'] <= 100 else self.ranks[-1]})"
+                    )
+
+                    audit_emb.description = breakdown
+                    audit_emb.add_field(name="💳 UPDATED member TOTALS", value=new_totals, inline=False)
+                    audit_emb.set_footer(text=f"Edition #{edition} | The Voyeurs watched your every move.")
+                    
+                    audit.post(self.audit_channel_id, audit_emb)
+                except: pass
 
             # Standard Win Card for the channel
             ach_cog = self.bot.get_cog("Achievements")
-            ach_text = ach_cog.get_achievement_summary(winner_final['id']) if ach_cog else "N/A"
+            ach_text = await database.run(ach_cog.get_achievement_summary, winner_final['id']) if ach_cog else "N/A"
 
             win_card = discord.Embed(title=f"👑 Fiery Hangrygames Winner 👑 # {edition}", color=0xFFD700)
             win_card.set_image(url=winner_final['avatar'])
@@ -589,30 +536,12 @@ class IgnisEngine(commands.Cog):
             
             win_card.add_field(name="💦 FIERY EXPERIENCE RECAP", value=breakdown_text, inline=True)
             
-            with self.get_db_connection() as conn:
-                w_rank_query = conn.execute("SELECT COUNT(*) + 1 as r FROM users WHERE wins > ?", (f_u['wins'],)).fetchone()
-                w_rank = w_rank_query['r'] if w_rank_query else "N/A"
-                
-                k_rank_query = conn.execute("SELECT COUNT(*) + 1 as r FROM users WHERE kills > ?", (f_u['kills'],)).fetchone()
-                k_rank = k_rank_query['r'] if k_rank_query else "N/A"
-                
-                g_rank_query = conn.execute("SELECT COUNT(*) + 1 as r FROM users WHERE games_played > ?", (f_u['games_played'],)).fetchone()
-                g_rank = g_rank_query['r'] if g_rank_query else "N/A"
-                
-                # --- UPDATE WIN STREAK LOGIC ---
-                conn.execute("UPDATE users SET current_win_streak = current_win_streak + 1 WHERE id = ?", (winner_final['id'],))
-                conn.execute("UPDATE users SET max_win_streak = MAX(max_win_streak, current_win_streak) WHERE id = ?", (winner_final['id'],))
-                conn.commit()
-                
-                # FETCH UPDATED STATS
-                updated_f_u = conn.execute("SELECT current_win_streak, max_win_streak, wins, games_played FROM users WHERE id = ?", (winner_final['id'],)).fetchone()
-                
-                # CUMULATIVE STATS FOR THE SUPREME VICTOR
-                total_arena_wins = updated_f_u['wins']
-                total_participations = updated_f_u['games_played']
-                current_streak = updated_f_u['current_win_streak']
-                max_streak = updated_f_u['max_win_streak']
-                lifetime_flame_pool = total_arena_wins * 15000 
+            # CUMULATIVE STATS FOR THE SUPREME VICTOR
+            total_arena_wins = f_u['wins']
+            total_participations = f_u['games_played']
+            current_streak = f_u['current_win_streak']
+            max_streak = f_u['max_win_streak']
+            lifetime_flame_pool = total_arena_wins * 15000 
             
             rank_text = f"🏆 **Wins:** Rank #{w_rank}\n⚔️ **Kills:** Rank #{k_rank}\n🎮 **Games:** Rank #{g_rank}"
             win_card.add_field(name="📊 SERVER STATS", value=rank_text, inline=True)
@@ -639,6 +568,17 @@ class IgnisEngine(commands.Cog):
             traceback.print_exc()
             await channel.send("❌ A critical dungeon error occurred. Call Rodz.")
         finally:
+            # Crash mid-battle: commit what was recorded so far. If even that
+            # fails the journal stays on disk and is replayed on next start.
+            # A battle that never started owes nothing and is dropped.
+            if not battle_ledger.flushed and not battle_ledger.started:
+                battle_ledger.discard()
+            elif not battle_ledger.flushed:
+                try:
+                    await self.flush_ledger(battle_ledger)
+                except Exception as e:
+                    battle_ledger.close_journal()
+                    print(f"❌ Battle ledger flush failed, journal kept: {e}")
             # ADDED: Ensure the arena is always unlocked even after a crash
             if channel.id in self.active_battles:
                 self.active_battles.remove(channel.id)
@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+from collections import namedtuple
+
+# ===== INVENTORY TABLE =====
+# Owned assets and badges used to live as a JSON list in users.titles, so every
+# purchase, sale and stat scan loaded and rewrote the whole blob. Each owned
+# item is now one row: buying/selling is a single INSERT/DELETE. users.titles
+# is left in place after the one-shot migration below, but nothing reads or
+# writes it any more, so it does not follow later purchases and sales.
+
+SCHEMA_VERSION = 1      # PRAGMA user_version once the titles blob is migrated
+BADGE_CATEGORY = "Badge"
+
+# Per-user derived stats. Houses/Pets give max_* to the arena and duels,
+# total_* feeds the reward calculator, pet is the best pet for duel flavour.
+AssetStats = namedtuple("AssetStats", "max_prot max_luck total_prot total_luck pet")
+EMPTY_STATS = AssetStats(0, 0, 0, 0, None)
+
+
+def ensure_schema(conn):
+    conn.execute("""CREATE TABLE IF NOT EXISTS inventory (
+        user_id INTEGER,
+        item_name TEXT,
+        category TEXT,
+        acquired_at REAL,
+        PRIMARY KEY (user_id, item_name)
+    )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_category ON inventory (category, user_id)")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        migrate_titles(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def migrate_titles(conn):
+    """One-shot copy of every users.titles JSON list into inventory rows.
+    List order is kept through acquired_at so badge displays don't reshuffle."""
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(users)").fetchall()]
+    if "titles" not in cols:
+        return 0
+    now = time.time()
+    rows = []
+    for r in conn.execute("SELECT id, titles FROM users WHERE titles IS NOT NULL AND titles != '[]'").fetchall():
+        try:
+            titles = json.loads(r[1])
+        except (TypeError, ValueError):
+            continue
+        for pos, name in enumerate(titles):
+            if isinstance(name, str):
+                item_name, category = resolve(name)
+                rows.append((r[0], item_name, category, now + pos * 1e-6))
+    conn.executemany("INSERT OR IGNORE INTO inventory (user_id, item_name, category, acquired_at) VALUES (?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def resolve(name):
+    """Canonical (item_name, category) for a title: market items use the
+    catalogue spelling and category, anything else is a badge."""
+    import shop
+    info = shop.lookup_item(name)
+    if info is None:
+        return name, BADGE_CATEGORY
+    return info.item['name'], info.category
+
+
+# --- WRITES (call inside the caller's transaction) ---
+def add_item(conn, user_id, item_name, category):
+    """Returns False if the user already owns it."""
+    cur = conn.execute("INSERT OR IGNORE INTO inventory (user_id, item_name, category, acquired_at) VALUES (?, ?, ?, ?)",
+                       (user_id, item_name, category, time.time()))
+    invalidate(user_id)
+    return cur.rowcount > 0
+
+
+def remove_item(conn, user_id, item_name):
+    """Returns False if the user didn't own it."""
+    cur = conn.execute("DELETE FROM inventory WHERE user_id = ? AND item_name = ?", (user_id, item_name))
+    invalidate(user_id)
+    return cur.rowcount > 0
+
+
+# --- READS ---
+def item_names(conn, user_id):
+    rows = conn.execute("SELECT item_name FROM inventory WHERE user_id = ? ORDER BY acquired_at, rowid", (user_id,)).fetchall()
+    return [r[0] for r in rows]
+
+
+def owns_any(conn, user_id, names):
+    marks = ",".join("?" * len(names))
+    return conn.execute(f"SELECT 1 FROM inventory WHERE user_id = ? AND item_name IN ({marks}) LIMIT 1",
+                        (user_id, *names)).fetchone() is not None
+
+
+# ===== DERIVED STATS CACHE =====
+# Every reward, duel and battle needs prot/luck, but inventories only change on
+# buy/sell/grant. Writers invalidate their user, and async callers invalidate
+# again once their transaction has committed so a read racing the commit can't
+# leave a stale entry behind. `!reload shop` clears everything (prices/stats).
+_stats_cache = {}
+_cache_lock = threading.Lock()
+
+
+def invalidate(user_id):
+    with _cache_lock:
+        _stats_cache.pop(user_id, None)
+
+
+def clear_cache():
+    with _cache_lock:
+        _stats_cache.clear()
+
+
+def _derive(names):
+    import shop
+    max_prot = max_luck = total_prot = total_luck = 0
+    pet = None
+    for name in names:
+        info = shop.lookup_item(name)
+        if info is None:
+            continue
+        if info.category == "Houses":
+            max_prot = max(max_prot, info.prot)
+            total_prot += info.prot
+        elif info.category == "Pets":
+            total_luck += info.luck
+            if info.luck > max_luck or pet is None:
+                max_luck = max(max_luck, info.luck)
+                pet = {"name": info.item['name'], "tier": info.tier}
+    return AssetStats(max_prot, max_luck, total_prot, total_luck, pet)
+
+
+def load_stats(conn, user_ids):
+    """{user_id: AssetStats} for many users; cache misses are read with one IN query."""
+    with _cache_lock:
+        found = {uid: _stats_cache[uid] for uid in user_ids if uid in _stats_cache}
+    missing = [uid for uid in user_ids if uid not in found]
+    if missing:
+        marks = ",".join("?" * len(missing))
+        owned = {uid: [] for uid in missing}
+        for r in conn.execute(f"""SELECT user_id, item_name FROM inventory
+                                  WHERE user_id IN ({marks}) AND category IN ('Houses', 'Pets')
+                                  ORDER BY acquired_at, rowid""", missing).fetchall():
+            owned[r[0]].append(r[1])
+        fresh = {uid: _derive(names) for uid, names in owned.items()}
+        with _cache_lock:
+            _stats_cache.update(fresh)
+        found.update(fresh)
+    return found
+
+
+def stats(conn, user_id):
+    return load_stats(conn, [user_id])[user_id]
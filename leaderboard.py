@@ -0,0 +1,136 @@
+import threading
+from bisect import bisect_left, insort
+
+# ===== LEADERBOARD CACHE =====
+# Every !me and every winner card asked SQLite for "COUNT(*) + 1 WHERE wins > ?"
+# three times over. The ranked stats are now mirrored in memory as one sorted
+# list per stat, so rank-of-value and top-N are a bisect / slice away.
+#
+# Writers don't push values in; they mark users dirty once their transaction
+# has committed, and the next read pulls just those rows back with one IN query
+# (so the cache can never hold a value that was rolled back). The first read
+# after start does the single full scan.
+
+RANKED_STATS = ("wins", "kills", "duel_wins", "games_played")
+
+# Indexes for the ORDER BY ... LIMIT reads that still go to SQLite: the
+# composite one !ranking sorts by, and first_bloods for !hall. The ranked
+# stats above are served from memory. Frequently written columns (balance,
+# the streaks) stay unindexed: their top-N reads are rare, and an index would
+# be updated by every reward, bet and claim. Both indexes cover their query,
+# since the rowid (users.id) is part of every index entry.
+USER_INDEXES = {
+    "idx_users_first_bloods": "first_bloods",
+    "idx_users_ranking": "wins DESC, kills DESC, games_played, first_bloods",
+}
+
+
+def ensure_schema(conn):
+    for name, columns in USER_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON users ({columns})")
+
+
+class SortedStat:
+    """One stat kept as a list of (-value, user_id), i.e. best first.
+
+    Positions are found by bisect, O(log n). Moving an entry (del + insort)
+    still shifts the list, O(n), which is a memmove at this server's size.
+    """
+    __slots__ = ("entries", "values")
+
+    def __init__(self):
+        self.entries = []
+        self.values = {}
+
+    def load(self, pairs):
+        self.values = dict(pairs)
+        self.entries = sorted((-v, uid) for uid, v in self.values.items())
+
+    def set(self, user_id, value):
+        old = self.values.get(user_id)
+        if old == value:
+            return
+        if old is not None:
+            i = bisect_left(self.entries, (-old, user_id))
+            del self.entries[i]
+        self.values[user_id] = value
+        insort(self.entries, (-value, user_id))
+
+    def rank(self, value):
+        # Same as COUNT(*) + 1 WHERE stat > value: (-value,) sorts before every (-value, id)
+        return bisect_left(self.entries, (-value,)) + 1
+
+    def top(self, n, minimum=None):
+        out = []
+        for neg, uid in self.entries[:n]:
+            if minimum is not None and -neg < minimum:
+                break
+            out.append((uid, -neg))
+        return out
+
+
+_boards = {stat: SortedStat() for stat in RANKED_STATS}
+_dirty = set()
+_loaded = False
+_lock = threading.Lock()
+
+
+def mark_dirty(user_ids):
+    """Call after committing a write to wins/kills/duel_wins/games_played."""
+    with _lock:
+        _dirty.update(user_ids)
+
+
+def invalidate_all():
+    global _loaded
+    with _lock:
+        _loaded = False
+        _dirty.clear()
+
+
+def _sync(conn):
+    global _loaded
+    cols = ", ".join(RANKED_STATS)
+    with _lock:
+        if not _loaded:
+            rows = conn.execute(f"SELECT id, {cols} FROM users").fetchall()
+            for stat in RANKED_STATS:
+                _boards[stat].load((r['id'], r[stat] or 0) for r in rows)
+            _dirty.clear()
+            _loaded = True
+            return
+        if not _dirty:
+            return
+        ids = list(_dirty)
+        _dirty.clear()
+        marks = ",".join("?" * len(ids))
+        for r in conn.execute(f"SELECT id, {cols} FROM users WHERE id IN ({marks})", ids).fetchall():
+            for stat in RANKED_STATS:
+                _boards[stat].set(r['id'], r[stat] or 0)
+
+
+# --- READS (DB worker thread, conn is only touched to refresh) ---
+def rank(conn, stat, value):
+    """1-based position a user with `value` holds for `stat`."""
+    _sync(conn)
+    with _lock:
+        return _boards[stat].rank(value or 0)
+
+
+def ranks(conn, values):
+    """{stat: rank} for several stats of one user in one refresh."""
+    _sync(conn)
+    with _lock:
+        return {stat: _boards[stat].rank(v or 0) for stat, v in values.items()}
+
+
+def top(conn, stat, n, minimum=None):
+    """[(user_id, value)] best first, stopping below `minimum`."""
+    _sync(conn)
+    with _lock:
+        return _boards[stat].top(n, minimum)
+
+
+def value(stat, user_id):
+    with _lock:
+        return _boards[stat].values.get(user_id, 0)
@@ -0,0 +1,240 @@
+import json
+import os
+import time
+
+import database
+import leaderboard
+
+# ===== BATTLE LEDGER (WRITE-BEHIND HANGRYGAMES STATS) =====
+# A battle used to commit after every elimination (winner stats, loser stats,
+# streaks, first blood, top_N). The ledger keeps all of that in memory and
+# flushes it in one transaction when the battle ends. Every event is appended
+# to a journal first, so a crash mid-battle replays on the next start instead
+# of losing the game. battle_flushes makes the replay idempotent.
+#
+# Nothing is owed until start() is journaled (fighters settled, games_played
+# bumped): a lobby that dies before that is discarded, never flushed. Journals
+# of battles still running in this process are never replayed, so reloading
+# the cog can't flush a live battle out from under itself.
+
+JOURNAL_DIR = os.path.join(os.path.dirname(database.DATABASE_PATH) or ".", "battle_journal")
+
+PARTICIPATION_FXP = 100
+KILL_FXP = 37
+FIRST_BLOOD_FXP = 75
+CHAMPION_FXP = 526
+# Fighters left after an elimination -> (placement FXP, users column)
+PLACEMENTS = {4: (100, "top_5"), 3: (197, "top_4"), 2: (298, "top_3"), 1: (402, "top_2")}
+
+_live = set()   # battle_ids whose journal is open in this process
+
+STREAK_SQL = """UPDATE users SET
+    max_kill_streak = CASE WHEN ? > 0 THEN MAX(max_kill_streak, current_kill_streak + ?) ELSE max_kill_streak END,
+    current_kill_streak = CASE WHEN ? THEN 0 ELSE current_kill_streak + ? END,
+    current_win_streak = CASE WHEN ? THEN 0 ELSE current_win_streak END,
+    first_bloods = first_bloods + ?,
+    top_2 = top_2 + ?, top_3 = top_3 + ?, top_4 = top_4 + ?, top_5 = top_5 + ?
+    WHERE id = ?"""
+
+
+def ensure_schema(conn):
+    conn.execute("""CREATE TABLE IF NOT EXISTS battle_flushes (
+        battle_id TEXT PRIMARY KEY,
+        flushed_at REAL
+    )""")
+
+
+class BattleLedger:
+    """Per-battle accumulator for kills, deaths, streaks, placements, FXP and awards."""
+
+    def __init__(self, battle_id, participants, journal=True):
+        self.battle_id = battle_id
+        self.participants = list(participants)
+        # Same shape the engine always used for the FXP breakdown cards
+        self.fxp_log = {p_id: {"participation": PARTICIPATION_FXP, "kills": 0, "first_kill": 0, "placement": 0, "final_rank": 0}
+                        for p_id in self.participants}
+        self.kills = {}
+        self.deaths = {}          # {user_id: {source: count}}
+        self.streak_broken = set()
+        self.first_bloods = {}
+        self.placements = {}      # {user_id: top_N column}
+        self.awards = []          # (user_id, amount, xp_gain, wins, source)
+        self.champion = None
+        self.started = False
+        self.flushed = False
+        self.journal_path = None
+        self._journal = None
+        if journal:
+            os.makedirs(JOURNAL_DIR, exist_ok=True)
+            self.journal_path = os.path.join(JOURNAL_DIR, f"{battle_id}.jsonl")
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+            _live.add(battle_id)
+            self._write("open", participants=self.participants)
+
+    # --- JOURNAL ---
+    def _write(self, event, **data):
+        if self._journal:
+            data["e"] = event
+            self._journal.write(json.dumps(data) + "\n")
+            self._journal.flush()
+
+    def close_journal(self, delete=False):
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+            _live.discard(self.battle_id)
+        if delete and self.journal_path and os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def discard(self):
+        """Drops a battle that never started (cancelled lobby)."""
+        self.flushed = True
+        self.close_journal(delete=True)
+
+    @classmethod
+    def replay(cls, path):
+        """Rebuilds an unflushed ledger from its journal file, or None (and
+        removes the file) if the battle never started."""
+        battle_id = os.path.splitext(os.path.basename(path))[0]
+        ledger = None
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    ev = json.loads(line)
+                except ValueError:
+                    break  # Torn last line from the crash
+                name = ev.pop("e")
+                if name == "open":
+                    ledger = cls(battle_id, ev["participants"], journal=False)
+                elif ledger:
+                    getattr(ledger, name)(**ev)
+        if ledger is None:
+            os.remove(path)
+            return None
+        ledger.journal_path = path
+        if not ledger.started:
+            ledger.discard()
+            return None
+        return ledger
+
+    # --- BATTLE EVENTS ---
+    def start(self):
+        """Fighters are settled and games_played is bumped: the battle now counts."""
+        self._write("start")
+        self.started = True
+
+    def _place(self, loser_id, remaining, count_top=True):
+        log = self.fxp_log.setdefault(loser_id, {"participation": PARTICIPATION_FXP, "kills": 0, "first_kill": 0, "placement": 0, "final_rank": 0})
+        log["final_rank"] = remaining + 1
+        if remaining in PLACEMENTS:
+            log["placement"], column = PLACEMENTS[remaining]
+            if count_top:
+                self.placements[loser_id] = column
+
+    def _death(self, loser_id, source):
+        by_source = self.deaths.setdefault(loser_id, {})
+        by_source[source] = by_source.get(source, 0) + 1
+
+    def kill(self, winner_id, loser_id, remaining, first_blood=False):
+        self._write("kill", winner_id=winner_id, loser_id=loser_id, remaining=remaining, first_blood=first_blood)
+        self.kills[winner_id] = self.kills.get(winner_id, 0) + 1
+        self.fxp_log[winner_id]["kills"] += KILL_FXP
+        if first_blood:
+            self.first_bloods[winner_id] = 1
+            self.fxp_log[winner_id]["first_kill"] = FIRST_BLOOD_FXP
+        self._death(loser_id, "Combat")
+        self.streak_broken.add(loser_id)
+        self._place(loser_id, remaining)
+
+    def event_death(self, loser_id, remaining):
+        """Legendary Event casualty: counts the death and FXP placement, not top_N or streaks."""
+        self._write("event_death", loser_id=loser_id, remaining=remaining)
+        self._death(loser_id, "Legendary Event")
+        self._place(loser_id, remaining, count_top=False)
+
+    def award(self, user_id, amount=0, xp_gain=0, wins=0, source="System"):
+        self._write("award", user_id=user_id, amount=amount, xp_gain=xp_gain, wins=wins, source=source)
+        self.awards.append((user_id, amount, xp_gain, wins, source))
+
+    def crown(self, user_id):
+        self._write("crown", user_id=user_id)
+        self.champion = user_id
+        self.fxp_log[user_id]["placement"] = CHAMPION_FXP
+        self.fxp_log[user_id]["final_rank"] = 1
+
+    # --- FLUSH ---
+    def flush(self, conn, apply_user_stats, classes, calculate_level, mods, effects):
+        """Writes the whole battle inside the caller's transaction (DB worker).
+
+        Returns {"fxp": {user_id: gained}, "victor": (w_rank, k_rank, g_rank, row)}
+        or None when this battle was already flushed.
+        """
+        if conn.execute("SELECT 1 FROM battle_flushes WHERE battle_id = ?", (self.battle_id,)).fetchone():
+            return None
+
+        # Combat stats: one stats update per fighter and source instead of one per duel
+        for p_id in set(self.kills) | set(self.deaths):
+            by_source = dict(self.deaths.get(p_id, {}))
+            combat_deaths = by_source.pop("Combat", 0)
+            kills = self.kills.get(p_id, 0)
+            if kills or combat_deaths:
+                apply_user_stats(conn, p_id, 0, 0, 0, kills, combat_deaths, "Combat", mods, effects, actions=kills + combat_deaths)
+            for source, deaths in by_source.items():
+                apply_user_stats(conn, p_id, 0, 0, 0, 0, deaths, source, mods, effects, actions=deaths)
+
+        for user_id, amount, xp_gain, wins, source in self.awards:
+            apply_user_stats(conn, user_id, amount, xp_gain, wins, 0, 0, source, mods, effects)
+
+        # Streaks, first bloods and placements in one executemany
+        rows = []
+        for p_id in set(self.kills) | self.streak_broken | set(self.first_bloods) | set(self.placements):
+            k = self.kills.get(p_id, 0)
+            broken = 1 if p_id in self.streak_broken else 0
+            col = self.placements.get(p_id)
+            rows.append((k, k, broken, k, broken, self.first_bloods.get(p_id, 0),
+                         int(col == "top_2"), int(col == "top_3"), int(col == "top_4"), int(col == "top_5"), p_id))
+        if rows:
+            conn.executemany(STREAK_SQL, rows)
+
+        # Fiery XP for everyone, scaled by class, in one read and one executemany
+        gained = {}
+        if self.fxp_log:
+            ids = list(self.fxp_log)
+            marks = ",".join("?" * len(ids))
+            current = {r['id']: r for r in conn.execute(
+                f"SELECT id, class, fiery_xp FROM users WHERE id IN ({marks})", ids).fetchall()}
+            updates = []
+            for p_id, log in self.fxp_log.items():
+                u = current.get(p_id)
+                if not u:
+                    continue
+                b_xp = classes[u['class']]['bonus_xp'] if u['class'] in classes else 1.0
+                final_fxp = int(sum(log.values()) * b_xp)
+                new_xp = u['fiery_xp'] + final_fxp
+                updates.append((new_xp, calculate_level(new_xp), p_id))
+                gained[p_id] = final_fxp
+            conn.executemany("UPDATE users SET fiery_xp = ?, fiery_level = ? WHERE id = ?", updates)
+
+        victor = None
+        if self.champion is not None:
+            w_id = self.champion
+            # --- UPDATE WIN STREAK LOGIC ---
+            conn.execute("""UPDATE users SET current_win_streak = current_win_streak + 1,
+                            max_win_streak = MAX(max_win_streak, current_win_streak + 1) WHERE id = ?""", (w_id,))
+            f_u = conn.execute("SELECT * FROM users WHERE id = ?", (w_id,)).fetchone()
+            # Everyone in this battle changed; refresh them from this transaction's view
+            leaderboard.mark_dirty(self.fxp_log)
+            r = leaderboard.ranks(conn, {"wins": f_u['wins'], "kills": f_u['kills'], "games_played": f_u['games_played']})
+            victor = (r["wins"], r["kills"], r["games_played"], f_u)
+
+        conn.execute("INSERT INTO battle_flushes (battle_id, flushed_at) VALUES (?, ?)", (self.battle_id, time.time()))
+        self.flushed = True
+        return {"fxp": gained, "victor": victor}
+
+
+def pending_journals():
+    """Journals left by battles that are not running in this process."""
+    if not os.path.isdir(JOURNAL_DIR):
+        return []
+    return sorted(os.path.join(JOURNAL_DIR, f) for f in os.listdir(JOURNAL_DIR)
+                  if f.endswith(".jsonl") and f[:-len(".jsonl")] not in _live)
@@ -10,15 +10,23 @@ except ImportError:
         pass 
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 import random
-import sqlite3
 import os
+import database
+import avatars
+import render
+import branding
+import assets
+import streaks as streak_alerts
+import audit
+import activity
+import quests
+import inventory
+import leaderboard
 import ignis
 import achievements
 import asyncio
-import json
-import shutil
 import sys
 from datetime import datetime, timedelta, timezone
 from lexicon import FieryLexicon
@@ -35,14 +43,8 @@ AUDIT_CHANNEL_ID = 1457706060199996570 # Seu canal de auditoria
 STREAK_ALERTS_CHANNEL_ID = 1457706060199996570 # Red Room Channel for Pings
 
 # --- NEW FEATURE: PERSISTENT STORAGE PATH ---
-# This checks if the bot is on Railway (using a volume at /app/data)
-# If not, it creates a local 'data' folder so you don't lose stats locally.
-if os.path.exists("/app/data"):
-    DATABASE_PATH = "/app/data/economy.db"
-else:
-    if not os.path.exists("data"):
-        os.makedirs("data")
-    DATABASE_PATH = "data/economy.db"
+# Resolved once in database.py (Railway volume at /app/data, else local 'data' folder)
+DATABASE_PATH = database.DATABASE_PATH
 
 intents = discord.Intents.all()
 # Explicitly forcing Message Content intent in code for Railway stability
@@ -78,11 +80,9 @@ CLASSES = {
 
 # ===== 2. DATABASE SYSTEM =====
 def get_db_connection():
-    # ADDED: Increased timeout to 30s to prevent 'database is locked' errors during heavy combat
-    # FIXED: Using DATABASE_PATH for persistence
-    conn = sqlite3.connect(DATABASE_PATH, timeout=30.0)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # UPDATED: Leases a connection from the shared WAL pool (database.py) instead of
+    # opening a new one per call. Still used as `with get_db_connection() as conn:`
+    return database.connection()
 
 # NEW PERSISTENCE HELPERS
 def save_game_config():
@@ -122,6 +122,16 @@ def init_db():
             PRIMARY KEY (submissive_id)
         )""")
         
+        # Bonds (rings); also created by shop.py, needed here for the stats updater join
+        conn.execute("""CREATE TABLE IF NOT EXISTS relationships (
+            user_one INTEGER,
+            user_two INTEGER,
+            type TEXT,
+            shared_luck REAL DEFAULT 0.0,
+            passive_income REAL DEFAULT 0.0,
+            PRIMARY KEY (user_one, user_two)
+        )""")
+        
         # ADDED: DUEL HISTORY TABLE (Tracks Victims of !fuck)
         conn.execute("""CREATE TABLE IF NOT EXISTS duel_history (
             winner_id INTEGER,
@@ -130,12 +140,8 @@ def init_db():
             PRIMARY KEY (winner_id, loser_id)
         )""")
 
-        # Quest Table (20 Daily, 20 Weekly)
-        q_cols = ["user_id INTEGER PRIMARY KEY"]
-        for i in range(1, 21): q_cols.append(f"d{i} INTEGER DEFAULT 0")
-        for i in range(1, 21): q_cols.append(f"w{i} INTEGER DEFAULT 0")
-        q_cols.append("last_reset TEXT")
-        conn.execute(f"CREATE TABLE IF NOT EXISTS quests ({', '.join(q_cols)})")
+        # Quest progress (definitions live in quests.py)
+        quests.ensure_schema(conn)
 
         required_columns = [
             ("balance", "INTEGER DEFAULT 500"), ("xp", "INTEGER DEFAULT 0"),
@@ -177,33 +183,43 @@ def init_db():
                 except: pass
                 
         conn.execute("INSERT OR IGNORE INTO global_stats (id) VALUES (1)")
+
+        # ADDED: Normalized inventory table (one-shot migration from users.titles)
+        inventory.ensure_schema(conn)
+        # ADDED: Indexes behind every rank / top-N read
+        leaderboard.ensure_schema(conn)
+        # ADDED: CDN URLs of the uploaded branding images
+        branding.ensure_schema(conn)
+        # ADDED: Pending streak warnings, indexed by when they fire
+        streak_alerts.ensure_schema(conn)
+        # ADDED: Collect's activity log and its report checkpoints
+        activity.ensure_schema(conn)
         conn.commit()
 
-init_db()
+# Spawned render workers re-import this file as __mp_main__; only the bot process owns the schema
+if __name__ == "__main__":
+    init_db()
 
 # ===== 3. CORE HELPERS & AUDIT =====
 async def send_audit_log(user_id, amount, source, xp=0):
-    channel = bot.get_channel(AUDIT_CHANNEL_ID)
-    if not channel: return
+    # UPDATED: Queued (audit.py) and written as a plain mention, so a stats update
+    # never waits on a user fetch, a logo upload or the audit channel's rate limit
     try:
-        user = await bot.fetch_user(user_id)
+        mention = f"<@{user_id}>"
         # --- NEW EROTIC AUDIT STYLE ---
         embed = discord.Embed(
             title="🕵️ THE MASTER'S LEDGER: TRANSACTION RECORDED", 
-            description=f"A new vibration in the pit. Asset {user.mention} has processed a transaction.",
+            description=f"A new vibration in the pit. Asset {mention} has processed a transaction.",
             color=0x8B0000, 
             timestamp=datetime.now(timezone.utc)
         )
         
-        image_path = "LobbyTopRight.jpg"
-        if os.path.exists(image_path):
-            file = discord.File(image_path, filename="ledger_logo.jpg")
+        if branding.available():
             embed.set_thumbnail(url="attachment://ledger_logo.jpg")
-        else:
-            embed.set_thumbnail(url=user.display_avatar.url)
-            file = None
+        elif bot.get_user(user_id):
+            embed.set_thumbnail(url=bot.get_user(user_id).display_avatar.url)
             
-        embed.add_field(name="🫦 Ident: Asset", value=user.mention, inline=True)
+        embed.add_field(name="🫦 Ident: Asset", value=mention, inline=True)
         embed.add_field(name="⛓️ Source: Protocol", value=f"**{source}**", inline=True)
         
         # Details with Emojis
@@ -214,11 +230,7 @@ async def send_audit_log(user_id, amount, source, xp=0):
             embed.add_field(name="💦 Neural Imprint (XP)", value=f"**+{xp}** experience units synchronized.", inline=False)
         
         embed.set_footer(text="🔞 THE RED ROOM RECORDS EVERYTHING 🔞")
-        
-        if file:
-            await channel.send(file=file, embed=embed)
-        else:
-            await channel.send(embed=embed)
+        audit.post(AUDIT_CHANNEL_ID, embed)
     except Exception as e: 
         print(f"Audit Log Error: {e}")
 
@@ -231,8 +243,11 @@ def fiery_embed(title, description, color=0xFF4500):
     
     embed = discord.Embed(title=f"🔥 {title.upper()} 🔥", description=description, color=color)
     
-    # FIXED: Mandatory Image Integration on ALL embeds
-    if os.path.exists("LobbyTopRight.jpg"):
+    # FIXED: Mandatory Image Integration on ALL embeds (CDN copy once branding is published)
+    logo_url = branding.url()
+    if logo_url:
+        embed.set_thumbnail(url=logo_url)
+    elif assets.exists("LobbyTopRight.jpg"):
         embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
         
     embed.set_footer(text="🔞 FIERY HANGRYGAMES EDITION 🔞")
@@ -248,40 +263,46 @@ def get_user(user_id):
             return get_user(user_id)
         return user
 
-# --- NEW HELPER: ASSET STAT SCANNER ---
-def calculate_item_bonuses(user_id):
-    """ADDED: Calculates total Protection and Luck from owned Black Market assets."""
-    user = get_user(user_id)
-    try:
-        titles = json.loads(user['titles'])
-    except:
-        return 0, 0
-        
-    total_prot = 0
-    total_luck = 0
-    
-    shop_cog = bot.get_cog("Shop")
-    if not shop_cog: 
-        return 0, 0
-    
-    for item_name in titles:
-        # Cross-references name with Shop MARKET_DATA via the scanner helper
-        item_data, cat, tier = shop_cog.get_item_details(item_name)
-        if item_data:
-            if cat == "Houses": total_prot += item_data.get("prot", 0)
-            if cat == "Pets": total_luck += item_data.get("luck", 0)
-            
-    return total_prot, total_luck
+async def get_user_async(user_id):
+    """Awaitable get_user for coroutines: the lookup runs on a DB worker thread."""
+    return await database.run(get_user, user_id)
 
-async def update_user_stats_async(user_id, amount=0, xp_gain=0, wins=0, kills=0, deaths=0, source="System"):
-    user = get_user(user_id)
+# --- NEW HELPER: ASSET STAT SCANNER ---
+def calculate_item_bonuses(user_id, conn=None):
+    """ADDED: Calculates total Protection and Luck from owned Black Market assets.
+    Pass the caller's connection to read inside its transaction."""
+    if conn is None:
+        with get_db_connection() as conn:
+            asset = inventory.stats(conn, user_id)
+    else:
+        asset = inventory.stats(conn, user_id)
+    return asset.total_prot, asset.total_luck
+
+# One read: the user row plus the contract and (first) relationship it pays into
+STATS_READ_SQL = """
+    SELECT u.*,
+           c.dominant_id AS contract_dom, c.tax_rate AS contract_tax, c.expiry AS contract_expiry,
+           r.user_one AS rel_one, r.user_two AS rel_two, r.passive_income AS rel_income
+    FROM users u
+    LEFT JOIN contracts c ON c.submissive_id = u.id
+    LEFT JOIN relationships r ON r.rowid = (
+        SELECT rowid FROM relationships WHERE user_one = u.id OR user_two = u.id LIMIT 1)
+    WHERE u.id = ?"""
+
+def apply_user_stats(conn, user_id, amount, xp_gain, wins, kills, deaths, source, mods, effects, actions=1):
+    """Applies one reward inside the caller's transaction (runs on a DB worker).
+
+    mods carries the event-loop state (heat, nsfw, master bounty); effects
+    collects audits and heat to fire after commit. Quest rewards earned here
+    are applied recursively on the same connection. `actions` is how many
+    individual updates were merged into this one (battle ledger).
+    """
+    conn.execute("INSERT OR IGNORE INTO users (id) VALUES (?)", (user_id,))
+    user = conn.execute(STATS_READ_SQL, (user_id,)).fetchone()
     u_class = user['class']
-    
-    ext = bot.get_cog("FieryExtensions")
-    global nsfw_mode_active
 
     # --- ADDED: FUNCTIONAL STAT INTEGRATION ---
-    u_prot, u_luck = calculate_item_bonuses(user_id)
+    u_prot, u_luck = calculate_item_bonuses(user_id, conn)
     
     # --- ADDED: ANNIVERSARY MULTIPLIER LOGIC ---
     anni_mult = 1.0
@@ -293,11 +314,6 @@ async def update_user_stats_async(user_id, amount=0, xp_gain=0, wins=0, kills=0,
                 anni_mult = 2.0 # Ping handled by ship.py, stats handled here
         except: pass
 
-    # MULTIPLIERS: Legendary Heat + NSFW Time Double Bonus
-    heat_mult = ext.heat_multiplier if ext else 1.0
-    nsfw_mult = 2.0 if nsfw_mode_active else 1.0
-    xp_heat_mult = 3.0 if (ext and ext.master_present) else 1.0 
-    
     b_flames = CLASSES[u_class]['bonus_flames'] if u_class in CLASSES else 1.0
     b_xp = CLASSES[u_class]['bonus_xp'] if u_class in CLASSES else 1.0
     
@@ -306,109 +322,99 @@ async def update_user_stats_async(user_id, amount=0, xp_gain=0, wins=0, kills=0,
     luck_roll = random.randint(1, 100)
     final_luck_mult = 2.0 if luck_roll <= u_luck else 1.0
     
-    final_amount = int(amount * b_flames * heat_mult * nsfw_mult * final_luck_mult * anni_mult)
-    final_xp = int(xp_gain * b_xp * xp_heat_mult * nsfw_mult * anni_mult)
+    final_amount = int(amount * b_flames * mods['heat'] * mods['nsfw'] * final_luck_mult * anni_mult)
+    final_xp = int(xp_gain * b_xp * mods['xp_heat'] * mods['nsfw'] * anni_mult)
+
+    credits = [] # (amount, user_id) paid out to partners/owners in one executemany
+
+    # --- RELATIONSHIP PASSIVE INCOME LOGIC ---
+    if user['rel_one'] is not None and final_amount > 0:
+        partner_id = user['rel_two'] if user['rel_one'] == user_id else user['rel_one']
+        share_rate = user['rel_income'] or 0
+        if share_rate > 0:
+            partner_share = int(final_amount * share_rate)
+            credits.append((partner_share, partner_id))
+            # Log the passive gift to audit
+            effects['audits'].append((partner_id, partner_share, f"Shared Income from Asset <@{user_id}>", 0))
+
+    # --- CONTRACT TAX LOGIC ---
+    if user['contract_dom'] is not None:
+        expiry = datetime.fromisoformat(user['contract_expiry'])
+        if datetime.now(timezone.utc) < expiry:
+            if final_amount > 0:
+                tax_paid = int(final_amount * user['contract_tax'])
+                final_amount -= tax_paid
+                credits.append((tax_paid, user['contract_dom']))
+                # AUDIT FOR CONTRACT TAX
+                effects['audits'].append((user['contract_dom'], tax_paid, f"⛓️ Contract Tax: Extracted from <@{user_id}>", 0))
+        else:
+            conn.execute("DELETE FROM contracts WHERE submissive_id = ?", (user_id,))
+    
+    # --- LEGENDARY BLOOD BOUNTY ---
+    final_amount += mods['blood_bounty'] * kills
 
-    # Buffer for recursive reward calls to prevent "Database is locked"
-    pending_rewards = []
-    tax_paid = 0
+    # --- QUEST REWARD INTEGRATION ---
+    # One upsert ... RETURNING advances every triggered quest and reports completions
+    events = quests.stat_events(source, wins, kills, actions)
+    pending_rewards = [q.reward for q in quests.record(conn, user_id, events)]
 
-    # --- SQL TRANSACTION BLOCK ---
-    with get_db_connection() as conn:
-        conn.execute("INSERT OR IGNORE INTO quests (user_id) VALUES (?)", (user_id,))
-        
-        # --- RELATIONSHIP PASSIVE INCOME LOGIC ---
-        try:
-            rel = conn.execute("SELECT * FROM relationships WHERE user_one = ? OR user_two = ?", (user_id, user_id)).fetchone()
-            if rel and final_amount > 0:
-                partner_id = rel['user_two'] if rel['user_one'] == user_id else rel['user_one']
-                share_rate = rel['passive_income']
-                if share_rate > 0:
-                    partner_share = int(final_amount * share_rate)
-                    conn.execute("UPDATE users SET balance = balance + ? WHERE id = ?", (partner_share, partner_id))
-                    # Log the passive gift to audit
-                    await send_audit_log(partner_id, partner_share, f"Shared Income from Asset <@{user_id}>")
-        except: pass
+    # --- UPDATE MAIN STATS ---
+    if amount > 0:
+        effects['heat'] += 0.5
 
-        # --- CONTRACT TAX LOGIC ---
-        active_contract = conn.execute("SELECT * FROM contracts WHERE submissive_id = ?", (user_id,)).fetchone()
-        if active_contract:
-            expiry = datetime.fromisoformat(active_contract['expiry'])
-            if datetime.now(timezone.utc) < expiry:
-                if final_amount > 0:
-                    tax_paid = int(final_amount * active_contract['tax_rate'])
-                    final_amount -= tax_paid
-                    conn.execute("UPDATE users SET balance = balance + ? WHERE id = ?", (tax_paid, active_contract['dominant_id']))
-                    # AUDIT FOR CONTRACT TAX
-                    await send_audit_log(active_contract['dominant_id'], tax_paid, f"⛓️ Contract Tax: Extracted from <@{user_id}>")
-            else:
-                conn.execute("DELETE FROM contracts WHERE submissive_id = ?", (user_id,))
-        
-        # --- LEGENDARY BLOOD BOUNTY ---
-        if kills > 0 and ext and ext.master_present:
-             final_amount += 500 
-
-        # --- QUEST REWARD INTEGRATION ---
-        if source not in ["Daily Reward", "Weekly Reward"]:
-            if kills > 0: 
-                conn.execute("UPDATE quests SET d1 = d1 + ?, w2 = w2 + ? WHERE user_id = ?", (kills, kills, user_id))
-                q = conn.execute("SELECT d1, w2 FROM quests WHERE user_id = ?", (user_id,)).fetchone()
-                if q and q['d1'] == 1: pending_rewards.append(("Daily Reward", 250, 100))
-                if q and q['w2'] == 25: pending_rewards.append(("Weekly Reward", 2000, 1000))
-
-            if wins > 0: 
-                conn.execute("UPDATE quests SET d6 = d6 + 1, w1 = w1 + 1 WHERE user_id = ?", (user_id,))
-                q = conn.execute("SELECT d6, w1 FROM quests WHERE user_id = ?", (user_id,)).fetchone()
-                if q and q['d6'] == 1: pending_rewards.append(("Daily Reward", 250, 100))
-                if q and q['w1'] == 5: pending_rewards.append(("Weekly Reward", 2000, 1000))
-
-            if source == "Work": 
-                conn.execute("UPDATE quests SET d5 = d5 + 1, w5 = w5 + 1 WHERE user_id = ?", (user_id,))
-                q = conn.execute("SELECT d5, w5 FROM quests WHERE user_id = ?", (user_id,)).fetchone()
-                if q and q['d5'] == 5: pending_rewards.append(("Daily Reward", 250, 100))
-                if q and q['w5'] == 30: pending_rewards.append(("Weekly Reward", 2000, 1000))
-
-            if source == "Beg": 
-                conn.execute("UPDATE quests SET d4 = d4 + 1, w15 = w15 + 1 WHERE user_id = ?", (user_id,))
-                q = conn.execute("SELECT d4, w15 FROM quests WHERE user_id = ?", (user_id,)).fetchone()
-                if q and q['d4'] == 5: pending_rewards.append(("Daily Reward", 250, 100))
-                if q and q['w15'] == 20: pending_rewards.append(("Weekly Reward", 2000, 1000))
-
-            if source == "Flirt": 
-                conn.execute("UPDATE quests SET d11 = d11 + 1, w10 = w10 + 1 WHERE user_id = ?", (user_id,))
-                q = conn.execute("SELECT d11, w10 FROM quests WHERE user_id = ?", (user_id,)).fetchone()
-                if q and q['d11'] == 5: pending_rewards.append(("Daily Reward", 250, 100))
-                if q and q['w10'] == 20: pending_rewards.append(("Weekly Reward", 2000, 1000))
-            
-            conn.execute("UPDATE quests SET d12 = d12 + 1, w6 = w6 + 1 WHERE user_id = ?", (user_id,))
-            q_gen = conn.execute("SELECT d12, w6 FROM quests WHERE user_id = ?", (user_id,)).fetchone()
-            if q_gen and q_gen['d12'] == 10: pending_rewards.append(("Daily Reward", 250, 100))
-            if q_gen and q_gen['w6'] == 50: pending_rewards.append(("Weekly Reward", 2000, 1000))
-
-        # --- UPDATE MAIN STATS ---
-        if ext and amount > 0:
-            ext.add_heat(0.5)
-
-        new_xp = user['xp'] + final_xp
-        new_level = user['level']
-        while new_xp >= (new_level * 1000):
-            new_xp -= (new_level * 1000)
-            new_level += 1
-            
-        conn.execute("""UPDATE users SET balance = MAX(0, balance + ?), xp = ?, level = ?, 
-                        wins = wins + ?, kills = kills + ?, deaths = deaths + ? 
-                        WHERE id = ?""", 
-                      (final_amount, new_xp, new_level, wins, kills, deaths, user_id))
+    new_xp = user['xp'] + final_xp
+    new_level = user['level']
+    while new_xp >= (new_level * 1000):
+        new_xp -= (new_level * 1000)
+        new_level += 1
+
+    if credits:
+        conn.executemany("UPDATE users SET balance = balance + ? WHERE id = ?", credits)
+    conn.execute("""UPDATE users SET balance = MAX(0, balance + ?), xp = ?, level = ?, 
+                    wins = wins + ?, kills = kills + ?, deaths = deaths + ? 
+                    WHERE id = ?""", 
+                  (final_amount, new_xp, new_level, wins, kills, deaths, user_id))
+    if kills or deaths:
         conn.execute("UPDATE global_stats SET total_kills = total_kills + ?, total_deaths = total_deaths + ? WHERE id = 1", (kills, deaths))
-        conn.commit()
 
-    # --- POST-TRANSACTION LOGS & RECURSION ---
-    # The database connection is CLOSED here, allowing the next calls to succeed
     if (final_amount) != 0 or final_xp > 0:
-        await send_audit_log(user_id, final_amount, source, final_xp)
-        
+        effects['audits'].append((user_id, final_amount, source, final_xp))
+    if wins or kills:
+        effects.setdefault('ranked', set()).add(user_id)
+
     for r_source, r_amount, r_xp in pending_rewards:
-        await update_user_stats_async(user_id, amount=r_amount, xp_gain=r_xp, source=r_source)
+        apply_user_stats(conn, user_id, r_amount, r_xp, 0, 0, 0, r_source, mods, effects)
+    return final_amount
+
+def stat_modifiers():
+    """MULTIPLIERS: Legendary Heat + NSFW Time Double Bonus (event-loop state, read once)."""
+    ext = bot.get_cog("FieryExtensions")
+    global nsfw_mode_active
+    return {
+        'heat': ext.heat_multiplier if ext else 1.0,
+        'nsfw': 2.0 if nsfw_mode_active else 1.0,
+        'xp_heat': 3.0 if (ext and ext.master_present) else 1.0,
+        'blood_bounty': 500 if (ext and ext.master_present) else 0, # Per kill
+    }
+
+async def fire_stat_effects(effects):
+    """Heat and audit logs collected by apply_user_stats, sent once the data is committed."""
+    leaderboard.mark_dirty(effects.get('ranked', ()))
+    ext = bot.get_cog("FieryExtensions")
+    if ext and effects['heat']:
+        ext.add_heat(effects['heat'])
+    for a_user, a_amount, a_source, a_xp in effects['audits']:
+        await send_audit_log(a_user, a_amount, a_source, a_xp)
+
+async def update_user_stats_async(user_id, amount=0, xp_gain=0, wins=0, kills=0, deaths=0, source="System"):
+    mods = stat_modifiers()
+    effects = {'audits': [], 'heat': 0.0}
+
+    # --- SINGLE SQL TRANSACTION (reward + quest payouts commit together) ---
+    await database.transaction(apply_user_stats, user_id, amount, xp_gain, wins, kills, deaths, source, mods, effects)
+
+    # --- POST-TRANSACTION LOGS ---
+    await fire_stat_effects(effects)
 
 def update_user_stats(user_id, amount=0, xp_gain=0, wins=0, kills=0, deaths=0):
     user = get_user(user_id)
@@ -431,6 +437,8 @@ def update_user_stats(user_id, amount=0, xp_gain=0, wins=0, kills=0, deaths=0):
                       (final_amount, new_xp, new_level, wins, kills, deaths, user_id))
         conn.execute("UPDATE global_stats SET total_kills = total_kills + ?, total_deaths = total_deaths + ? WHERE id = 1", (kills, deaths))
         conn.commit()
+    if wins or kills:
+        leaderboard.mark_dirty((user_id,))
 
 # ===== 4. CLASS DETAIL COMMANDS =====
 async def send_class_details(ctx, class_name):
@@ -444,11 +452,10 @@ async def send_class_details(ctx, class_name):
     embed = fiery_embed(f"{class_name} Class Profile", desc, color=0xFF0000)
     
     # ADDED STAT OVERVIEW TO CLASS DESC
-    u = get_user(ctx.author.id)
+    u = await get_user_async(ctx.author.id)
     embed.add_field(name="⛓️ Current Standing", value=f"Balance: {u['balance']}F\nLevel: {u['level']}", inline=False)
     
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 @bot.command()
 async def dominant(ctx): await send_class_details(ctx, "Dominant")
@@ -464,17 +471,13 @@ async def setclass(ctx, choice: str = None):
     if not choice or choice.capitalize() not in CLASSES:
         options = "\n".join([f"**{k}**: {v['desc']}" for k,v in CLASSES.items()])
         embed = fiery_embed("Dungeon Hierarchy", f"Choose your path, little asset:\n\n{options}\n\nType `!<classname>` for details.", color=0x800000)
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-        return await ctx.send(file=file, embed=embed)
+        return await ctx.send(files=branding.attach(embed), embed=embed)
         
-    with get_db_connection() as conn:
-        conn.execute("UPDATE users SET class = ? WHERE id = ?", (choice.capitalize(), ctx.author.id))
-        conn.commit()
+    await database.execute("UPDATE users SET class = ? WHERE id = ?", (choice.capitalize(), ctx.author.id))
     
-    u = get_user(ctx.author.id)
+    u = await get_user_async(ctx.author.id)
     embed = fiery_embed("Class Claimed", f"✅ You are now bound to the **{choice.capitalize()}** path.\n\nYour submission level is currently **{u['level']}**.", color=0x00FF00)
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 # ===== 5. EXTENDED ECONOMY COMMANDS (WORK SYSTEM) =====
 async def handle_work_command(ctx, cmd_name, reward_range):
@@ -483,7 +486,7 @@ async def handle_work_command(ctx, cmd_name, reward_range):
     if ext and ext.is_blackout:
         return await ctx.send("🌑 **THE LIGHTS ARE OUT.** The machines are dead. You cannot work in the dark. Use `!search`!")
 
-    user = get_user(ctx.author.id)
+    user = await get_user_async(ctx.author.id)
     now = datetime.now(timezone.utc)
     last_key = f"last_{cmd_name}"
     
@@ -494,17 +497,14 @@ async def handle_work_command(ctx, cmd_name, reward_range):
     if now - last < timedelta(hours=3):
         wait = timedelta(hours=3) - (now - last)
         embed = fiery_embed("Exhaustion Protocol", f"❌ Your body is broken. You cannot perform **{cmd_name}** yet.\n\nRecovery time remaining: **{wait.seconds//3600}h {(wait.seconds//60)%60}m**.", color=0xFF0000)
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-        return await ctx.send(file=file, embed=embed)
+        return await ctx.send(files=branding.attach(embed), embed=embed)
 
     base_reward = random.randint(reward_range[0], reward_range[1])
     await update_user_stats_async(ctx.author.id, amount=base_reward, xp_gain=50, source=cmd_name.capitalize())
     
-    with get_db_connection() as conn:
-        conn.execute(f"UPDATE users SET {last_key} = ? WHERE id = ?", (now.isoformat(), ctx.author.id))
-        conn.commit()
+    await database.execute(f"UPDATE users SET {last_key} = ? WHERE id = ?", (now.isoformat(), ctx.author.id))
     
-    user_upd = get_user(ctx.author.id)
+    user_upd = await get_user_async(ctx.author.id)
     u_class = user_upd['class']
     bonus = CLASSES[u_class]['bonus_flames'] if u_class in CLASSES else 1.0
     h_mult = ext.heat_multiplier if ext else 1.0
@@ -516,8 +516,7 @@ async def handle_work_command(ctx, cmd_name, reward_range):
     msg = FieryLexicon.get_economy_msg(cmd_name, ctx.author.display_name, final_reward)
     
     embed = fiery_embed(cmd_name.upper(), f"{msg}\n\n⛓️ **Session Payout:** {final_reward}F\n🫦 **Total XP:** +50\n💳 **New Balance:** {user_upd['balance']}F", color=0xFF4500)
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 @bot.command()
 async def work(ctx): await handle_work_command(ctx, "work", (500, 750))
@@ -537,7 +536,7 @@ async def flirt(ctx): await handle_work_command(ctx, "flirt", (700, 1800))
 # ===== 6. CORE PERIODIC REWARDS SYSTEM (STREAK UPGRADE) =====
 
 async def handle_periodic_reward(ctx, reward_type, min_amt, max_amt, xp_amt, cooldown_delta):
-    user = get_user(ctx.author.id)
+    user = await get_user_async(ctx.author.id)
     now = datetime.now(timezone.utc)
     db_col = f"last_{reward_type}"
     streak_col = f"{reward_type}_streak"
@@ -552,8 +551,7 @@ async def handle_periodic_reward(ctx, reward_type, min_amt, max_amt, xp_amt, coo
         hours, remainder = divmod(int(remaining.total_seconds()), 3600)
         minutes, seconds = divmod(remainder, 60)
         embed = fiery_embed("DENIAL PROTOCOL", f"❌ Your **{reward_type}** tribute is not yet ripe for harvesting.\n\n*The Master demands patience. Return in:* **{hours}h {minutes}m**.", color=0xFF0000)
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-        return await ctx.send(file=file, embed=embed)
+        return await ctx.send(files=branding.attach(embed), embed=embed)
 
     # Streak Reset Logic (Broken Toy)
     # If more than 2x cooldown has passed, user failed the discipline
@@ -573,12 +571,16 @@ async def handle_periodic_reward(ctx, reward_type, min_amt, max_amt, xp_amt, coo
     # Using the async updater to handle multipliers and audit logs
     await update_user_stats_async(ctx.author.id, amount=streaked_reward, xp_gain=xp_amt, source=f"{reward_type.capitalize()} Streak")
     
-    with get_db_connection() as conn:
+    def _record_claim(conn):
         conn.execute(f"UPDATE users SET {db_col} = ?, {streak_col} = ? WHERE id = ?", (now.isoformat(), current_streak, ctx.author.id))
-        conn.commit()
+        # ADDED: Next Streak Guardian warning for this tier, computed once at claim time
+        return streak_alerts.set_alert(conn, ctx.author.id, reward_type, now.timestamp(), current_streak)
+
+    alert_due = await database.transaction(_record_claim)
+    streak_alerts.schedule(ctx.author.id, reward_type, alert_due)
 
     # Get updated balance for the embed
-    user_after = get_user(ctx.author.id)
+    user_after = await get_user_async(ctx.author.id)
     
     # Sexualized Flavor messages
     flavor = {
@@ -607,8 +609,7 @@ async def handle_periodic_reward(ctx, reward_type, min_amt, max_amt, xp_amt, coo
     embed.add_field(name="📢 System Log", value=reset_msg, inline=False)
     embed.add_field(name="💳 Vault Balance", value=f"**{user_after['balance']:,}** Flames", inline=False)
     
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 @bot.command()
 async def daily(ctx):
@@ -625,38 +626,33 @@ async def monthly(ctx):
 @bot.command()
 async def balance(ctx, member: discord.Member = None):
     target = member or ctx.author
-    u = get_user(target.id)
+    u = await get_user_async(target.id)
     embed = fiery_embed(f"{target.display_name}'s Vault", f"💰 **Current Balance:** {u['balance']} Flames\n⛓️ **Class:** {u['class']}")
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 # ===== 7. PROFILE, RANKING, TITLES & HELP =====
 @bot.command()
 async def me(ctx, member: discord.Member = None):
     member = member or ctx.author
-    u = get_user(member.id)
-    with get_db_connection() as conn:
-        wins_row = conn.execute("SELECT COUNT(*) + 1 as r FROM users WHERE wins > ?", (u['wins'],)).fetchone()
-        kills_row = conn.execute("SELECT COUNT(*) + 1 as r FROM users WHERE kills > ?", (u['kills'],)).fetchone()
-        wins_rank = wins_row['r'] if wins_row else "?"
-        kills_rank = kills_row['r'] if kills_row else "?"
-        
-        # --- ADDED: DUELIST RANK CALCULATION ---
-        duel_wins_row = conn.execute("SELECT COUNT(*) + 1 as r FROM users WHERE duel_wins > ?", (u['duel_wins'],)).fetchone()
-        duel_rank = duel_wins_row['r'] if duel_wins_row else "?"
+    u = await get_user_async(member.id)
+
+    def _dossier_ranks(conn):
+        # Wins, kills and (ADDED) duelist rank from the in-memory leaderboard
+        r = leaderboard.ranks(conn, {"wins": u['wins'], "kills": u['kills'], "duel_wins": u['duel_wins']})
+        wins_rank, kills_rank, duel_rank = r["wins"], r["kills"], r["duel_wins"]
 
         # --- ADDED: TOP 5 VICTIMS LOGIC ---
         victims = conn.execute("""
             SELECT loser_id, win_count FROM duel_history 
             WHERE winner_id = ? ORDER BY win_count DESC LIMIT 5
         """, (member.id,)).fetchall()
+        return wins_rank, kills_rank, duel_rank, victims, inventory.item_names(conn, member.id)
+
+    wins_rank, kills_rank, duel_rank, victims, titles = await database.read(_dossier_ranks)
     
     lvl = u['fiery_level']
     rank_name = RANKS[lvl-1] if lvl <= 100 else RANKS[-1]
     
-    try: titles = json.loads(u['titles'])
-    except: titles = []
-    
     # Legend Lead Temp Display
     engine = bot.get_cog("IgnisEngine")
     global nsfw_mode_active
@@ -668,8 +664,7 @@ async def me(ctx, member: discord.Member = None):
     embed = discord.Embed(title=f"<:FIERY_heart_devilred:1329474462365777920> {member.display_name}'s Dossier", color=0xFF0000)
     
     # Mandatory Image
-    if os.path.exists("LobbyTopRight.jpg"):
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
+    if branding.available():
         embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
     else:
         embed.set_thumbnail(url=member.display_avatar.url)
@@ -702,21 +697,17 @@ async def me(ctx, member: discord.Member = None):
     if u['spouse']:
         owner_text = f"Bound to <@{u['spouse']}> (Married)"
     else:
-        with get_db_connection() as conn:
-            contract_data = conn.execute("SELECT dominant_id FROM contracts WHERE submissive_id = ?", (member.id,)).fetchone()
-            if contract_data:
-                owner_text = f"Bound to <@{contract_data['dominant_id']}> (Contract)"
+        contract_data = await database.fetchone("SELECT dominant_id FROM contracts WHERE submissive_id = ?", (member.id,))
+        if contract_data:
+            owner_text = f"Bound to <@{contract_data['dominant_id']}> (Contract)"
     embed.add_field(name="🔒 Ownership Status", value=f"**{owner_text}**", inline=False)
 
     ach_cog = bot.get_cog("Achievements")
     if ach_cog:
-        summary = ach_cog.get_achievement_summary(member.id)
+        summary = await database.run(ach_cog.get_achievement_summary, member.id)
         embed.add_field(name="🏅 Achievements", value=summary, inline=False)
     
-    if os.path.exists("LobbyTopRight.jpg"):
-        await ctx.send(file=file, embed=embed)
-    else:
-        await ctx.send(embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 # --- FIERY GUIDE INJECTION START ---
 @bot.command()
@@ -789,11 +780,10 @@ async def fiery(ctx):
         "📟 `!ping` — Measure neural latency to the Red Room.")
 
     # Sending the guide as a sequence of high-quality embeds
-    if os.path.exists("LobbyTopRight.jpg"):
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
+    if branding.available():
         for e in [emb1, emb2, emb3, emb4, emb5]:
             e.set_thumbnail(url="attachment://LobbyTopRight.jpg")
-            await ctx.send(embed=e)
+            await ctx.send(files=branding.attach(e), embed=e)
     else:
         for e in [emb1, emb2, emb3, emb4, emb5]:
             await ctx.send(embed=e)
@@ -808,43 +798,40 @@ async def buytitle(ctx, *, title_choice: str = None):
     shop = bot.get_cog("ShopSystem")
     if not shop:
         embed = fiery_embed("Market Error", "❌ The Black Market is currently closed.")
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-        return await ctx.send(file=file, embed=embed)
+        return await ctx.send(files=branding.attach(embed), embed=embed)
     pass
 
 @bot.command()
 async def favor(ctx):
     """Bribe the Master to force Peak Heat."""
     cost = 5000000
-    user = get_user(ctx.author.id)
+    user = await get_user_async(ctx.author.id)
     ext = bot.get_cog("FieryExtensions")
     
     if user['balance'] < cost:
         embed = fiery_embed("Favor Rejected", f"❌ Master's Favor is expensive. You need {cost:,} Flames.")
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-        return await ctx.send(file=file, embed=embed)
+        return await ctx.send(files=branding.attach(embed), embed=embed)
     
     if not ext:
         embed = fiery_embed("System Offline", "❌ The Master is currently unavailable.")
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-        return await ctx.send(file=file, embed=embed)
+        return await ctx.send(files=branding.attach(embed), embed=embed)
 
-    with get_db_connection() as conn:
-        conn.execute("UPDATE users SET balance = balance - ? WHERE id = ?", (cost, ctx.author.id))
-        conn.commit()
+    await database.execute("UPDATE users SET balance = balance - ? WHERE id = ?", (cost, ctx.author.id))
     
     await ext.activate_peak_heat(ctx)
     embed = fiery_embed("MASTER'S FAVOR", f"🔥 <@{ctx.author.id}> has bribed the Master. **PEAK HEAT IS NOW ACTIVE!**", color=0xFF0000)
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 @bot.command()
 async def hall(ctx):
     """The Museum of Tributes: Global all-time records."""
-    with get_db_connection() as conn:
+    def _hall_records(conn):
         stats = conn.execute("SELECT SUM(wins) as total_wins, SUM(kills) as total_kills, SUM(deaths) as total_deaths FROM users").fetchone()
         most_wealthy = conn.execute("SELECT id, balance FROM users ORDER BY balance DESC LIMIT 1").fetchone()
         bloodiest = conn.execute("SELECT id, first_bloods FROM users ORDER BY first_bloods DESC LIMIT 1").fetchone()
+        return stats, most_wealthy, bloodiest
+
+    stats, most_wealthy, bloodiest = await database.read(_hall_records)
 
     desc = "### 🏛️ THE HALL OF TRIBUTES\n"
     desc += f"⚔️ **All-Time Arena Wins:** {stats['total_wins'] or 0}\n"
@@ -857,8 +844,7 @@ async def hall(ctx):
         desc += f"🩸 **Most Humiliated (FB):** <@{bloodiest['id']}> ({bloodiest['first_bloods']} times)\n"
 
     embed = fiery_embed("LEGACY MUSEUM", desc, color=0xFFD700)
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 # ===== NSFW Special Commands =====
 @bot.command()
@@ -866,7 +852,7 @@ async def hall(ctx):
 async def nsfwtime(ctx):
     global nsfw_mode_active
     nsfw_mode_active = True
-    save_game_config() # ADDED PERSISTENCE
+    await database.run(save_game_config) # ADDED PERSISTENCE
     ext = bot.get_cog("FieryExtensions")
     if ext: await ext.trigger_nsfw_start(ctx)
 
@@ -875,38 +861,31 @@ async def nsfwtime(ctx):
 async def nomorensfw(ctx):
     global nsfw_mode_active
     nsfw_mode_active = False
-    save_game_config() # ADDED PERSISTENCE
+    await database.run(save_game_config) # ADDED PERSISTENCE
     embed = fiery_embed("NSFW Mode Ended", "The exhibition has closed. Returning to standard Red Room protocols.")
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 @bot.command()
 @commands.is_owner()
 async def grantbadge(ctx, member: discord.Member, badge: str):
-    u = get_user(member.id)
-    try: titles = json.loads(u['titles'])
-    except: titles = []
+    await get_user_async(member.id)
+    badge, category = inventory.resolve(badge)
+    granted = await database.transaction(inventory.add_item, member.id, badge, category)
+    inventory.invalidate(member.id)
     
-    if badge not in titles:
-        titles.append(badge)
-        with get_db_connection() as conn:
-            conn.execute("UPDATE users SET titles = ? WHERE id = ?", (json.dumps(titles), member.id))
-            conn.commit()
+    if granted:
         embed = fiery_embed("Badge Granted", f"✅ Granted badge **{badge}** to {member.display_name}")
     else:
         embed = fiery_embed("Badge Conflict", "User already has this badge.")
     
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 @bot.command()
 async def ranking(ctx):
-    with get_db_connection() as conn:
-        top = conn.execute("SELECT id, games_played, wins, kills, first_bloods FROM users WHERE games_played > 0 ORDER BY wins DESC, kills DESC LIMIT 10").fetchall()
+    top = await database.fetchall("SELECT id, games_played, wins, kills, first_bloods FROM users WHERE games_played > 0 ORDER BY wins DESC, kills DESC LIMIT 10")
     if not top: 
         embed = fiery_embed("Leaderboard", "No records yet.")
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-        return await ctx.send(file=file, embed=embed)
+        return await ctx.send(files=branding.attach(embed), embed=embed)
 
     lines = []
     for i, row in enumerate(top, 1):
@@ -915,8 +894,7 @@ async def ranking(ctx):
         lines.append(f"**#{i} {name}**\n└ 🎮:{row['games_played']} | 🏆:{row['wins']} | ⚔️:{row['kills']} | 🩸:{row['first_bloods']}")
     
     embed = fiery_embed("LEADERBOARD", "\n".join(lines), color=0xFFD700)
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 # ===== 8. MAINTENANCE & AUDIT =====
 @bot.command()
@@ -925,13 +903,13 @@ async def backup(ctx):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_name = f"{DATABASE_PATH}.backup_{timestamp}"
     try:
-        shutil.copy2(DATABASE_PATH, backup_name)
+        # WAL mode: a plain file copy can miss pages still in the -wal file
+        database.backup(backup_name)
         embed = fiery_embed("Database Backup", f"✅ Saved in persistence volume as `{backup_name}`")
     except Exception as e:
         embed = fiery_embed("Backup Failure", f"❌ **ERROR:** {e}")
     
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 @bot.command()
 @commands.is_owner()
@@ -962,23 +940,23 @@ async def reload(ctx, cog_name: str):
             await bot.reload_extension("casino")
         elif cog_name.lower() == "ask":
             await bot.reload_extension("ask")
+        elif cog_name.lower() == "assets":
+            # ADDED: Re-read the image files and replace the render workers so they load them
+            await render.reload_assets()
         else:
             embed = fiery_embed("Reload Error", f"❌ Cog `{cog_name}` not found.")
-            file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-            return await ctx.send(file=file, embed=embed)
+            return await ctx.send(files=branding.attach(embed), embed=embed)
         
         embed = fiery_embed("Reload Success", f"🔥 **{cog_name.upper()}** reloaded!")
     except Exception as e:
         embed = fiery_embed("Reload Failure", f"❌ **ERROR:** {e}")
     
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 # ===== 9. SYSTEM INTEGRATION =====
 @bot.command()
 async def fierystart(ctx):
     global game_edition
-    image_path = "LobbyTopRight.jpg"
     embed = discord.Embed(title=f"Fiery's Hangrygames Edition # {game_edition}", 
                           description="The hellgates are about to open, little pets. Submit to the registration.", color=0xFF0000)
     
@@ -986,53 +964,51 @@ async def fierystart(ctx):
     engine = bot.get_cog("IgnisEngine")
     if engine: engine.current_lobby = view
 
-    if os.path.exists(image_path):
-        file = discord.File(image_path, filename="lobby_thumb.jpg")
+    if branding.available():
         embed.set_thumbnail(url="attachment://lobby_thumb.jpg")
         embed.add_field(name="<:FIERY_sym_dick:1314898974360076318> 0 Sinners Ready", value="The air is thick with anticipation.", inline=False)
-        await ctx.send(file=file, embed=embed, view=view)
+        await ctx.send(files=branding.attach(embed, "lobby", "lobby_thumb.jpg"), embed=embed, view=view)
     else:
         embed.set_thumbnail(url="https://i.imgur.com/Gis6f9V.gif")
         embed.add_field(name="<:FIERY_sym_dick:1314898974360076318> 0 Sinners Ready", value="\u200b", inline=False)
         await ctx.send(embed=embed, view=view)
     
     game_edition += 1
-    save_game_config() # ADDED PERSISTENCE
+    await database.run(save_game_config) # ADDED PERSISTENCE
 
 @bot.command()
 async def lobby(ctx):
     engine = bot.get_cog("IgnisEngine")
     if not engine or not engine.current_lobby:
         embed = fiery_embed("Lobby Status", "No active registration in progress. The pit is closed.")
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-        return await ctx.send(file=file, embed=embed)
+        return await ctx.send(files=branding.attach(embed), embed=embed)
     
     participants = engine.current_lobby.participants
     if not participants:
         embed = fiery_embed("Lobby Status", "The room is empty. No one has offered their body yet.")
-        file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-        return await ctx.send(file=file, embed=embed)
+        return await ctx.send(files=branding.attach(embed), embed=embed)
     
     mentions = [f"<@{p_id}>" for p_id in participants]
     embed = fiery_embed("Active Tributes", f"The following souls are bound for Edition #{engine.current_lobby.edition}:\n\n" + "\n".join(mentions), color=0x00FF00)
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 # EMERGENCY RAILWAY DEBUG COMMAND
 @bot.command()
 async def ping(ctx):
     embed = fiery_embed("Neural Sync", f"🏓 Pong! Neural Latency: **{round(bot.latency * 1000)}ms**")
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
 # --- GLOBAL STREAK LEADERBOARD COMMAND START ---
 @bot.command()
 async def streaks(ctx):
     """GLOBAL STREAK LEADERBOARD: Displays the elite disciplined assets across Daily, Weekly, and Monthly tiers."""
-    with get_db_connection() as conn:
+    def _streak_tops(conn):
         top_daily = conn.execute("SELECT id, daily_streak FROM users WHERE daily_streak > 0 ORDER BY daily_streak DESC LIMIT 5").fetchall()
         top_weekly = conn.execute("SELECT id, weekly_streak FROM users WHERE weekly_streak > 0 ORDER BY weekly_streak DESC LIMIT 5").fetchall()
         top_monthly = conn.execute("SELECT id, monthly_streak FROM users WHERE monthly_streak > 0 ORDER BY monthly_streak DESC LIMIT 5").fetchall()
+        return top_daily, top_weekly, top_monthly
+
+    top_daily, top_weekly, top_monthly = await database.read(_streak_tops)
 
     embed = fiery_embed("NEURAL PERSISTENCE: GLOBAL SINNER DISCIPLINE", 
                         "The Master tracks every cycle of submission. Consistency is the only path to the throne.")
@@ -1052,63 +1028,31 @@ async def streaks(ctx):
     embed.add_field(name="⛓️ Weekly Service Streaks", value=format_rank(top_weekly, "weekly"), inline=False)
     embed.add_field(name="👑 Monthly Absolute Devotion", value=format_rank(top_monthly, "monthly"), inline=False)
 
-    u = get_user(ctx.author.id)
+    u = await get_user_async(ctx.author.id)
     footer_text = f"Your Discipline: D:{u['daily_streak']} | W:{u['weekly_streak']} | M:{u['monthly_streak']}"
     embed.set_footer(text=footer_text + " | 🔞 FIERY HANGRYGAMES EDITION 🔞")
 
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 # --- GLOBAL STREAK LEADERBOARD COMMAND END ---
 
 # --- STREAK GUARDIAN PROTOCOL START ---
 @bot.command()
 async def togglealerts(ctx):
     """Toggles whether you receive public pings from the Streak Guardian."""
-    u = get_user(ctx.author.id)
+    u = await get_user_async(ctx.author.id)
     new_status = 0 if u['streak_alerts'] == 1 else 1
     
-    with get_db_connection() as conn:
-        conn.execute("UPDATE users SET streak_alerts = ? WHERE id = ?", (new_status, ctx.author.id))
-        conn.commit()
+    await database.execute("UPDATE users SET streak_alerts = ? WHERE id = ?", (new_status, ctx.author.id))
     
     status_text = "ENABLED" if new_status == 1 else "DISABLED"
     embed = fiery_embed("ALERT PROTOCOL UPDATED", f"Public Guardian pings for your soul are now **{status_text}**.")
-    file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-    await ctx.send(file=file, embed=embed)
+    await ctx.send(files=branding.attach(embed), embed=embed)
 
-@tasks.loop(hours=1)
-async def streak_guardian():
-    """Background task to ping assets in-server before their streaks reset."""
-    now = datetime.now(timezone.utc)
+async def streak_guardian(user_id, tier):
+    """Called by the streak scheduler the moment a warning is due (tiers/offsets live in streak_alerts.TIERS)."""
     channel = bot.get_channel(STREAK_ALERTS_CHANNEL_ID)
     if not channel: return
-
-    with get_db_connection() as conn:
-        users = conn.execute("SELECT id, last_daily, last_weekly, last_monthly, daily_streak, weekly_streak, monthly_streak, streak_alerts FROM users").fetchall()
-        
-        for u in users:
-            if u['streak_alerts'] == 0: continue # User opted out
-            
-            member_id = u['id']
-            # Protocol: Daily (Only for streaks >= 5)
-            if u['last_daily'] and u['daily_streak'] >= 5:
-                last_d = datetime.fromisoformat(u['last_daily'])
-                if timedelta(hours=45) <= (now - last_d) < timedelta(hours=46):
-                    await send_streak_ping(channel, member_id, "Daily", "45 hours")
-
-            # Protocol: Weekly (Ping 3h before 14-day limit)
-            if u['last_weekly'] and u['weekly_streak'] > 0:
-                last_w = datetime.fromisoformat(u['last_weekly'])
-                limit = timedelta(days=14)
-                if (limit - timedelta(hours=3)) <= (now - last_w) < (limit - timedelta(hours=2)):
-                    await send_streak_ping(channel, member_id, "Weekly", "13 days and 21 hours")
-
-            # Protocol: Monthly (Ping 3h before 60-day limit)
-            if u['last_monthly'] and u['monthly_streak'] > 0:
-                last_m = datetime.fromisoformat(u['last_monthly'])
-                limit = timedelta(days=60)
-                if (limit - timedelta(hours=3)) <= (now - last_m) < (limit - timedelta(hours=2)):
-                    await send_streak_ping(channel, member_id, "Monthly", "59 days and 21 hours")
+    await send_streak_ping(channel, user_id, tier.label, tier.elapsed)
 
 async def send_streak_ping(channel, user_id, tier, elapsed):
     """Sends a public ping in the alert channel."""
@@ -1118,12 +1062,9 @@ async def send_streak_ping(channel, user_id, tier, elapsed):
                         f"In **3 hours**, your progress will be purged.\n\n"
                         f"⛓️ **Submit your tribute now.**", color=0xFFCC00)
     
-    if os.path.exists("LobbyTopRight.jpg"):
-        file = discord.File("LobbyTopRight.jpg", filename="alert.jpg")
+    if branding.available():
         embed.set_thumbnail(url="attachment://alert.jpg")
-        await channel.send(content=f"<@{user_id}>", file=file, embed=embed)
-    else:
-        await channel.send(content=f"<@{user_id}>", embed=embed)
+    await channel.send(content=f"<@{user_id}>", files=branding.attach(embed, "lobby", "alert.jpg"), embed=embed)
 # --- STREAK GUARDIAN PROTOCOL END ---
 
 @bot.event
@@ -1136,11 +1077,15 @@ async def on_ready():
     if not bot.get_cog("Achievements"):
         await bot.add_cog(achievements.Achievements(bot, get_db_connection, fiery_embed))
     
-    load_game_config()
+    await database.run(load_game_config)
+
+    # ADDED: Upload/re-sign the branding images so embeds can link them instead of re-attaching
+    await branding.start(bot)
     
-    # Start the Guardian Task
-    if not streak_guardian.is_running():
-        streak_guardian.start()
+    # Start the Guardian Task (fires each due streak warning on time)
+    streak_alerts.start(streak_guardian)
+    # ADDED: Audit consumers (batched, rate-paced sends to the audit channel)
+    audit.start(bot)
     
     bot.add_view(ignis.LobbyView(None, None))
 
@@ -1200,6 +1145,12 @@ async def on_message(message):
 
 async def main():
     try:
+        # ADDED: Read/decode the static images once; forked render workers inherit them
+        assets.load()
+        # ADDED: Fork the card render workers before any DB/IO threads exist
+        render.start()
+        # ADDED: One aiohttp session for every avatar download
+        await avatars.start()
         async with bot: 
             await bot.start(TOKEN)
     except KeyboardInterrupt:
@@ -1207,6 +1158,12 @@ async def main():
     finally:
         if not bot.is_closed():
             await bot.close()
+        branding.stop()
+        streak_alerts.stop()
+        audit.stop()
+        await avatars.close()
+        render.close()
+        database.close()
 
 if __name__ == "__main__": 
     try:
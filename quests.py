@@ -0,0 +1,215 @@
+from collections import namedtuple
+from datetime import datetime, timezone
+
+# ===== QUEST ENGINE =====
+# Quests used to be 40 fixed columns (d1..d20, w1..w20) with the triggers
+# hard-coded in the stats updater, so adding one meant a schema change. They
+# are now data: each Quest names the event that advances it and its target and
+# reward, and progress lives in quest_progress, one row per (user, quest).
+#
+# An event such as {"kill": 2, "action": 1} becomes ONE upsert covering every
+# quest it advances. RETURNING hands back the new totals from that same
+# statement, so completions (old < target <= new) need no extra read.
+#
+# Each row is tagged with the day/week it counts for. Progress from an older
+# period reads as 0 and is overwritten by the user's next upsert, so the daily
+# and weekly "reset" is just the date changing; the reset loop only advances
+# the announcement marker kept in game_config.
+
+Quest = namedtuple("Quest", "id period event target reward title goal")
+
+DAILY_REWARD = ("Daily Reward", 250, 100)      # (source, flames, xp)
+WEEKLY_REWARD = ("Weekly Reward", 2000, 1000)
+REWARD_SOURCES = {DAILY_REWARD[0], WEEKLY_REWARD[0]}   # Payouts never count as progress
+
+# event=None: shown on the ledger, not tracked yet
+DAILY = [
+    Quest("d1", "day", "kill", 1, DAILY_REWARD, "🩸 **Force a Peak:**", "Kill in Arena"),
+    Quest("d2", "day", None, 3, DAILY_REWARD, "🎮 **Arena Hunger:**", "Games Played"),
+    Quest("d3", "day", None, 1, DAILY_REWARD, "💍 **Offer a Collar:**", "`!contract` sent"),
+    Quest("d4", "day", "beg", 5, DAILY_REWARD, "🫦 **Groveling:**", "`!beg` uses"),
+    Quest("d5", "day", "work", 5, DAILY_REWARD, "⛓️ **Hard Service:**", "`!work` uses"),
+    Quest("d6", "day", "win", 1, DAILY_REWARD, "🏆 **Top Authority:**", "Game Won"),
+    Quest("d7", "day", None, 2, DAILY_REWARD, "🧪 **Lab Rat:**", "`!experiment` uses"),
+    Quest("d8", "day", None, 3, DAILY_REWARD, "💦 **Mopping Floors:**", "`!cumcleaner` uses"),
+    Quest("d9", "day", None, 2, DAILY_REWARD, "👠 **Recruiting:**", "`!pimp` uses"),
+    Quest("d10", "day", None, 2, DAILY_REWARD, "❓ **Blind Obedience:**", "`!mystery` uses"),
+    Quest("d11", "day", "flirt", 5, DAILY_REWARD, "🫦 **Pure Tease:**", "`!flirt` uses"),
+    Quest("d12", "day", "action", 10, DAILY_REWARD, "🔥 **Active Asset:**", "commands total"),
+    Quest("d13", "day", None, 1, DAILY_REWARD, "🩸 **Fresh Meat:**", "First Blood in game"),
+    Quest("d14", "day", None, 2, DAILY_REWARD, "💀 **Total Yield:**", "Times defeated"),
+    Quest("d15", "day", None, 1000, DAILY_REWARD, "💰 **Wealth Gatherer:**", "Flames earned"),
+    Quest("d16", "day", None, 10, DAILY_REWARD, "🫦 **Loud Toy:**", "chat messages sent"),
+    Quest("d17", "day", None, 1, DAILY_REWARD, "⛓️ **Narcissist:**", "`!me` profile check"),
+    Quest("d18", "day", None, 1, DAILY_REWARD, "🔄 **Daily Dose:**", "`!daily` claimed"),
+    Quest("d19", "day", None, 1, DAILY_REWARD, "⛓️ **Role Call:**", "Ping in a game lobby"),
+    Quest("d20", "day", None, 1, DAILY_REWARD, "🔞 **Full Session:**", "Game played start to finish"),
+]
+
+WEEKLY = [
+    Quest("w1", "week", "win", 5, WEEKLY_REWARD, "👑 **Master of Pit:**", "Wins total"),
+    Quest("w2", "week", "kill", 25, WEEKLY_REWARD, "⚔️ **Pride Shredder:**", "Arena Kills"),
+    Quest("w3", "week", None, 3, WEEKLY_REWARD, "📈 **Arousal Streak:**", "Killstreak reached"),
+    Quest("w4", "week", None, 3, WEEKLY_REWARD, "🔒 **Soul Collector:**", "Contracts accepted"),
+    Quest("w5", "week", "work", 30, WEEKLY_REWARD, "🔗 **Career Slave:**", "`!work` commands"),
+    Quest("w6", "week", "action", 50, WEEKLY_REWARD, "🔞 **Dungeon Fiend:**", "commands used"),
+    Quest("w7", "week", None, 10000, WEEKLY_REWARD, "💎 **Sultan of Flames:**", "total earnings"),
+    Quest("w8", "week", None, 10, WEEKLY_REWARD, "⛓️ **High Endurance:**", "Games joined"),
+    Quest("w9", "week", None, 5, WEEKLY_REWARD, "🫦 **Golden Pet:**", "Top 5 placements"),
+    Quest("w10", "week", "flirt", 20, WEEKLY_REWARD, "🥀 **Professional Flirt:**", "`!flirt` uses"),
+    Quest("w11", "week", None, 10, WEEKLY_REWARD, "🧪 **Total Subject:**", "`!experiment` uses"),
+    Quest("w12", "week", None, 15, WEEKLY_REWARD, "💦 **Floor Manager:**", "`!cumcleaner` uses"),
+    Quest("w13", "week", None, 10, WEEKLY_REWARD, "👠 **Dungeon Pimp:**", "`!pimp` uses"),
+    Quest("w14", "week", None, 10, WEEKLY_REWARD, "🕯️ **Mystery Seeker:**", "`!mystery` uses"),
+    Quest("w15", "week", "beg", 20, WEEKLY_REWARD, "🫦 **Professional Beggar:**", "`!beg` uses"),
+    Quest("w16", "week", None, 7, WEEKLY_REWARD, "📅 **Hooked:**", "`!daily` claims"),
+    Quest("w17", "week", None, 1, WEEKLY_REWARD, "⬆️ **Deepening Submission:**", "Level gained"),
+    Quest("w18", "week", None, 50, WEEKLY_REWARD, "👁️ **Public Interest:**", "Mentions in chat"),
+    Quest("w19", "week", None, 5, WEEKLY_REWARD, "🌋 **Heat Chaser:**", "Heat Events triggered"),
+    Quest("w20", "week", None, 1, WEEKLY_REWARD, "🔞 **Legendary Presence:**", "Legendary Event survive"),
+]
+
+QUESTS = {q.id: q for q in DAILY + WEEKLY}
+BY_EVENT = {}
+for _q in QUESTS.values():
+    if _q.event:
+        BY_EVENT.setdefault(_q.event, []).append(_q)
+
+# Stats-updater source -> event it stands for
+SOURCE_EVENTS = {"Work": "work", "Beg": "beg", "Flirt": "flirt"}
+
+
+def day_id(now=None):
+    """UTC day number."""
+    now = now or datetime.now(timezone.utc)
+    return now.date().toordinal()
+
+
+def week_id(now=None):
+    """UTC week number; weeks start on Monday (day ordinal 1 was a Monday)."""
+    return (day_id(now) - 1) // 7
+
+
+def current_periods():
+    return {"day": day_id(), "week": week_id()}
+
+
+def stat_events(source, wins=0, kills=0, actions=1):
+    """Events carried by one stats update (`actions` merged updates)."""
+    if source in REWARD_SOURCES:
+        return {}
+    events = {"action": actions}
+    if kills > 0: events["kill"] = kills
+    if wins > 0: events["win"] = 1
+    if source in SOURCE_EVENTS: events[SOURCE_EVENTS[source]] = 1
+    return events
+
+
+def label(quest, n, progress):
+    target = f"{quest.target // 1000}k" if quest.target >= 10000 else quest.target
+    return f"{n}. {quest.title} {progress}/{target} {quest.goal}"
+
+
+# --- SCHEMA ---
+def ensure_schema(conn):
+    existed = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'quest_progress'").fetchone()
+    conn.execute("""CREATE TABLE IF NOT EXISTS quest_progress (
+        user_id INTEGER,
+        quest_id TEXT,
+        period INTEGER,
+        progress INTEGER DEFAULT 0,
+        PRIMARY KEY (user_id, quest_id)
+    )""")
+    if not existed:
+        migrate_legacy(conn)
+
+    gc_cols = [row[1] for row in conn.execute("PRAGMA table_info(game_config)").fetchall()]
+    for c_n in ("quest_day", "quest_week"):
+        if c_n not in gc_cols:
+            conn.execute(f"ALTER TABLE game_config ADD COLUMN {c_n} INTEGER")
+
+
+def migrate_legacy(conn):
+    """One-shot: copies the old d1..w20 columns into quest_progress, then drops them."""
+    cols = [row[1] for row in conn.execute("PRAGMA table_info(quests)").fetchall()]
+    if not cols:
+        return 0
+    # The counters belong to the period of the last wipe, recorded on the user_id 0 row
+    sentinel = conn.execute("SELECT last_reset FROM quests WHERE user_id = 0").fetchone()
+    try:
+        since = datetime.fromisoformat(sentinel["last_reset"])
+    except (TypeError, ValueError):
+        since = None
+    periods = {"day": day_id(since), "week": week_id(since)}
+    moved = 0
+    for q in QUESTS.values():
+        if q.id not in cols:
+            continue
+        moved += conn.execute(
+            f"""INSERT INTO quest_progress (user_id, quest_id, period, progress)
+                SELECT user_id, ?, ?, {q.id} FROM quests WHERE user_id != 0 AND {q.id} > 0""",
+            (q.id, periods[q.period])).rowcount
+    conn.execute("DROP TABLE quests")
+    return moved
+
+
+# --- PROGRESS (inside the caller's transaction) ---
+def record(conn, user_id, events):
+    """Advances every quest the events trigger; returns the Quests completed by it.
+
+    One upsert for all of them: rows from an older period restart at the
+    increment, and RETURNING gives the new totals for the completion check.
+    """
+    periods = current_periods()
+    incs = {}
+    for event, amount in events.items():
+        if amount <= 0:
+            continue
+        for q in BY_EVENT.get(event, ()):
+            incs[q.id] = incs.get(q.id, 0) + amount
+    if not incs:
+        return []
+    params = []
+    for q_id, amount in incs.items():
+        params += (user_id, q_id, periods[QUESTS[q_id].period], amount)
+    rows = conn.execute(
+        f"""INSERT INTO quest_progress (user_id, quest_id, period, progress)
+            VALUES {', '.join(['(?, ?, ?, ?)'] * len(incs))}
+            ON CONFLICT(user_id, quest_id) DO UPDATE SET
+                progress = CASE WHEN period = excluded.period THEN progress + excluded.progress ELSE excluded.progress END,
+                period = excluded.period
+            RETURNING quest_id, progress""", params).fetchall()
+    done = []
+    for r in rows:
+        q = QUESTS[r["quest_id"]]
+        if r["progress"] - incs[q.id] < q.target <= r["progress"]:
+            done.append(q)
+    return done
+
+
+def progress(conn, user_id):
+    """{quest_id: progress} for every quest, older periods reading as 0."""
+    periods = current_periods()
+    out = dict.fromkeys(QUESTS, 0)
+    for r in conn.execute("SELECT quest_id, period, progress FROM quest_progress WHERE user_id = ?", (user_id,)).fetchall():
+        q = QUESTS.get(r["quest_id"])
+        if q is not None and r["period"] == periods[q.period]:
+            out[q.id] = r["progress"]
+    return out
+
+
+# --- RESET ANNOUNCEMENTS ---
+def roll_periods(conn):
+    """Advances the game_config marker; returns (new_day, new_week).
+
+    O(1): nothing is wiped, stale progress already reads as zero. The first
+    call after this schema existed only records the marker.
+    """
+    day, week = day_id(), week_id()
+    row = conn.execute("SELECT quest_day, quest_week FROM game_config WHERE id = 1").fetchone()
+    if row is None or row["quest_day"] == day:
+        return False, False
+    conn.execute("UPDATE game_config SET quest_day = ?, quest_week = ? WHERE id = 1", (day, week))
+    if row["quest_day"] is None:
+        return False, False
+    return True, row["quest_week"] != week
@@ -0,0 +1,351 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image, ImageDraw, ImageOps
+
+import assets
+import encoder
+from cache import LRUCache
+
+# ===== RENDER SERVICE =====
+# All Pillow compositing (glow loops, alpha composites, PNG encoding) used to
+# run on the event loop, so one !ship stalled every other command. The card
+# painters below are plain module-level functions (picklable): avatar bytes in,
+# encoded image bytes out (encoder.py picks PNG/WebP/JPEG). card() ships them
+# to a small process pool.
+#
+# The queue is bounded: when MAX_PENDING renders are already in flight, or a
+# render misses RENDER_TIMEOUT, card() returns None and the caller sends its
+# embed without the image instead of making the user wait.
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+RENDER_TIMEOUT = float(os.getenv("RENDER_TIMEOUT", "8"))  # Seconds before falling back to text
+MAX_PENDING = int(os.getenv("RENDER_QUEUE", "8"))         # In-flight renders before new ones are dropped
+
+_pool = None
+_slots = None
+_encode_totals = {}   # format -> [cards, bytes, encode ms], for render.stats()
+
+
+class Rendered:
+    """A finished card: the file object plus the extension its encoding needs."""
+    __slots__ = ("fp", "ext", "report")
+
+    def __init__(self, data, ext, report):
+        self.fp = io.BytesIO(data)
+        self.ext = ext
+        self.report = report
+
+    def filename(self, stem):
+        return f"{stem}.{self.ext}"
+
+
+def _context(first=False):
+    # fork: workers start instantly and inherit the already-imported Pillow.
+    # Only the first pool may fork: it is created before the DB executor,
+    # aiohttp and discord.py threads exist. Forking later could copy a lock one
+    # of them holds into a worker, so later pools spawn fresh interpreters.
+    if first and "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("spawn")
+
+
+def _new_pool(first=False):
+    return ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=_context(first), initializer=_worker_init)
+
+
+def _worker_init():
+    # Forked workers inherit the parent's RNG state; give each its own
+    random.seed()
+    # Forked workers also inherit the decoded assets; spawned ones load them here
+    assets.ensure_loaded()
+
+
+def _warm(_):
+    encoder.encode(Image.new("RGBA", (8, 8)))
+    return os.getpid()
+
+
+def start():
+    """Creates the pool and forks every worker up front (called from main() before the bot connects)."""
+    global _pool
+    if _pool is None:
+        _pool = _new_pool(first=True)
+        list(_pool.map(_warm, range(RENDER_WORKERS)))
+    return _pool
+
+
+def restart():
+    """Replaces the pool while the bot runs; the new workers are spawned and load the assets themselves."""
+    global _pool
+    old, _pool = _pool, _new_pool()
+    if old is not None:
+        old.shutdown(wait=False, cancel_futures=True)
+    return _pool
+
+
+async def reload_assets():
+    """`!reload assets`: re-read the registry and replace the workers so they pick it up."""
+    await asyncio.to_thread(assets.load)
+    if _pool is not None:
+        restart()
+
+
+def close():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def card(func, *args, timeout=RENDER_TIMEOUT):
+    """Runs a painter below in the pool. Returns a Rendered card, or None to fall back to text."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(MAX_PENDING)
+    if _slots.locked():
+        print(f"Render queue full, skipping {func.__name__}")
+        return None
+
+    await _slots.acquire()
+    loop = asyncio.get_running_loop()
+    try:
+        fut = loop.run_in_executor(_pool or restart(), func, *args)
+    except BrokenProcessPool:
+        _slots.release()
+        restart()
+        return None
+    # The slot stays taken until the worker really finishes, even after a timeout
+    fut.add_done_callback(lambda _: _slots.release())
+    try:
+        data, ext, report = await asyncio.wait_for(asyncio.shield(fut), timeout)
+    except asyncio.TimeoutError:
+        print(f"Render timeout: {func.__name__}")
+        return None
+    except BrokenProcessPool:
+        print(f"Render pool crashed during {func.__name__}, restarting")
+        restart()
+        return None
+    except Exception as e:
+        print(f"Render error in {func.__name__}: {e}")
+        return None
+    _record(func.__name__, report)
+    return Rendered(data, ext, report)
+
+
+def _record(name, report):
+    totals = _encode_totals.setdefault(report["format"], [0, 0, 0.0])
+    totals[0] += 1
+    totals[1] += report["bytes"]
+    totals[2] += report["ms"]
+    if not report["fits"]:
+        print(f"Render {name}: {report['bytes']} bytes over budget after {report['attempts']} encodes ({report['ms']} ms)")
+
+
+def stats():
+    """{format: {"cards", "avg_bytes", "avg_ms"}} for every card encoded since start."""
+    return {fmt: {"cards": n, "avg_bytes": b // n, "avg_ms": round(ms / n, 1)}
+            for fmt, (n, b, ms) in _encode_totals.items()}
+
+
+# ===== WORKER-SIDE SPRITE CACHE =====
+# Each worker keeps the avatars it has already decoded, resized and tinted,
+# keyed by a digest of the bytes (so a new avatar is a new key). Backgrounds
+# come pre-sized from the asset registry. A battle's kill frames are then
+# pastes + encode.
+SPRITE_BUDGET = int(os.getenv("RENDER_SPRITE_BYTES", str(64 * 1024 * 1024)))  # Per worker
+
+_sprites = LRUCache(SPRITE_BUDGET)
+
+
+def _sprite(data, size, variant="plain"):
+    key = (hashlib.blake2b(data, digest_size=16).digest(), size, variant)
+    img = _sprites.get(key)  # Shared and read-only: painters only paste it
+    if img is None:
+        img = Image.open(io.BytesIO(data)).convert("RGBA").resize((size, size))
+        if variant == "winner":
+            img = ImageOps.expand(img, border=10, fill="orange") # Thicker border for dominant status
+        elif variant == "loser":
+            # Step 1: Grayscale for defeat
+            img = ImageOps.grayscale(img).convert("RGBA")
+            # Step 2: Apply Blood Red Overlay
+            red_overlay = Image.new("RGBA", img.size, (255, 0, 0, 100)) # Semi-transparent Red
+            img = Image.alpha_composite(img, red_overlay)
+            # Step 3: Expand with thick gray border
+            img = ImageOps.expand(img, border=10, fill="gray")
+        _sprites.put(key, img, size=img.width * img.height * 4)
+    return img
+
+
+def _background(path, size, fill):
+    """Copy of the registry's pre-sized background to draw on (plain fill if the file is missing)."""
+    bg = assets.image(path, size)
+    return bg.copy() if bg is not None else Image.new("RGBA", size, fill)
+
+
+# ===== CARD PAINTERS (run inside worker processes) =====
+def arena_card(winner_data, loser_data):
+    """GENERATES 1V1 VISUAL WITH MASSIVE AVATARS AND CRIMSON FILTER FOR THE FALLEN."""
+    try:
+        if winner_data is None or loser_data is None:
+            raise Exception("Avatar download failed")
+
+        # EXPANDED CANVAS FOR LARGER DISPLAY (1000x1000 frame, rows 50-750 pre-cropped by the registry)
+        bg = _background("1v1Background.jpg", (1000, 700), (180, 30, 0, 255))
+
+        # MASSIVE AVATARS (UPGRADED FROM 300 TO 420), winner bordered, loser with the crimson execution filter
+        av_large = 420
+        av_winner = _sprite(winner_data, av_large, "winner")
+        av_loser = _sprite(loser_data, av_large, "loser")
+
+        # PASTE WITH NEW COORDINATES
+        bg.paste(av_winner, (40, 100), av_winner)
+        bg.paste(av_loser, (540, 100), av_loser)
+
+        draw = ImageDraw.Draw(bg)
+        # THICKER CROSS FOR MASSIVE SCALE
+        draw.line((400, 170, 600, 430), fill=(220, 220, 220), width=25)
+        draw.line((600, 170, 400, 430), fill=(220, 220, 220), width=25)
+
+        return encoder.encode(bg)
+    except Exception as e:
+        print(f"Arena Image Error: {e}")
+        return encoder.encode(Image.new("RGBA", (1000, 700), (120, 20, 0, 255)))
+
+
+def duel_card(p1_data, p2_data):
+    bg = _background("1v1Background.jpg", (1000, 500), (40, 0, 0, 255))
+    av1 = _sprite(p1_data, 250)
+    av2 = _sprite(p2_data, 250)
+    av1 = ImageOps.expand(av1, border=10, fill=(255, 69, 0))
+    av2 = ImageOps.expand(av2, border=10, fill=(128, 0, 128))
+    bg.paste(av1, (100, 125), av1)
+    bg.paste(av2, (650, 125), av2)
+    overlay = Image.new("RGBA", bg.size, (139, 0, 0, 40))
+    bg = Image.alpha_composite(bg, overlay)
+    return encoder.encode(bg)
+
+
+def ship_card(u1_data, u2_data, percent):
+    """Visual match with SQUARE avatars and high-visibility central green ruler."""
+    # --- RESETTING LAYOUT ---
+    # CLEAN CANVAS: Deep Dark Background
+    canvas_width = 1200
+    canvas_height = 700
+    canvas = Image.new("RGBA", (canvas_width, canvas_height), (10, 0, 5, 255))
+    draw = ImageDraw.Draw(canvas)
+
+    # BIGGER SQUARE AVATARS: Set to 400px (Removed Ellipse Masks)
+    av_size = 400
+    av1_img = _sprite(u1_data, av_size)
+    av2_img = _sprite(u2_data, av_size)
+
+    def apply_erotic_frame_square(avatar, color, pulse_intensity=3):
+        # No circle mask applied here to keep images SQUARE
+        glow_size = av_size + 80
+        glow = Image.new("RGBA", (glow_size, glow_size), (0, 0, 0, 0))
+        draw_g = ImageDraw.Draw(glow)
+        glow_range = 20 + pulse_intensity
+        for i in range(glow_range, 0, -1):
+            alpha = int(220 * (1 - i/glow_range))
+            # Draw a square frame instead of an ellipse
+            draw_g.rectangle([i, i, glow_size-i, glow_size-i], outline=(*color, alpha), width=5)
+        glow.paste(avatar, (40, 40), avatar)
+        return glow
+
+    frame_color = (255, 20, 147) # Hot Pink
+    pulse = int((percent / 100) * 10)
+
+    if percent == 69: frame_color = (255, 0, 255)
+    elif percent >= 90: frame_color = (255, 0, 80)
+
+    av1_framed = apply_erotic_frame_square(av1_img, frame_color, pulse)
+    av2_framed = apply_erotic_frame_square(av2_img, frame_color, pulse)
+
+    # Paste SQUARE Avatars on the sides
+    canvas.paste(av1_framed, (20, 150), av1_framed)
+    canvas.paste(av2_framed, (canvas_width - av_size - 100, 150), av2_framed)
+
+    # --- THE CENTRAL RULER (DOMINANT FEATURE) ---
+    # LARGER COLUMN: coordinates (Middle)
+    col_x, col_y, col_w, col_h = (canvas_width // 2) - 60, 120, 120, 480
+    light_green = (50, 255, 50) # High-Visibility Vibrant Green
+
+    # Ruler Frame (Dark Background with White Border)
+    draw.rectangle([col_x, col_y, col_x + col_w, col_y + col_h], fill=(20, 20, 20), outline=(255, 255, 255), width=5)
+
+    # Ruler Filling (Vibrant Green)
+    fill_height = (percent / 100) * col_h
+    if percent > 0:
+        draw.rectangle([col_x + 8, (col_y + col_h) - fill_height, col_x + col_w - 8, col_y + col_h - 8], fill=light_green)
+
+    # MASSIVE PERCENTAGE TEXT (Extremely Visible)
+    score_text = f"{percent}%"
+    # Centered at the top of the expanded column
+    draw.text(((canvas_width // 2) - 80, 20), score_text, fill=(255, 255, 255), stroke_width=10, stroke_fill=(0,0,0))
+
+    # Bottom Progress Bar
+    draw.rectangle([100, 640, 1100, 680], fill=(15, 0, 5), outline=frame_color, width=4)
+    bar_width = (percent / 100) * 1000
+    if percent > 60:
+        draw.text(((canvas_width // 2) - 15, 620), "🫦", fill=(255, 255, 255))
+    draw.rectangle([104, 644, 100 + bar_width, 676], fill=frame_color)
+
+    return encoder.encode(canvas)
+
+
+def union_card(u1_data, u2_data, bond_type="Marriage"):
+    bg_color = (255, 20, 147, 40) if "Anniversary" in bond_type else (25, 0, 0, 255)
+    canvas = Image.new("RGBA", (1000, 500), bg_color)
+    av1 = _sprite(u1_data, 320)
+    av2 = _sprite(u2_data, 320)
+
+    # Keeping Union images square as well
+    draw = ImageDraw.Draw(canvas)
+    if "Anniversary" in bond_type:
+        for _ in range(30):
+            x, y = random.randint(0, 1000), random.randint(0, 500)
+            draw.text((x, y), "💕", fill=(255, 105, 180))
+
+    canvas.paste(av1, (100, 90), av1)
+    canvas.paste(av2, (580, 90), av2)
+
+    icon = "⛓️🫦⛓️" if bond_type == "Marriage" else "🤝🔥🤝"
+    if "Anniversary" in bond_type: icon = "💖🔥🔞"
+    draw.text((440, 210), icon, fill=(255, 255, 255))
+
+    return encoder.encode(canvas)
+
+
+def ask_card(u1_data, u2_data, title="DM REQUEST"):
+    """Request visual using square avatars and fiery theme."""
+    canvas_width = 1200
+    canvas_height = 600
+    canvas = Image.new("RGBA", (canvas_width, canvas_height), (15, 0, 8, 255))
+    draw = ImageDraw.Draw(canvas)
+
+    av_size = 350
+    av1 = _sprite(u1_data, av_size)
+    av2 = _sprite(u2_data, av_size)
+
+    def draw_glow(draw_obj, pos, size, color):
+        for i in range(15, 0, -1):
+            alpha = int(255 * (1 - i/15))
+            draw_obj.rectangle([pos[0]-i, pos[1]-i, pos[0]+size+i, pos[1]+size+i], outline=(*color, alpha), width=2)
+
+    draw_glow(draw, (100, 120), av_size, (255, 20, 147))
+    draw_glow(draw, (750, 120), av_size, (255, 0, 0))
+
+    canvas.paste(av1, (100, 120), av1)
+    canvas.paste(av2, (750, 120), av2)
+
+    draw.text((500, 50), title, fill=(255, 255, 255), stroke_width=5, stroke_fill=(0,0,0))
+    draw.text((550, 250), "VS", fill=(255, 0, 0), stroke_width=8, stroke_fill=(0,0,0))
+
+    return encoder.encode(canvas)
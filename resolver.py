@@ -0,0 +1,122 @@
+import asyncio
+import os
+
+import discord
+
+from cache import LRUCache
+
+# ===== USER / MEMBER RESOLVER =====
+# Audits and leaderboards turned ids into users with one awaited fetch_user
+# after another. Every lookup now goes: gateway cache (get_user/get_member,
+# free) -> a TTL'd LRU of earlier REST results -> REST, with all misses of a
+# batch fetched concurrently. The semaphore keeps the burst below what the
+# REST buckets allow (discord.py still sleeps through any 429 it gets), and
+# concurrent asks for one id share a single request. Unknown ids are cached as
+# misses for a short while so a deleted account isn't re-fetched every audit.
+
+FETCH_CONCURRENCY = int(os.getenv("RESOLVER_CONCURRENCY", "5"))
+USER_TTL = int(os.getenv("RESOLVER_TTL", "900"))   # Seconds a fetched user/member is reused
+MISS_TTL = 120                                     # Seconds an unknown id stays unknown
+MAX_ENTRIES = 20000
+
+_MISSING = object()
+_cache = LRUCache(MAX_ENTRIES, ttl=USER_TTL)   # size=1 per entry, so the budget is an entry count
+_inflight = {}   # key -> Task shared by concurrent asks
+_sem = None
+
+
+def _semaphore():
+    global _sem
+    if _sem is None:
+        _sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    return _sem
+
+
+async def _load(key, call):
+    try:
+        async with _semaphore():
+            try:
+                value = await call()
+            except (discord.NotFound, discord.Forbidden):
+                value = None
+        if value is None:
+            _cache.put(key, _MISSING, ttl=MISS_TTL)
+        else:
+            _cache.put(key, value)
+        return value
+    finally:
+        _inflight.pop(key, None)
+
+
+def _retrieved(task):
+    # Every waiter may have been cancelled; don't let an unread failure log
+    if not task.cancelled():
+        task.exception()
+
+
+async def _fetch(key, call):
+    task = _inflight.get(key)
+    if task is None:
+        # Its own task, shielded per caller: one cancelled command doesn't cancel the others
+        task = _inflight[key] = asyncio.ensure_future(_load(key, call))
+        task.add_done_callback(_retrieved)
+    return await asyncio.shield(task)
+
+
+def _cached(key):
+    """(hit, value): value is None for a cached miss."""
+    value = _cache.get(key, None)
+    if value is None:
+        return False, None
+    return True, (None if value is _MISSING else value)
+
+
+# --- USERS ---
+async def user(bot, user_id):
+    """discord.User (or cached Member) for an id, or None if it doesn't exist."""
+    found = bot.get_user(user_id)
+    if found is not None:
+        return found
+    hit, value = _cached(("u", user_id))
+    if hit:
+        return value
+    try:
+        return await _fetch(("u", user_id), lambda: bot.fetch_user(user_id))
+    except discord.HTTPException as e:
+        print(f"Resolver: fetch_user({user_id}) failed: {e}")
+        return None
+
+
+async def users(bot, user_ids):
+    """{id: User or None} for every id, misses fetched concurrently."""
+    ids = list(dict.fromkeys(user_ids))
+    found = await asyncio.gather(*(user(bot, uid) for uid in ids))
+    return dict(zip(ids, found))
+
+
+# --- MEMBERS ---
+async def member(guild, user_id):
+    """Member of `guild`, or None if they aren't in it (or don't exist)."""
+    found = guild.get_member(user_id)
+    if found is not None:
+        return found
+    key = ("m", guild.id, user_id)
+    hit, value = _cached(key)
+    if hit:
+        return value
+    try:
+        return await _fetch(key, lambda: guild.fetch_member(user_id))
+    except discord.HTTPException as e:
+        print(f"Resolver: fetch_member({user_id}) failed: {e}")
+        return None
+
+
+async def members(guild, user_ids):
+    """{id: Member or None} for every id, misses fetched concurrently."""
+    ids = list(dict.fromkeys(user_ids))
+    found = await asyncio.gather(*(member(guild, uid) for uid in ids))
+    return dict(zip(ids, found))
+
+
+def stats():
+    return _cache.stats()
@@ -0,0 +1,75 @@
+import asyncio
+import os
+
+import database
+
+# ===== BUFFERED REWARD SINK =====
+# Collect paid every reaction and selfie with its own UPDATE + commit, so a
+# reaction storm during an event queued hundreds of write transactions behind
+# the gameplay ones. Rewards are now summed per user in memory and written by
+# one executemany every FLUSH_SECONDS, or as soon as MAX_PENDING users are
+# waiting. close() writes whatever is left, so a clean shutdown loses nothing;
+# a crash loses at most one interval of reaction rewards.
+
+FLUSH_SECONDS = float(os.getenv("REWARD_FLUSH_SECONDS", "5"))
+MAX_PENDING = int(os.getenv("REWARD_MAX_PENDING", "500"))   # Users buffered before an early flush
+
+REWARD_SQL = "UPDATE users SET xp = xp + ?, balance = balance + ? WHERE id = ?"
+
+
+class RewardSink:
+    def __init__(self, interval=FLUSH_SECONDS, max_pending=MAX_PENDING):
+        self.interval = interval
+        self.max_pending = max_pending
+        self.pending = {}   # user_id -> [xp, flames]
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    def add(self, user_id, xp, flames):
+        entry = self.pending.get(user_id)
+        if entry is None:
+            self.pending[user_id] = [xp, flames]
+            if len(self.pending) >= self.max_pending:
+                self._wake.set()
+        else:
+            entry[0] += xp
+            entry[1] += flames
+
+    async def flush(self):
+        """Writes every buffered reward in one statement batch; returns the user count."""
+        async with self._lock:
+            if not self.pending:
+                return 0
+            batch, self.pending = self.pending, {}
+            try:
+                await database.executemany(REWARD_SQL, [(xp, flames, uid) for uid, (xp, flames) in batch.items()])
+            except Exception:
+                # Put it back so the next flush retries it
+                for uid, (xp, flames) in batch.items():
+                    self.add(uid, xp, flames)
+                raise
+            return len(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Reward sink flush failed: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stops the timer and writes what is left (cog unload / shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
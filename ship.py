@@ -1,13 +1,25 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 import random
-import io
-import aiohttp
+import asyncio
 import sys
-import json
 import os
-from datetime import datetime, timezone
-from PIL import Image, ImageDraw, ImageOps, ImageFilter
+import database
+import avatars
+import render
+import inventory
+import branding
+import compat
+import resolver
+import audit
+from card_cache import CardCache, utc_day
+from datetime import datetime, timezone, time
+
+# ADDED: Ship cards only change with the pair, their avatars and the day's percent,
+# so repeats of the same !ship are served from here instead of re-rendered
+SHIP_CACHE_BYTES = int(os.getenv("SHIP_CACHE_BYTES", str(16 * 1024 * 1024)))
+SHIP_CACHE_DIR = os.getenv("SHIP_CACHE_DIR")  # Optional on-disk spill, survives restarts
+ship_cards = CardCache(SHIP_CACHE_BYTES, SHIP_CACHE_DIR)
 
 class FieryShip(commands.Cog):
     def __init__(self, bot):
@@ -122,117 +134,70 @@ class FieryShip(commands.Cog):
             ]
         }
         self.AUDIT_CHANNEL_ID = 1438810509322223677
-
-    async def create_ship_image(self, u1_url, u2_url, percent):
+        # ADDED: The day's compatibility answers, so the match commands are lookups
+        self.daily_matches = {}   # guild_id -> compat.GuildMatches
+        self.love_board = None    # (day, [(uid, uid, pct)] best first) for !lovescore
+        self.midnight_reset.start()
+
+    def cog_unload(self):
+        self.midnight_reset.cancel()
+
+    # ===== DAILY MATCH CACHE =====
+    @tasks.loop(time=[time(hour=0, minute=0, second=0, tzinfo=timezone.utc)])
+    async def midnight_reset(self):
+        """New UTC day, new percentages: drop every cached answer."""
+        self.daily_matches.clear()
+        self.love_board = None
+
+    async def get_matches(self, guild):
+        """The guild's GuildMatches for today, built (off the loop) on first use."""
+        matches = self.daily_matches.get(guild.id)
+        if matches is None or not matches.fresh():
+            ids = [m.id for m in guild.members if not m.bot][:compat.SCAN_LIMIT]
+            matches = compat.GuildMatches(ids)
+            self.daily_matches[guild.id] = matches
+        if matches.top is None:
+            await asyncio.to_thread(matches.build_top)
+        return matches
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        matches = self.daily_matches.get(member.guild.id)
+        if matches is None or member.bot:
+            return
+        if not matches.fresh() or (compat.SCAN_LIMIT and len(matches.ids) >= compat.SCAN_LIMIT):
+            self.daily_matches.pop(member.guild.id, None)
+            return
+        matches.add(member.id)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        # Their pairs may be in the top list or someone's best match; rebuild on next use
+        self.daily_matches.pop(member.guild.id, None)
+
+    async def create_ship_image(self, user1, user2, percent):
         """Generates visual match with SQUARE avatars and high-visibility central green ruler."""
+        u1_url, u2_url = str(user1.display_avatar.url), str(user2.display_avatar.url)
+        # Avatar URLs carry the avatar hash, so a new avatar is a new key
+        day, key = utc_day(), (user1.id, user2.id, u1_url, u2_url, percent)
+        cached = ship_cards.get(day, key)
+        if cached is not None:
+            return cached
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(u1_url) as r1, session.get(u2_url) as r2:
-                    p1_data = io.BytesIO(await r1.read())
-                    p2_data = io.BytesIO(await r2.read())
-
-            # --- RESETTING LAYOUT ---
-            # CLEAN CANVAS: Deep Dark Background
-            canvas_width = 1200
-            canvas_height = 700
-            canvas = Image.new("RGBA", (canvas_width, canvas_height), (10, 0, 5, 255))
-            draw = ImageDraw.Draw(canvas)
-
-            # BIGGER SQUARE AVATARS: Set to 400px (Removed Ellipse Masks)
-            av_size = 400
-            av1_img = Image.open(p1_data).convert("RGBA").resize((av_size, av_size))
-            av2_img = Image.open(p2_data).convert("RGBA").resize((av_size, av_size))
-
-            def apply_erotic_frame_square(avatar, color, pulse_intensity=3):
-                # No circle mask applied here to keep images SQUARE
-                glow_size = av_size + 80
-                glow = Image.new("RGBA", (glow_size, glow_size), (0, 0, 0, 0))
-                draw_g = ImageDraw.Draw(glow)
-                glow_range = 20 + pulse_intensity 
-                for i in range(glow_range, 0, -1):
-                    alpha = int(220 * (1 - i/glow_range))
-                    # Draw a square frame instead of an ellipse
-                    draw_g.rectangle([i, i, glow_size-i, glow_size-i], outline=(*color, alpha), width=5)
-                glow.paste(avatar, (40, 40), avatar)
-                return glow
-
-            frame_color = (255, 20, 147) # Hot Pink
-            pulse = int((percent / 100) * 10) 
-            
-            if percent == 69: frame_color = (255, 0, 255) 
-            elif percent >= 90: frame_color = (255, 0, 80) 
-
-            av1_framed = apply_erotic_frame_square(av1_img, frame_color, pulse)
-            av2_framed = apply_erotic_frame_square(av2_img, frame_color, pulse)
-
-            # Paste SQUARE Avatars on the sides
-            canvas.paste(av1_framed, (20, 150), av1_framed)
-            canvas.paste(av2_framed, (canvas_width - av_size - 100, 150), av2_framed)
-
-            # --- THE CENTRAL RULER (DOMINANT FEATURE) ---
-            # LARGER COLUMN: coordinates (Middle)
-            col_x, col_y, col_w, col_h = (canvas_width // 2) - 60, 120, 120, 480
-            light_green = (50, 255, 50) # High-Visibility Vibrant Green
-            
-            # Ruler Frame (Dark Background with White Border)
-            draw.rectangle([col_x, col_y, col_x + col_w, col_y + col_h], fill=(20, 20, 20), outline=(255, 255, 255), width=5)
-            
-            # Ruler Filling (Vibrant Green)
-            fill_height = (percent / 100) * col_h
-            if percent > 0:
-                draw.rectangle([col_x + 8, (col_y + col_h) - fill_height, col_x + col_w - 8, col_y + col_h - 8], fill=light_green)
-
-            # MASSIVE PERCENTAGE TEXT (Extremely Visible)
-            score_text = f"{percent}%"
-            # Centered at the top of the expanded column
-            draw.text(((canvas_width // 2) - 80, 20), score_text, fill=(255, 255, 255), stroke_width=10, stroke_fill=(0,0,0))
-
-            # Bottom Progress Bar
-            draw.rectangle([100, 640, 1100, 680], fill=(15, 0, 5), outline=frame_color, width=4)
-            bar_width = (percent / 100) * 1000
-            if percent > 60:
-                draw.text(((canvas_width // 2) - 15, 620), "🫦", fill=(255, 255, 255))
-            draw.rectangle([104, 644, 100 + bar_width, 676], fill=frame_color)
-            
-            buf = io.BytesIO()
-            canvas.save(buf, format="PNG")
-            buf.seek(0)
-            return buf
+            u1_data, u2_data = await avatars.fetch_pair(u1_url, u2_url)
         except Exception as e:
             print(f"Fiery Ship Error: {e}")
             return None
+        img = await render.card(render.ship_card, u1_data, u2_data, percent)
+        if img is not None:
+            ship_cards.put(day, key, img)
+        return img
 
     async def create_union_image(self, u1_url, u2_url, bond_type="Marriage"):
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(u1_url) as r1, session.get(u2_url) as r2:
-                    p1_data = io.BytesIO(await r1.read())
-                    p2_data = io.BytesIO(await r2.read())
-            
-            bg_color = (255, 20, 147, 40) if "Anniversary" in bond_type else (25, 0, 0, 255)
-            canvas = Image.new("RGBA", (1000, 500), bg_color)
-            av1 = Image.open(p1_data).convert("RGBA").resize((320, 320))
-            av2 = Image.open(p2_data).convert("RGBA").resize((320, 320))
-            
-            # Keeping Union images square as well
-            draw = ImageDraw.Draw(canvas)
-            if "Anniversary" in bond_type:
-                for _ in range(30):
-                    x, y = random.randint(0, 1000), random.randint(0, 500)
-                    draw.text((x, y), "💕", fill=(255, 105, 180))
-
-            canvas.paste(av1, (100, 90), av1)
-            canvas.paste(av2, (580, 90), av2)
-            
-            icon = "⛓️🫦⛓️" if bond_type == "Marriage" else "🤝🔥🤝"
-            if "Anniversary" in bond_type: icon = "💖🔥🔞"
-            draw.text((440, 210), icon, fill=(255, 255, 255))
-            
-            buf = io.BytesIO()
-            canvas.save(buf, format="PNG")
-            buf.seek(0)
-            return buf
+            u1_data, u2_data = await avatars.fetch_pair(u1_url, u2_url)
         except: return None
+        return await render.card(render.union_card, u1_data, u2_data, bond_type)
 
     @commands.command(name="ship")
     async def ship(self, ctx, user1: discord.Member, user2: discord.Member = None):
@@ -241,11 +206,7 @@ class FieryShip(commands.Cog):
             user2 = user1
             user1 = ctx.author
 
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        seed_str = f"{min(user1.id, user2.id)}{max(user1.id, user2.id)}{today}"
-        random.seed(seed_str)
-        percent = random.randint(0, 100)
-        random.seed()
+        percent = compat.percent(user1.id, user2.id)
 
         if percent == 0: tier = "sad"
         elif percent < 30: tier = "low"
@@ -259,7 +220,7 @@ class FieryShip(commands.Cog):
 
         main_mod = sys.modules['__main__']
         
-        u1_data = main_mod.get_user(user1.id)
+        u1_data = await main_mod.get_user_async(user1.id)
         is_anni = False
         if u1_data['spouse'] == user2.id and u1_data['marriage_date']:
             m_date = datetime.strptime(u1_data['marriage_date'], "%Y-%m-%d")
@@ -282,37 +243,34 @@ class FieryShip(commands.Cog):
 
         embed.add_field(name=f"📊 Compatibility: {percent}%", value=f"*{result_msg}*", inline=False)
         
-        img_buf = await self.create_ship_image(user1.display_avatar.url, user2.display_avatar.url, percent)
+        img_buf = await self.create_ship_image(user1, user2, percent)
         if img_buf:
-            file = discord.File(img_buf, filename="ship.png")
-            embed.set_image(url="attachment://ship.png")
+            file = discord.File(img_buf.fp, filename=img_buf.filename("ship"))
+            embed.set_image(url=f"attachment://{img_buf.filename('ship')}")
             
             files_to_send = [file]
-            if os.path.exists("LobbyTopRight.jpg"):
-                files_to_send.append(discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg"))
+            files_to_send += branding.attach(embed)
             
             await ctx.send(content=f"{user1.mention} {user2.mention}" if is_anni else None, files=files_to_send, embed=embed)
         else:
             await ctx.send(embed=embed)
 
         if percent in [0, 69, 100]:
-            audit_channel = self.bot.get_channel(self.AUDIT_CHANNEL_ID)
-            if audit_channel:
-                log_embed = main_mod.fiery_embed("🕵️ VOYEUR AUDIT REPORT", f"A peak frequency has been detected in {ctx.channel.mention}.")
-                log_embed.add_field(name="Assets", value=f"{user1.mention} x {user2.mention}", inline=True)
-                log_embed.add_field(name="Sync Level", value=f"**{percent}%**", inline=True)
-                
-                if percent == 0:
-                    log_embed.description = "🥀 **CRITICAL FAILURE:** A total void of attraction. The assets are completely incompatible."
-                    log_embed.color = 0x000000 
-                elif percent == 69:
-                    log_embed.description = "🫦 **CARNAL ALIGNMENT:** Exhibitionist peak reached. 2,500 Flames distributed to each asset."
-                    log_embed.color = 0xFF00FF 
-                elif percent == 100:
-                    log_embed.description = "💖 **ABSOLUTE POSSESSION:** Souls have merged. The contract is permanent."
-                    log_embed.color = 0xFFD700 
-                
-                await audit_channel.send(embed=log_embed)
+            log_embed = main_mod.fiery_embed("🕵️ VOYEUR AUDIT REPORT", f"A peak frequency has been detected in {ctx.channel.mention}.")
+            log_embed.add_field(name="Assets", value=f"{user1.mention} x {user2.mention}", inline=True)
+            log_embed.add_field(name="Sync Level", value=f"**{percent}%**", inline=True)
+            
+            if percent == 0:
+                log_embed.description = "🥀 **CRITICAL FAILURE:** A total void of attraction. The assets are completely incompatible."
+                log_embed.color = 0x000000 
+            elif percent == 69:
+                log_embed.description = "🫦 **CARNAL ALIGNMENT:** Exhibitionist peak reached. 2,500 Flames distributed to each asset."
+                log_embed.color = 0xFF00FF 
+            elif percent == 100:
+                log_embed.description = "💖 **ABSOLUTE POSSESSION:** Souls have merged. The contract is permanent."
+                log_embed.color = 0xFFD700 
+            
+            audit.post(self.AUDIT_CHANNEL_ID, log_embed)
 
     @commands.command(name="marry", aliases=["propose"])
     async def marry(self, ctx, member: discord.Member):
@@ -320,15 +278,14 @@ class FieryShip(commands.Cog):
         main_mod = sys.modules['__main__']
         if member.id == ctx.author.id: return await ctx.send("❌ You cannot own your own soul twice, asset.")
         
-        u1 = main_mod.get_user(ctx.author.id)
-        u2 = main_mod.get_user(member.id)
+        u1 = await main_mod.get_user_async(ctx.author.id)
+        u2 = await main_mod.get_user_async(member.id)
         
         if u1['spouse'] or u2['spouse']:
             return await ctx.send("❌ One of you is already under contract elsewhere.")
             
-        inv = json.loads(u1['titles'])
         rings = ["Rare Ring", "Epic Ring", "Legendary Ring", "Supreme Ring"]
-        has_ring = any(r in inv for r in rings)
+        has_ring = await database.read(inventory.owns_any, ctx.author.id, rings)
         
         if not has_ring:
             return await ctx.send("❌ You cannot propose empty-handed. Purchase a **Ring** from the Market first.")
@@ -339,29 +296,26 @@ class FieryShip(commands.Cog):
         async def accept(interaction):
             if interaction.user.id != member.id: return
             today = datetime.now().strftime("%Y-%m-%d")
-            with main_mod.get_db_connection() as conn:
-                conn.execute("UPDATE users SET spouse = ?, marriage_date = ? WHERE id = ?", (member.id, today, ctx.author.id))
-                conn.execute("UPDATE users SET spouse = ?, marriage_date = ? WHERE id = ?", (ctx.author.id, today, member.id))
-                conn.commit()
+            await database.executemany("UPDATE users SET spouse = ?, marriage_date = ? WHERE id = ?",
+                                       [(member.id, today, ctx.author.id), (ctx.author.id, today, member.id)])
+            self.love_board = None
             
             img = await self.create_union_image(ctx.author.display_avatar.url, member.display_avatar.url, "Marriage")
-            file = discord.File(img, filename="union.png")
             win_emb = main_mod.fiery_embed("💖 CONTRACT SEALED 🫦", f"The Master has signed the decree. **{ctx.author.display_name}** and **{member.display_name}** are officially bound.\n\nThey now share a single heartbeat in the dark.", color=0xFFD700)
-            win_emb.set_image(url="attachment://union.png")
             
-            files_to_send = [file]
-            if os.path.exists("LobbyTopRight.jpg"):
-                files_to_send.append(discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg"))
+            files_to_send = []
+            if img:
+                files_to_send.append(discord.File(img.fp, filename=img.filename("union")))
+                win_emb.set_image(url=f"attachment://{img.filename('union')}")
+            files_to_send += branding.attach(win_emb)
             
             await interaction.response.send_message(files=files_to_send, embed=win_emb)
             
-            audit_channel = self.bot.get_channel(self.AUDIT_CHANNEL_ID)
-            if audit_channel:
-                log_emb = main_mod.fiery_embed("💍 VOYEUR UNION AUDIT", f"A permanent synchronization has been achieved.")
-                log_emb.add_field(name="Dominant/Partner", value=ctx.author.mention, inline=True)
-                log_emb.add_field(name="Submissive/Partner", value=member.mention, inline=True)
-                log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} and {member.display_name} have sealed their fates. The Red Room records their eternal bond."
-                await audit_channel.send(embed=log_emb)
+            log_emb = main_mod.fiery_embed("💍 VOYEUR UNION AUDIT", f"A permanent synchronization has been achieved.")
+            log_emb.add_field(name="Dominant/Partner", value=ctx.author.mention, inline=True)
+            log_emb.add_field(name="Submissive/Partner", value=member.mention, inline=True)
+            log_emb.description = f"🔞 **VOYEUR NOTE:** {ctx.author.display_name} and {member.display_name} have sealed their fates. The Red Room records their eternal bond."
+            audit.post(self.AUDIT_CHANNEL_ID, log_emb)
             view.stop()
 
         btn = discord.ui.Button(label="Accept Possession", style=discord.ButtonStyle.success, emoji="🫦")
@@ -373,30 +327,24 @@ class FieryShip(commands.Cog):
     async def divorce(self, ctx):
         """Sever the contract and return to the pit alone."""
         main_mod = sys.modules['__main__']
-        u = main_mod.get_user(ctx.author.id)
+        u = await main_mod.get_user_async(ctx.author.id)
         if not u['spouse']: return await ctx.send("❌ You have no one to divorce, pet.")
         
         spouse_id = u['spouse']
-        with main_mod.get_db_connection() as conn:
-            conn.execute("UPDATE users SET spouse = NULL, marriage_date = NULL WHERE id = ?", (ctx.author.id,))
-            conn.execute("UPDATE users SET spouse = NULL, marriage_date = NULL WHERE id = ?", (spouse_id,))
-            conn.commit()
+        await database.executemany("UPDATE users SET spouse = NULL, marriage_date = NULL WHERE id = ?",
+                                   [(ctx.author.id,), (spouse_id,)])
+        self.love_board = None
             
         embed = main_mod.fiery_embed("💔 CONTRACT SEVERED", f"You and <@{spouse_id}> are now strangers in the shadows.\n\nThe Red Room consumes another failed union.")
-        if os.path.exists("LobbyTopRight.jpg"):
-             file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-             embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
-             await ctx.send(file=file, embed=embed)
-        else:
-             await ctx.send(embed=embed)
+        if branding.available():
+            embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
+        await ctx.send(files=branding.attach(embed), embed=embed)
         
-        audit_channel = self.bot.get_channel(self.AUDIT_CHANNEL_ID)
-        if audit_channel:
-            log_emb = main_mod.fiery_embed("💔 VOYEUR SEVERANCE AUDIT", f"A synchronization has been shattered.")
-            log_emb.add_field(name="Asset One", value=ctx.author.mention, inline=True)
-            log_emb.add_field(name="Asset Two", value=f"<@{spouse_id}>", inline=True)
-            log_emb.description = f"🥀 **VOYEUR NOTE:** The contract between these assets has been nullified. They return to the dungeon floor as solitary figures."
-            await audit_channel.send(embed=log_emb)
+        log_emb = main_mod.fiery_embed("💔 VOYEUR SEVERANCE AUDIT", f"A synchronization has been shattered.")
+        log_emb.add_field(name="Asset One", value=ctx.author.mention, inline=True)
+        log_emb.add_field(name="Asset Two", value=f"<@{spouse_id}>", inline=True)
+        log_emb.description = f"🥀 **VOYEUR NOTE:** The contract between these assets has been nullified. They return to the dungeon floor as solitary figures."
+        audit.post(self.AUDIT_CHANNEL_ID, log_emb)
 
     @commands.command(name="bestfriend")
     async def bestfriend(self, ctx, member: discord.Member):
@@ -410,22 +358,19 @@ class FieryShip(commands.Cog):
         async def accept(interaction):
             if interaction.user.id != member.id: return
             img = await self.create_union_image(ctx.author.display_avatar.url, member.display_avatar.url, "BestFriend")
-            file = discord.File(img, filename="friend.png")
             win_emb = main_mod.fiery_embed("🤝 BLOOD BOND SEALED", f"**{ctx.author.display_name}** and **{member.display_name}** are now Blood-Bound Best Friends!")
-            win_emb.set_image(url="attachment://friend.png")
-            if os.path.exists("LobbyTopRight.jpg"):
-                 thumb_file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-                 await interaction.response.send_message(files=[file, thumb_file], embed=win_emb)
-            else:
-                 await interaction.response.send_message(file=file, embed=win_emb)
+            files_to_send = []
+            if img:
+                files_to_send.append(discord.File(img.fp, filename=img.filename("friend")))
+                win_emb.set_image(url=f"attachment://{img.filename('friend')}")
+            files_to_send += branding.attach(win_emb)
+            await interaction.response.send_message(files=files_to_send, embed=win_emb)
             
-            audit_channel = self.bot.get_channel(self.AUDIT_CHANNEL_ID)
-            if audit_channel:
-                log_emb = main_mod.fiery_embed("🤝 VOYEUR ALLIANCE AUDIT", f"A new blood-bond has been formed.")
-                log_emb.add_field(name="Ally One", value=ctx.author.mention, inline=True)
-                log_emb.add_field(name="Ally Two", value=member.mention, inline=True)
-                log_emb.description = f"🔥 **VOYEUR NOTE:** {ctx.author.display_name} and {member.display_name} have shared blood. A platonic alliance is recorded."
-                await audit_channel.send(embed=log_emb)
+            log_emb = main_mod.fiery_embed("🤝 VOYEUR ALLIANCE AUDIT", f"A new blood-bond has been formed.")
+            log_emb.add_field(name="Ally One", value=ctx.author.mention, inline=True)
+            log_emb.add_field(name="Ally Two", value=member.mention, inline=True)
+            log_emb.description = f"🔥 **VOYEUR NOTE:** {ctx.author.display_name} and {member.display_name} have shared blood. A platonic alliance is recorded."
+            audit.post(self.AUDIT_CHANNEL_ID, log_emb)
             view.stop()
 
         btn = discord.ui.Button(label="Accept Bond", style=discord.ButtonStyle.primary, emoji="🔥")
@@ -438,22 +383,17 @@ class FieryShip(commands.Cog):
         """Scans the dungeon for the highest compatibility pairs of the day."""
         main_mod = sys.modules['__main__']
         await ctx.send("👁️ **The Master's Voyeurs are scanning the pit for erotic frequencies...**")
-        members = [m for m in ctx.channel.members if not m.bot][:40]
-        if len(members) < 2:
+        matches = await self.get_matches(ctx.guild)
+        if len(matches.ids) < 2:
             return await ctx.send("❌ Not enough assets in this sector to scan.")
 
-        matches = []
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        for i in range(len(members)):
-            for j in range(i + 1, len(members)):
-                u1, u2 = members[i], members[j]
-                seed_str = f"{min(u1.id, u2.id)}{max(u1.id, u2.id)}{today}"
-                random.seed(seed_str)
-                percent = random.randint(0, 100)
-                random.seed()
-                matches.append((u1, u2, percent))
-
-        top_matches = sorted(matches, key=lambda x: x[2], reverse=True)[:5]
+        top_matches = []
+        for a, b, pct in matches.top_pairs(compat.TOP_N):
+            m1, m2 = ctx.guild.get_member(a), ctx.guild.get_member(b)
+            if m1 and m2:
+                top_matches.append((m1, m2, pct))
+            if len(top_matches) == 5:
+                break
         embed = main_mod.fiery_embed("🫦 THE MASTER'S MATCHMAKING 🫦", "Scanning current vibrations for peak exhibition:")
         description = ""
         for idx, (m1, m2, pct) in enumerate(top_matches, 1):
@@ -463,76 +403,58 @@ class FieryShip(commands.Cog):
             description += f"**{idx}.** {icon} {m1.mention} + {m2.mention} — **{pct}% Sync**\n"
         embed.description = description
         embed.set_footer(text="The dungeon floor is heating up. Watch and learn.")
-        if os.path.exists("LobbyTopRight.jpg"):
-             file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-             embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
-             await ctx.send(file=file, embed=embed)
-        else:
-             await ctx.send(embed=embed)
+        if branding.available():
+            embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
+        await ctx.send(files=branding.attach(embed), embed=embed)
 
     @commands.command(name="lovescore", aliases=["lovelb"])
     async def lovescore(self, ctx):
         """Displays the most powerful and synchronized bonds in the dungeon."""
         main_mod = sys.modules['__main__']
-        with main_mod.get_db_connection() as conn:
-            data = conn.execute("SELECT id, spouse FROM users WHERE spouse IS NOT NULL").fetchall()
+        data = await database.fetchall("SELECT id, spouse FROM users WHERE spouse IS NOT NULL")
         
         if not data:
             return await ctx.send("🥀 **The Master finds no sacred bonds in the current sector. Propose a contract!**")
 
-        processed = set()
+        day = compat.today()
+        if self.love_board is None or self.love_board[0] != day:
+            ranked = {}
+            for row in data:
+                pair = tuple(sorted((row['id'], row['spouse'])))
+                if pair not in ranked:
+                    ranked[pair] = compat.percent(pair[0], pair[1], day, low=50)
+            board = sorted(((a, b, pct) for (a, b), pct in ranked.items()), key=lambda x: x[2], reverse=True)
+            self.love_board = (day, board)
+
+        # Only the names that make the top 10 are looked up, a page of pairs at a time
         leaderboard_data = []
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-
-        for row in data:
-            u_id = row['id']
-            s_id = row['spouse']
-            pair = tuple(sorted((u_id, s_id)))
-            if pair in processed: continue
-            processed.add(pair)
-            random.seed(f"{pair[0]}{pair[1]}{today}")
-            pct = random.randint(50, 100)
-            random.seed()
-            
-            try:
-                u_user = await self.bot.fetch_user(pair[0])
-                s_user = await self.bot.fetch_user(pair[1])
-                u_name = u_user.name
-                s_user_name = s_user.name
-                leaderboard_data.append((u_name, s_user_name, pct))
-            except: pass
-
-        leaderboard_data.sort(key=lambda x: x[2], reverse=True)
+        board = self.love_board[1]
+        for start in range(0, len(board), 10):
+            page = board[start:start + 10]
+            users = await resolver.users(self.bot, [uid for a, b, _ in page for uid in (a, b)])
+            for a, b, pct in page:
+                if users.get(a) and users.get(b) and len(leaderboard_data) < 10:
+                    leaderboard_data.append((users[a].name, users[b].name, pct))
+            if len(leaderboard_data) == 10:
+                break
         embed = main_mod.fiery_embed("⛓️ THE MASTER'S LOVESCORE 💍", "The most synchronized and submissive bonds today:")
         description = ""
         for idx, (n1, n2, pct) in enumerate(leaderboard_data[:10], 1):
             medal = "🥇" if idx == 1 else "🥈" if idx == 2 else "🥉" if idx == 3 else "🔥"
             description += f"{medal} **{n1}** & **{n2}** — `{pct}% Resonance`\n"
         embed.description = description
-        if os.path.exists("LobbyTopRight.jpg"):
-             file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-             embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
-             await ctx.send(file=file, embed=embed)
-        else:
-             await ctx.send(embed=embed)
+        if branding.available():
+            embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
+        await ctx.send(files=branding.attach(embed), embed=embed)
 
     @commands.command(name="matchme")
     async def matchme(self, ctx):
-        """Finds your personal highest-rated partner in this channel."""
-        members = [m for m in ctx.channel.members if not m.bot and m.id != ctx.author.id][:50]
-        if not members:
+        """Finds your personal highest-rated partner in the dungeon."""
+        matches = await self.get_matches(ctx.guild)
+        partner_id, _ = matches.best_partner(ctx.author.id)
+        best_partner = ctx.guild.get_member(partner_id) if partner_id else None
+        if best_partner is None:
             return await ctx.send("❌ No compatible assets detected in range.")
-        best_partner = None
-        highest_pct = -1
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        for m in members:
-            seed_str = f"{min(ctx.author.id, m.id)}{max(ctx.author.id, m.id)}{today}"
-            random.seed(seed_str)
-            pct = random.randint(0, 100)
-            random.seed()
-            if pct > highest_pct:
-                highest_pct = pct
-                best_partner = m
         await ctx.invoke(self.ship, user1=ctx.author, user2=best_partner)
 
     @commands.command(name="bondtrial", aliases=["kinkcheck"])
@@ -548,12 +470,9 @@ class FieryShip(commands.Cog):
             "**The Task:** Sync your moans to the Master's rhythm.\n"
             "**React with 🫦 to begin the show!**", color=0xFF0000)
         
-        if os.path.exists("LobbyTopRight.jpg"):
-             file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-             embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
-             msg = await ctx.send(file=file, embed=embed)
-        else:
-             msg = await ctx.send(embed=embed)
+        if branding.available():
+            embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
+        msg = await ctx.send(files=branding.attach(embed), embed=embed)
              
         await msg.add_reaction("🫦")
 
@@ -572,12 +491,9 @@ class FieryShip(commands.Cog):
             
             await main_mod.update_user_stats_async(ctx.author.id, amount=flames, source="Trial Completion")
             await main_mod.update_user_stats_async(partner.id, amount=flames, source="Trial Completion")
-            if os.path.exists("LobbyTopRight.jpg"):
-                file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
+            if branding.available():
                 res_emb.set_thumbnail(url="attachment://LobbyTopRight.jpg")
-                await ctx.send(file=file, embed=res_emb)
-            else:
-                await ctx.send(embed=res_emb)
+            await ctx.send(files=branding.attach(res_emb), embed=res_emb)
             
         except:
             await ctx.send(f"🥀 {partner.mention} was too shy for the stage. The trial is cancelled.")
@@ -587,7 +503,7 @@ class FieryShip(commands.Cog):
         """Check the status of your chains and bond level."""
         main_mod = sys.modules['__main__']
         target = user or ctx.author
-        u_data = main_mod.get_user(target.id)
+        u_data = await main_mod.get_user_async(target.id)
         
         spouse_ment = f"<@{u_data['spouse']}>" if u_data['spouse'] else "None (Single Asset)"
         m_date = u_data['marriage_date'] or "N/A"
@@ -603,12 +519,9 @@ class FieryShip(commands.Cog):
         else:
             embed.set_footer(text="A wandering soul. Use !matchme to find a Master or a Pet.")
             
-        if os.path.exists("LobbyTopRight.jpg"):
-             file = discord.File("LobbyTopRight.jpg", filename="LobbyTopRight.jpg")
-             embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
-             await ctx.send(file=file, embed=embed)
-        else:
-             await ctx.send(embed=embed)
+        if branding.available():
+            embed.set_thumbnail(url="attachment://LobbyTopRight.jpg")
+        await ctx.send(files=branding.attach(embed), embed=embed)
 
 async def setup(bot):
     await bot.add_cog(FieryShip(bot))
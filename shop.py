@@ -1,16 +1,13 @@
 import discord
 from discord.ext import commands
-import sqlite3
-import os
-import json
 from datetime import datetime, timezone
 import sys
+from collections import namedtuple
+import database
+import inventory
 
-# Persistence Logic for Railway
-if os.path.exists("/app/data"):
-    DATABASE_PATH = "/app/data/economy.db"
-else:
-    DATABASE_PATH = "data/economy.db"
+# Persistence Logic for Railway (resolved in database.py)
+DATABASE_PATH = database.DATABASE_PATH
 
 # EMOJI SET BY RARITY - REBORN WITH EROTIC THEMES
 TIER_EMOJIS = {
@@ -252,6 +249,32 @@ MARKET_DATA = {
     }
 }
 
+# ===== ITEM INDEX =====
+# Built once from MARKET_DATA at import, so every lookup is a single dict hit
+# instead of a walk over the whole catalogue. `!reload shop` re-imports this
+# module and rebuilds it; other modules should read it through `import shop`
+# at call time instead of keeping their own copy of the tables.
+ItemInfo = namedtuple("ItemInfo", "category tier prot luck price item")
+
+def normalize_item_name(name):
+    return str(name).strip().lower()
+
+def build_item_index(market_data):
+    index = {}
+    for category, tiers in market_data.items():
+        for tier, items in tiers.items():
+            for item in items:
+                index[normalize_item_name(item['name'])] = ItemInfo(
+                    category, tier, item.get("prot", 0), item.get("luck", 0), item["price"], item
+                )
+    return index
+
+ITEM_INDEX = build_item_index(MARKET_DATA)
+
+def lookup_item(name):
+    """Returns the ItemInfo for an item name (any case), or None."""
+    return ITEM_INDEX.get(normalize_item_name(name))
+
 # --- INTERACTIVE COMPONENTS ---
 
 class ShopView(discord.ui.View):
@@ -303,9 +326,8 @@ class Shop(commands.Cog):
         self.init_relation_db()
 
     def get_db_connection(self):
-        conn = sqlite3.connect(self.db_path, timeout=30.0)
-        conn.row_factory = sqlite3.Row
-        return conn
+        # Shared pool lease (see database.py)
+        return database.connection()
 
     def init_relation_db(self):
         with self.get_db_connection() as conn:
@@ -320,12 +342,10 @@ class Shop(commands.Cog):
             conn.commit()
 
     def get_item_details(self, name):
-        for category, tiers in MARKET_DATA.items():
-            for tier, items in tiers.items():
-                for item in items:
-                    if item['name'].lower() == name.lower():
-                        return item, category, tier
-        return None, None, None
+        info = lookup_item(name)
+        if info is None:
+            return None, None, None
+        return info.item, info.category, info.tier
 
     # Helper for Button UI updates
     async def update_shop_message(self, interaction, category, page, user):
@@ -387,21 +407,25 @@ class Shop(commands.Cog):
         if found_cat == "Rings":
             return await self.handle_ring_purchase(ctx, found_item, found_tier)
 
-        with self.get_db_connection() as conn:
-            user = conn.execute("SELECT balance, titles FROM users WHERE id = ?", (author.id,)).fetchone()
+        def _purchase(conn):
+            user = conn.execute("SELECT balance FROM users WHERE id = ?", (author.id,)).fetchone()
             if not user or user['balance'] < found_item['price']:
-                lack_emb = discord.Embed(title="❌ Insufficient Flames", description=f"You need **{found_item['price']:,}** 🔥.", color=0xFF0000)
-                return await send_method(embed=lack_emb)
+                return "broke"
 
-            inv = json.loads(user['titles']) if user['titles'] else []
-            if found_item['name'] in inv: 
-                own_emb = discord.Embed(title="❌ Already Possessed", description=f"You already own the **{found_item['name']}**.", color=0xFFFF00)
-                return await send_method(embed=own_emb)
+            if not inventory.add_item(conn, author.id, found_item['name'], found_cat):
+                return "owned"
 
-            inv.append(found_item['name'])
-            conn.execute("UPDATE users SET balance = balance - ?, titles = ? WHERE id = ?", 
-                         (found_item['price'], json.dumps(inv), author.id))
-            conn.commit()
+            conn.execute("UPDATE users SET balance = balance - ? WHERE id = ?", (found_item['price'], author.id))
+            return "ok"
+
+        outcome = await database.transaction(_purchase)
+        inventory.invalidate(author.id)
+        if outcome == "broke":
+            lack_emb = discord.Embed(title="❌ Insufficient Flames", description=f"You need **{found_item['price']:,}** 🔥.", color=0xFF0000)
+            return await send_method(embed=lack_emb)
+        if outcome == "owned":
+            own_emb = discord.Embed(title="❌ Already Possessed", description=f"You already own the **{found_item['name']}**.", color=0xFFFF00)
+            return await send_method(embed=own_emb)
 
         success_emb = discord.Embed(title="🫦 Acquisition Successful", description=f"You have taken possession of: **{found_item['name']}**", color=0x00FF00)
         
@@ -429,14 +453,16 @@ class Shop(commands.Cog):
     async def inventory(self, ctx, member: discord.Member = None):
         target = member or ctx.author
         
-        with self.get_db_connection() as conn:
-            user = conn.execute("SELECT titles, spouse FROM users WHERE id = ?", (target.id,)).fetchone()
+        def _vault(conn):
+            user = conn.execute("SELECT spouse FROM users WHERE id = ?", (target.id,)).fetchone()
+            return user, inventory.item_names(conn, target.id)
+
+        user, owned_names = await database.read(_vault)
         
-        if not user or not user['titles'] or user['titles'] == "[]":
+        if not user or not owned_names:
             desc = "This soul owns nothing but their chains." if target == ctx.author else f"{target.display_name} is currently naked of assets."
             return await ctx.send(embed=discord.Embed(title=f"🎒 {target.display_name.upper()}'S VAULT", description=desc, color=0x808080))
 
-        owned_names = json.loads(user['titles'])
         categories = {"Houses": [], "Pets": [], "Stones": [], "Toys": [], "Other": []}
         
         for name in owned_names:
@@ -496,17 +522,20 @@ class Shop(commands.Cog):
             elif tier == "Legendary": luck_bonus = 0.12; income_bonus = 0.15
             elif tier == "Supreme": luck_bonus = 0.20; income_bonus = 0.25
 
-            with self.get_db_connection() as conn:
+            def _bind(conn):
                 user = conn.execute("SELECT balance FROM users WHERE id = ?", (author.id,)).fetchone()
                 if not user or user['balance'] < item['price']:
-                    return await channel.send(discord.Embed(title="❌ Transaction Denied", description="Your wallet cannot afford this devotion.", color=0xFF0000))
+                    return False
 
                 u1, u2 = sorted([author.id, target.id])
                 conn.execute("INSERT OR REPLACE INTO relationships (user_one, user_two, type, shared_luck, passive_income) VALUES (?, ?, ?, ?, ?)",
                              (u1, u2, "Bound", luck_bonus, income_bonus))
                 
                 conn.execute("UPDATE users SET balance = balance - ? WHERE id = ?", (item['price'], author.id))
-                conn.commit()
+                return True
+
+            if not await database.transaction(_bind):
+                return await channel.send(discord.Embed(title="❌ Transaction Denied", description="Your wallet cannot afford this devotion.", color=0xFF0000))
 
             bond_emb = discord.Embed(title="💞 THE CHAINS OF DESIRE", color=0xFF1493)
             bond_emb.description = f"{author.mention} and {target.mention} have sealed their fates with the **{item['name']}**.\n\n" \
@@ -537,21 +566,23 @@ class Shop(commands.Cog):
         if not found_item:
             return await ctx.send(embed=discord.Embed(title="❌ Item Not Found", description="This asset does not exist in our records.", color=0xFF0000))
 
-        with self.get_db_connection() as conn:
-            user = conn.execute("SELECT titles FROM users WHERE id = ?", (ctx.author.id,)).fetchone()
-            inv = json.loads(user['titles']) if user['titles'] else []
-            
-            if found_item['name'] not in inv:
-                return await ctx.send(embed=discord.Embed(title="❌ Theft Attempt", description="You cannot sell what you do not possess.", color=0xFF0000))
+        def _liquidate(conn):
+            if not inventory.remove_item(conn, ctx.author.id, found_item['name']):
+                return None
             
             sell_value = int(found_item['price'] * 0.5)
-            inv.remove(found_item['name'])
-            
-            conn.execute("UPDATE users SET balance = balance + ?, titles = ? WHERE id = ?", (sell_value, json.dumps(inv), ctx.author.id))
-            conn.commit()
+            conn.execute("UPDATE users SET balance = balance + ? WHERE id = ?", (sell_value, ctx.author.id))
+            return sell_value
+
+        sell_value = await database.transaction(_liquidate)
+        inventory.invalidate(ctx.author.id)
+        if sell_value is None:
+            return await ctx.send(embed=discord.Embed(title="❌ Theft Attempt", description="You cannot sell what you do not possess.", color=0xFF0000))
 
         sell_emb = discord.Embed(title="💰 ASSET LIQUIDATED", description=f"The Master has reclaimed the **{found_item['name']}**.\n\nReturned: **{sell_value:,}** 🔥", color=0xFFFF00)
         await ctx.send(embed=sell_emb)
 
 async def setup(bot):
+    # Catalogue may have changed on `!reload shop`, so derived prot/luck must be recomputed
+    inventory.clear_cache()
     await bot.add_cog(Shop(bot))
@@ -0,0 +1,166 @@
+import asyncio
+import heapq
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import database
+
+# ===== STREAK ALERT SCHEDULER =====
+# streak_guardian used to load every user each hour, parse three timestamps per
+# row and ping whoever happened to fall inside a one-hour window, so a restart
+# or a late tick meant a lost ping. Each claim now stores the moment its
+# warning is due in streak_alerts (indexed on due_at). A single task keeps a
+# heap of the alerts due within the next HORIZON, refilled by one indexed
+# range query, and sleeps until the earliest one: pings fire on time and the
+# hourly cost is the number of pings due, not the number of users.
+#
+# Rows are deleted as they fire, so after a restart the overdue ones are simply
+# picked up by the first refill (and dropped if their streak already reset).
+
+AlertTier = namedtuple("AlertTier", "offset min_streak label elapsed")
+
+# Fire 3h before the reset (2x cooldown); daily only matters from a 5-streak
+TIERS = {
+    "daily": AlertTier(45 * 3600, 5, "Daily", "45 hours"),
+    "weekly": AlertTier(14 * 86400 - 3 * 3600, 1, "Weekly", "13 days and 21 hours"),
+    "monthly": AlertTier(60 * 86400 - 3 * 3600, 1, "Monthly", "59 days and 21 hours"),
+}
+GRACE = 3 * 3600      # A ping later than this is past the reset and pointless
+HORIZON = 3600        # Seconds of upcoming alerts held in memory
+
+_heap = []            # (due_at, user_id, tier)
+_horizon_end = 0.0
+_wake = None
+_task = None
+
+
+def ensure_schema(conn):
+    existed = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'streak_alerts'").fetchone()
+    conn.execute("""CREATE TABLE IF NOT EXISTS streak_alerts (
+        user_id INTEGER,
+        tier TEXT,
+        due_at REAL,
+        PRIMARY KEY (user_id, tier)
+    )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_streak_alerts_due ON streak_alerts (due_at)")
+    if not existed:
+        backfill(conn)
+
+
+def due_time(tier, claimed_at, streak):
+    """When the warning for a claim at `claimed_at` (unix) should fire, or None."""
+    spec = TIERS[tier]
+    if not streak or streak < spec.min_streak:
+        return None
+    return claimed_at + spec.offset
+
+
+def backfill(conn):
+    """One-shot: alerts for the claims made before this table existed."""
+    now = time.time()
+    rows = []
+    for u in conn.execute("SELECT id, last_daily, last_weekly, last_monthly, daily_streak, weekly_streak, monthly_streak FROM users").fetchall():
+        for tier in TIERS:
+            last = u[f"last_{tier}"]
+            if not last:
+                continue
+            try:
+                claimed_at = datetime.fromisoformat(last).timestamp()
+            except ValueError:
+                continue
+            due = due_time(tier, claimed_at, u[f"{tier}_streak"])
+            if due is not None and due + GRACE > now:
+                rows.append((u["id"], tier, due))
+    conn.executemany("INSERT OR REPLACE INTO streak_alerts (user_id, tier, due_at) VALUES (?, ?, ?)", rows)
+    return len(rows)
+
+
+# --- WRITES (inside the claim's transaction) ---
+def set_alert(conn, user_id, tier, claimed_at, streak):
+    """Replaces the user's pending alert for `tier`; returns its due time (None = no alert)."""
+    due = due_time(tier, claimed_at, streak)
+    if due is None:
+        conn.execute("DELETE FROM streak_alerts WHERE user_id = ? AND tier = ?", (user_id, tier))
+    else:
+        conn.execute("INSERT OR REPLACE INTO streak_alerts (user_id, tier, due_at) VALUES (?, ?, ?)", (user_id, tier, due))
+    return due
+
+
+def due_rows(conn, until):
+    return conn.execute("SELECT user_id, tier, due_at FROM streak_alerts WHERE due_at <= ? ORDER BY due_at", (until,)).fetchall()
+
+
+def take_alert(conn, user_id, tier, due_at):
+    """Deletes the alert if it is still the one scheduled; True if it should be sent."""
+    row = conn.execute("""SELECT s.due_at, u.streak_alerts FROM streak_alerts s
+                          LEFT JOIN users u ON u.id = s.user_id
+                          WHERE s.user_id = ? AND s.tier = ?""", (user_id, tier)).fetchone()
+    if row is None or row["due_at"] != due_at:
+        return False  # Re-claimed (rescheduled) or already sent
+    conn.execute("DELETE FROM streak_alerts WHERE user_id = ? AND tier = ?", (user_id, tier))
+    return row["streak_alerts"] != 0
+
+
+# --- SCHEDULER ---
+def schedule(user_id, tier, due_at):
+    """Call after the claim commits, so an alert due within the horizon is queued now."""
+    if due_at is None or _wake is None or due_at > _horizon_end:
+        return  # The refill that covers it will read it from the table
+    heapq.heappush(_heap, (due_at, user_id, tier))
+    _wake.set()
+
+
+async def _refill():
+    global _horizon_end
+    until = time.time() + HORIZON
+    for r in await database.read(due_rows, until):
+        heapq.heappush(_heap, (r["due_at"], r["user_id"], r["tier"]))
+    _horizon_end = until
+
+
+async def _fire(notify, due_at, user_id, tier):
+    if not await database.transaction(take_alert, user_id, tier, due_at):
+        return
+    if time.time() > due_at + GRACE:
+        return  # Missed while offline and the streak has reset by now
+    await notify(user_id, TIERS[tier])
+
+
+async def _run(notify):
+    while True:
+        try:
+            if time.time() >= _horizon_end:
+                await _refill()
+            now = time.time()
+            if _heap and _heap[0][0] <= now:
+                due_at, user_id, tier = heapq.heappop(_heap)
+                await _fire(notify, due_at, user_id, tier)
+                continue
+            until = min(_heap[0][0], _horizon_end) if _heap else _horizon_end
+            _wake.clear()
+            try:
+                await asyncio.wait_for(_wake.wait(), timeout=max(0.0, until - now))
+            except asyncio.TimeoutError:
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Streak scheduler error: {e}")
+            await asyncio.sleep(30)
+
+
+def start(notify):
+    """notify(user_id, AlertTier) sends the ping. Safe to call on every on_ready."""
+    global _task, _wake
+    if _task is not None and not _task.done():
+        return
+    _wake = asyncio.Event()
+    _task = asyncio.create_task(_run(notify))
+
+
+def stop():
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None